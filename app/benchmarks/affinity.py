@@ -0,0 +1,168 @@
+assert __name__ == "__main__", "This script is not meant to be imported."
+
+import argparse
+import itertools
+import random
+import sys
+from collections import Counter, OrderedDict, deque
+from pathlib import Path
+from typing import Callable
+
+sys.path.append(str(Path(__file__).parents[1]))
+
+from src.utils import AffinityRing
+
+
+class LRUCache:
+    """
+    In-process document cache of a node, the least recently used document is evicted.
+    """
+
+    def __init__(self, size: int) -> None:
+        """
+        Constructor method for `LRUCache`.
+
+        Parameters
+        ----------
+        size : int
+            The number of documents that the cache holds.
+        """
+        self.size = size
+        self.items = OrderedDict()
+
+    def get(self, key: str) -> bool:
+        """
+        Read a document, it is cached on a miss.
+
+        Parameters
+        ----------
+        key : str
+            The ID of the document.
+
+        Returns
+        -------
+        hit : bool
+            Indicates if the document was cached.
+        """
+        if key in self.items:
+            self.items.move_to_end(key)
+            return True
+
+        self.items[key] = None
+        if len(self.items) > self.size:
+            self.items.popitem(last=False)
+        return False
+
+
+def workload(documents: int, requests: int, skew: float, seed: int) -> list[str]:
+    """
+    Create the PDF IDs of the requests with a Zipf distribution, a few documents get most requests.
+
+    Parameters
+    ----------
+    documents : int
+        The number of documents.
+
+    requests : int
+        The number of requests.
+
+    skew : float
+        The exponent of the Zipf distribution.
+
+    seed : int
+        The seed of the random generator.
+
+    Returns
+    -------
+    pdf_ids : list[str]
+        The PDF ID of each request.
+    """
+    rng = random.Random(seed)
+    ids = [f"{rng.getrandbits(96):024x}" for _ in range(documents)]
+    weights = [1 / (rank**skew) for rank in range(1, documents + 1)]
+    return rng.choices(ids, weights=weights, k=requests)
+
+
+def simulate(pdf_ids: list[str], nodes: list[str], route: Callable, cache_size: int, concurrency: int) -> dict:
+    """
+    Route the requests to the nodes and read their documents from the caches of the nodes.
+    The last `concurrency` requests are in progress, they are the loads of the nodes.
+    The peak load is the highest load of a node relative to the average load.
+
+    Parameters
+    ----------
+    pdf_ids : list[str]
+        The PDF ID of each request.
+
+    nodes : list[str]
+        The names of the nodes.
+
+    route : Callable
+        The routing function, it takes the PDF ID and the loads and returns a node.
+
+    cache_size : int
+        The number of documents that the cache of each node holds.
+
+    concurrency : int
+        The number of requests in progress.
+
+    Returns
+    -------
+    results : dict
+        The hit rate, the peak load relative to the average load and the copies per cached document.
+    """
+    caches = {node: LRUCache(cache_size) for node in nodes}
+    loads = Counter({node: 0 for node in nodes})
+    inflight = deque()
+    hits, peak = 0, 0.0
+
+    for pdf_id in pdf_ids:
+        if len(inflight) == concurrency:
+            loads[inflight.popleft()] -= 1
+
+        node = route(pdf_id, loads)
+        hits += caches[node].get(pdf_id)
+        loads[node] += 1
+        inflight.append(node)
+        if len(inflight) == concurrency:
+            peak = max(peak, max(loads.values()) / (concurrency / len(nodes)))
+
+    cached = Counter(key for cache in caches.values() for key in cache.items)
+    return {
+        "hit rate": hits / len(pdf_ids),
+        "peak load": peak,
+        "copies": sum(cached.values()) / len(cached),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the PDF ID affinity routing.")
+    parser.add_argument("--nodes", type=int, default=8, help="The number of nodes.")
+    parser.add_argument("--documents", type=int, default=2000, help="The number of documents.")
+    parser.add_argument("--requests", type=int, default=100000, help="The number of requests.")
+    parser.add_argument("--cache-size", type=int, default=100, help="The cache size of each node in documents.")
+    parser.add_argument("--concurrency", type=int, default=64, help="The number of requests in progress.")
+    parser.add_argument("--skew", type=float, default=1.1, help="The exponent of the Zipf distribution.")
+    parser.add_argument("--load-factor", type=float, default=1.25, help="The load factor of the bounded loads.")
+    parser.add_argument("--seed", type=int, default=0, help="The seed of the random generator.")
+    args = parser.parse_args()
+
+    nodes = [f"api-{index}" for index in range(args.nodes)]
+    pdf_ids = workload(args.documents, args.requests, args.skew, args.seed)
+    ring = AffinityRing(nodes, args.load_factor)
+    rng = random.Random(args.seed)
+    cycle = itertools.cycle(nodes)
+
+    routes = {
+        "random": lambda pdf_id, loads: rng.choice(nodes),
+        "round robin": lambda pdf_id, loads: next(cycle),
+        "consistent hash": lambda pdf_id, loads: ring.node(pdf_id),
+        "bounded loads": lambda pdf_id, loads: ring.node(pdf_id, loads),
+    }
+    print(
+        f"{args.requests} requests, {args.documents} documents, "
+        + f"{args.nodes} nodes with {args.cache_size} cached documents"
+    )
+    for name, route in routes.items():
+        results = simulate(pdf_ids, nodes, route, args.cache_size, args.concurrency)
+        print(f"{name:<16} | " + " | ".join(f"{key}: {value:6.3f}" for key, value in results.items()))
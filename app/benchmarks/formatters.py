@@ -0,0 +1,309 @@
+assert __name__ == "__main__", "This script is not meant to be imported."
+
+import argparse
+import http
+import logging
+import os
+import sys
+import time
+from copy import copy
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import click
+
+sys.path.append(str(Path(__file__).parents[1]))
+
+from uvicorn.logging import AccessFormatter as UvicornAccessFormatter
+from uvicorn.logging import DefaultFormatter as UvicornDefaultFormatter
+
+from src.formatters.access import AccessFormatter
+from src.formatters.default import DefaultFormatter
+
+# Constants
+FMT = "(%(asctime)s) (%(pid)s) | %(levelprefix)s %(correlation_id)s%(message)s"
+PID_MAX_LENGTH = len(str(os.getpid())) if len(str(os.getpid())) > 3 else 3 + 5
+LOCAL_OFFSET = timedelta(hours=3)
+
+
+# Reference formatters, the implementation before the fast path
+class ReferenceDefaultFormatter(DefaultFormatter):
+    """
+    The default formatter copying and styling each record.
+    """
+
+    def formatTime(self, record: logging.LogRecord, datefmt: str | None = None) -> str:
+        return logging.Formatter.formatTime(self, record, datefmt)
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        """
+        Formats the log record's message such that \
+        the record's attributes are changed with a pattern \
+        and the message is colorized.
+
+        Parameters
+        ----------
+        record : logging.LogRecord
+            The log record to format.
+
+        Returns
+        -------
+        formatted_message : str
+            The formatted message.
+        """
+        recordcopy = copy(record)
+        correlation_id = recordcopy.__dict__.get("correlation_id", "")
+        if correlation_id:
+            correlation_id = f"[{correlation_id}] "
+        levelname = recordcopy.levelname
+        asctime = recordcopy.__dict__.get("asctime", "")
+        if asctime != "":
+            asctime = (datetime.strptime(asctime, "%Y-%m-%d %H:%M:%S,%f") + LOCAL_OFFSET).strftime(
+                "%Y-%m-%d %H:%M:%S,%f"
+            )[:-3]
+        _norm_process = "PID: " + str(recordcopy.__dict__.get("process", ""))
+        process = _norm_process + " " * (PID_MAX_LENGTH - len(_norm_process))
+        message = recordcopy.__dict__.get("message", "")
+        module = recordcopy.__dict__.get("module", "")
+        lineno = recordcopy.__dict__.get("lineno", "")
+        seperator = " " * (8 - len(recordcopy.levelname))
+
+        # Colorize if use_colors is True
+        if self.use_colors:
+            if correlation_id:
+                correlation_id = self.color_default(correlation_id, recordcopy.levelno)
+            levelname = self.color_level_name(levelname, recordcopy.levelno)
+            asctime = self.color_default(asctime, recordcopy.levelno)
+            message = click.style(message, fg="bright_white")
+            process = self.color_default(process, recordcopy.levelno)
+            module = click.style(str(module), fg="bright_white")
+            lineno = click.style(str(lineno), fg="bright_white")
+            if "color_message" in recordcopy.__dict__:
+                recordcopy.msg = recordcopy.__dict__["color_message"]
+                recordcopy.__dict__["message"] = recordcopy.getMessage()
+
+        # Update the record's attributes
+        recordcopy.asctime = asctime
+        recordcopy.message = message
+        recordcopy.module = module
+        recordcopy.lineno = lineno
+        recordcopy.__dict__["correlation_id"] = correlation_id
+        recordcopy.__dict__["pid"] = process
+        recordcopy.__dict__["levelprefix"] = levelname + ":" + seperator
+
+        return UvicornDefaultFormatter.formatMessage(self, recordcopy)
+
+
+class ReferenceAccessFormatter(AccessFormatter):
+    """
+    The access formatter copying and styling each record.
+    """
+
+    def formatTime(self, record: logging.LogRecord, datefmt: str | None = None) -> str:
+        return logging.Formatter.formatTime(self, record, datefmt)
+
+    def get_status_code(self, status_code: int) -> str:
+        """
+        Get the status code and its phrase.
+        If no valid status code is provided, \
+        the status code is retured without a phrase.
+        If use_colors is True, the status code is colorized.
+
+        Parameters
+        ----------
+        status_code : int
+            The status code.
+
+        Returns
+        -------
+        status_and_phrase : str
+            The status code and its phrase.
+        """
+        try:
+            status_phrase = http.HTTPStatus(status_code).phrase
+        except ValueError:
+            if status_code == 499:
+                status_phrase = "Client Closed Request"
+            else:
+                status_phrase = ""
+        status_and_phrase = "%s %s" % (status_code, status_phrase)
+
+        if self.use_colors:
+
+            def default(code: int) -> str:
+                return status_and_phrase
+
+            func = self.status_code_colours.get(status_code // 100, default)
+            return func(status_and_phrase)
+
+        return status_and_phrase
+
+
+    def normalize_default(self, recordcopy: logging.LogRecord) -> logging.LogRecord:
+        """
+        Formats the default log record's message such that \
+        the record's attributes are changed with a pattern \
+        and the message is colorized.
+
+        Parameters
+        ----------
+        recordcopy : logging.LogRecord
+            The log record to format.
+        """
+        correlation_id = recordcopy.__dict__.get("correlation_id", "")
+        if correlation_id:
+            correlation_id = f"[{correlation_id}] "
+        levelname = recordcopy.levelname
+        asctime = recordcopy.__dict__.get("asctime", "")
+        if asctime != "":
+            asctime = (datetime.strptime(asctime, "%Y-%m-%d %H:%M:%S,%f") + LOCAL_OFFSET).strftime(
+                "%Y-%m-%d %H:%M:%S,%f"
+            )[:-3]
+        _norm_process = "PID: " + str(recordcopy.__dict__.get("process", ""))
+        process = _norm_process + " " * (PID_MAX_LENGTH - len(_norm_process))
+        message = recordcopy.__dict__.get("message", "")
+        module = recordcopy.__dict__.get("module", "")
+        lineno = recordcopy.__dict__.get("lineno", "")
+        seperator = " " * (8 - len(recordcopy.levelname))
+
+        # Colorize if use_colors is True
+        if self.use_colors:
+            if correlation_id:
+                correlation_id = self.color_default(correlation_id, recordcopy.levelno)
+            levelname = self.color_level_name(levelname, recordcopy.levelno)
+            asctime = self.color_default(asctime, recordcopy.levelno)
+            message = click.style(message, fg="bright_white")
+            process = self.color_default(process, recordcopy.levelno)
+            module = click.style(str(module), fg="bright_white")
+            lineno = click.style(str(lineno), fg="bright_white")
+
+        # Update the record's attributes
+        recordcopy.asctime = asctime
+        recordcopy.message = message
+        recordcopy.module = module
+        recordcopy.lineno = lineno
+        recordcopy.__dict__["pid"] = process
+        recordcopy.__dict__["correlation_id"] = correlation_id
+        recordcopy.__dict__["levelprefix"] = levelname + ":" + seperator
+
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        """
+        Format the HTTP log record's message such that \
+        the default log record is formatted and \
+        the HTTP message is created.
+
+        Parameters
+        ----------
+        record : logging.LogRecord
+            The log record to format.
+
+        Returns
+        -------
+        formatted_message : str
+            The formatted message.
+        """
+        recordcopy = copy(record)
+        self.normalize_default(recordcopy)
+        client_addr, method, full_path, http_version, status_code = recordcopy.args
+        status_code = self.get_status_code(int(status_code))
+        request_line = "%s %s HTTP/%s" % (method, full_path, http_version)
+        if self.use_colors:
+            request_line = click.style(request_line, bold=True)
+        recordcopy.message = f'{client_addr} - "{request_line}" {status_code}'
+
+        return UvicornAccessFormatter.formatMessage(self, recordcopy)
+
+
+def make_records() -> list[tuple[str, logging.LogRecord]]:
+    """
+    Create sample default and access log records.
+
+    Returns
+    -------
+    records : list[tuple[str, logging.LogRecord]]
+        The kind of the formatter and the log record.
+    """
+    records = []
+    for level in (logging.DEBUG, logging.INFO, logging.WARNING, logging.ERROR, logging.CRITICAL):
+        record = logging.LogRecord("src", level, __file__, 10, "Sample message %s", ("arg",), None)
+        records.append(("default", record))
+
+        # The records of a request have its correlation ID
+        record = copy(record)
+        record.correlation_id = "3f2a9c1e7b4d4e0f"
+        records.append(("default", record))
+
+    record = logging.LogRecord("uvicorn.error", logging.INFO, __file__, 10, "Started %s", ("server",), None)
+    record.color_message = "Started " + click.style("%s", bold=True)
+    records.append(("default", record))
+
+    for status_code in (200, 201, 400, 404, 499, 500):
+        args = ("127.0.0.1:5000", "POST", "/v1/chat/123", "1.1", status_code)
+        record = logging.LogRecord("uvicorn.access", logging.INFO, __file__, 10, '%s - "%s %s HTTP/%s" %d', args, None)
+        records.append(("access", record))
+        record = copy(record)
+        record.correlation_id = "3f2a9c1e7b4d4e0f"
+        records.append(("access", record))
+
+    return records
+
+
+def benchmark(formatter: logging.Formatter, records: list[logging.LogRecord], iterations: int) -> float:
+    """
+    Measure the time per record of the given formatter.
+
+    Parameters
+    ----------
+    formatter : logging.Formatter
+        The formatter to measure.
+
+    records : list[logging.LogRecord]
+        The records to format.
+
+    iterations : int
+        The number of times all records are formatted.
+
+    Returns
+    -------
+    duration : float
+        The time per record in microseconds.
+    """
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for record in records:
+            formatter.format(record)
+
+    return (time.perf_counter() - start) / (iterations * len(records)) * 1e6
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the log formatters.")
+    parser.add_argument("--iterations", type=int, default=10000, help="The number of iterations.")
+    args = parser.parse_args()
+
+    formatters = {
+        "default": (DefaultFormatter, ReferenceDefaultFormatter),
+        "access": (AccessFormatter, ReferenceAccessFormatter),
+    }
+    records = make_records()
+
+    for use_colors in (False, True):
+        for kind, (fast_class, reference_class) in formatters.items():
+            fast = fast_class(fmt=FMT, use_colors=use_colors)
+            reference = reference_class(fmt=FMT, use_colors=use_colors)
+            kind_records = [record for record_kind, record in records if record_kind == kind]
+
+            # Check that the outputs are identical
+            for record in kind_records:
+                expected, actual = reference.format(copy(record)), fast.format(copy(record))
+                assert expected == actual, f"Output mismatch:\n{expected!r}\n{actual!r}"
+
+            reference_time = benchmark(reference, kind_records, args.iterations)
+            fast_time = benchmark(fast, kind_records, args.iterations)
+            print(
+                f"{kind:<8} colors={str(use_colors):<5} | "
+                f"reference: {reference_time:6.2f} us/record | "
+                f"fast: {fast_time:6.2f} us/record | "
+                f"speedup: {reference_time / fast_time:4.1f}x"
+            )
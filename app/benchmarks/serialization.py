@@ -0,0 +1,121 @@
+assert __name__ == "__main__", "This script is not meant to be imported."
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable
+
+from bson import ObjectId
+
+sys.path.append(str(Path(__file__).parents[1]))
+
+from src.utils.serialization import dumps, loads
+
+
+def make_payloads() -> dict[str, Any]:
+    """
+    Create typical payloads of the application.
+
+    Returns
+    -------
+    payloads : dict[str, Any]
+        The payloads by their names.
+    """
+    history = []
+    for i in range(30):
+        history.append({"role": "user", "parts": f"Question {i} about the document content?"})
+        history.append({"role": "model", "parts": "The document explains the topic in detail. " * 20})
+
+    log = {
+        "client": "127.0.0.1:5000",
+        "http": "http/1.1",
+        "path": "/v1/chat/670f6b0c1c9d440000a1b2c3",
+        "method": "POST",
+        "level": "error",
+        "status_code": 500,
+        "detail": "Failed to chat with the bot",
+        "traceback": {
+            "repr": "Exception('error')",
+            "type": "Exception",
+            "message": "error",
+            "details": [
+                {"file": "/app/src/routers/chat.py", "function": "chat_about_pdf", "lineno": i, "line": "..."}
+                for i in range(10)
+            ],
+        },
+        "duration_ms": 1532.25,
+        "timestamp": datetime.now(),
+    }
+
+    return {
+        "chat response": {"response": "The main topic of this PDF is the design of the system. " * 10},
+        "chat history item": history[1],
+        "chat history": history,
+        "log": log,
+        "pdf": {"_id": ObjectId(), "metadata": {"title": "Sample", "page_count": 10}, "text": "word " * 20000},
+    }
+
+
+def json_default(obj: Any) -> Any:
+    """
+    Serialize the objects that are not supported by the standard library.
+    """
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    return str(obj)
+
+
+def json_dumps(obj: Any) -> bytes:
+    """
+    Serialize an object with the standard library, as it was done before orjson.
+    """
+    return json.dumps(obj, default=json_default).encode()
+
+
+def benchmark(func: Callable[[Any], Any], obj: Any, iterations: int) -> float:
+    """
+    Measure the time per call of the given function.
+
+    Parameters
+    ----------
+    func : Callable[[Any], Any]
+        The function to measure.
+
+    obj : Any
+        The argument of the function.
+
+    iterations : int
+        The number of calls.
+
+    Returns
+    -------
+    duration : float
+        The time per call in microseconds.
+    """
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func(obj)
+
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the JSON serialization.")
+    parser.add_argument("--iterations", type=int, default=2000, help="The number of iterations.")
+    args = parser.parse_args()
+
+    for name, payload in make_payloads().items():
+        # Check that the payload survives a round trip
+        data = dumps(payload)
+        assert loads(data) == json.loads(json_dumps(payload)), f"Round trip mismatch for {name}"
+
+        results = {
+            "json dumps": benchmark(json_dumps, payload, args.iterations),
+            "orjson dumps": benchmark(dumps, payload, args.iterations),
+            "json loads": benchmark(json.loads, data, args.iterations),
+            "orjson loads": benchmark(loads, data, args.iterations),
+        }
+        print(f"{name:<18} | " + " | ".join(f"{key}: {value:8.2f} us" for key, value in results.items()))
@@ -0,0 +1,101 @@
+assert __name__ == "__main__", "This script is not meant to be imported."
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+APP_PATH = Path(__file__).parents[1]
+sys.path.append(str(APP_PATH))
+
+from src.utils import dumps, loads, read_pdf_from_bytes
+from src.utils.text import detect_language
+from src.warmup import sample_pdf
+
+
+def import_times(module: str) -> list[tuple[int, str]]:
+    """
+    Measure the cumulative import time of each package imported by the given module.
+    The module is imported in a new interpreter with `-X importtime`, without the warm-up.
+
+    Parameters
+    ----------
+    module : str
+        The module to import.
+
+    Returns
+    -------
+    times : list[tuple[int, str]]
+        The cumulative import times in microseconds and the names of the packages, slowest first.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=APP_PATH,
+        env=os.environ | {"WARMUP": "false"},
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Failed to import {module}:\n{result.stderr}")
+
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        times.append((int(cumulative), name.strip()))
+
+    return sorted(times, reverse=True)
+
+
+def first_and_warm(func: Callable[[], object]) -> tuple[float, float]:
+    """
+    Measure the first call and a later call of the given function.
+
+    Parameters
+    ----------
+    func : Callable[[], object]
+        The function to measure.
+
+    Returns
+    -------
+    first : float
+        The duration of the first call in milliseconds.
+
+    warm : float
+        The duration of the next call in milliseconds.
+    """
+    durations = []
+    for _ in range(2):
+        start = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - start) * 1000)
+
+    return durations[0], durations[1]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the startup of the application.")
+    parser.add_argument("--module", type=str, default="src.main", help="The module to import.")
+    parser.add_argument("--top", type=int, default=15, help="The number of the slowest imports to list.")
+    args = parser.parse_args()
+
+    times = import_times(args.module)
+    print(f"Import of {args.module}: {times[0][0] / 1000:.1f} ms")
+    for cumulative, name in times[1 : args.top + 1]:
+        print(f"{name:<50} | {cumulative / 1000:8.1f} ms")
+    print()
+
+    # The first calls below are paid by the first request of a worker without the warm-up
+    pdf_bytes = sample_pdf()
+    steps = {
+        "detect_language": lambda: detect_language("This sentence is written in English."),
+        "read_pdf_from_bytes": lambda: read_pdf_from_bytes("sample.pdf", pdf_bytes),
+        "dumps/loads": lambda: loads(dumps({"role": "user", "parts": "question"})),
+    }
+    for name, func in steps.items():
+        first, warm = first_and_warm(func)
+        print(f"{name:<20} | first: {first:9.3f} ms | warm: {warm:9.3f} ms")
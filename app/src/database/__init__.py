@@ -1,7 +1,12 @@
+from .archive import run_history_archiver
+from .logs import is_level_enabled, log_to_database
 from .mongo import MongoClient
 from .redis import RedisClient
 
 __all__ = [
+    "run_history_archiver",
+    "is_level_enabled",
+    "log_to_database",
     "MongoClient",
     "RedisClient",
 ]
@@ -0,0 +1,88 @@
+import asyncio
+import os
+
+from pymongo.errors import BulkWriteError
+
+from ..logger import LOGGER
+from .mongo import MongoClient
+from .redis import RedisClient
+
+# Environment variable/s
+HISTORY_ARCHIVE_INTERVAL_MS = float(os.getenv("HISTORY_ARCHIVE_INTERVAL_MS", 5000))
+HISTORY_ARCHIVE_BATCH_SIZE = int(os.getenv("HISTORY_ARCHIVE_BATCH_SIZE", 500))
+
+
+async def archive_history(db: MongoClient, cache: RedisClient, batch_size: int = HISTORY_ARCHIVE_BATCH_SIZE) -> int:
+    """
+    Move a batch of chat history messages from the archive queue in Redis to MongoDB.
+    If the insert fails, the messages that were not inserted are put back to the queue and the error is raised.
+
+    Parameters
+    ----------
+    db : MongoClient
+        The MongoDB client.
+
+    cache : RedisClient
+        The Redis client.
+
+    batch_size : int
+        The maximum number of messages to move.
+
+    Returns
+    -------
+    count : int
+        The number of archived messages.
+    """
+    messages = await cache.take_archive(batch_size)
+    if not messages:
+        return 0
+
+    try:
+        await db.archive_messages(messages)
+    except BulkWriteError as e:
+        await cache.return_archive(messages[e.details.get("nInserted", 0) :])
+        raise
+    except Exception:
+        await cache.return_archive(messages)
+        raise
+
+    return len(messages)
+
+
+async def run_history_archiver(db: MongoClient, cache: RedisClient, stop: asyncio.Event) -> None:
+    """
+    Archive the chat history messages of the workers in batches until the stop event is set.
+    A full batch is followed by the next one at once, otherwise the archiver waits \
+    `HISTORY_ARCHIVE_INTERVAL_MS` milliseconds. Each worker runs an archiver on the shared queue.
+    When it stops, the queued messages are archived before it returns.
+
+    Parameters
+    ----------
+    db : MongoClient
+        The MongoDB client.
+
+    cache : RedisClient
+        The Redis client.
+
+    stop : asyncio.Event
+        The event that stops the archiver.
+    """
+    while not stop.is_set():
+        try:
+            count = await archive_history(db, cache)
+        except Exception as e:
+            LOGGER.error(f"Failed to archive the chat history: {repr(e)}")
+            count = 0
+
+        if count < HISTORY_ARCHIVE_BATCH_SIZE:
+            try:
+                await asyncio.wait_for(stop.wait(), HISTORY_ARCHIVE_INTERVAL_MS / 1000)
+            except asyncio.TimeoutError:
+                pass
+
+    # Archive the rest of the queue
+    try:
+        while await archive_history(db, cache) > 0:
+            pass
+    except Exception as e:
+        LOGGER.error(f"Failed to archive the chat history: {repr(e)}")
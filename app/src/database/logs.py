@@ -0,0 +1,51 @@
+import logging
+import os
+
+from ..logger import LOGGER
+from ..utils.serialization import dumps
+from .mongo import MongoClient
+
+# Environment variable/s
+LOGGER_DATABASE_LEVEL = os.getenv("LOGGER_DATABASE_LEVEL", "info").upper()
+
+if not isinstance(logging.getLevelName(LOGGER_DATABASE_LEVEL), int):
+    raise ValueError(f"LOGGER_DATABASE_LEVEL is not a valid logging level: {LOGGER_DATABASE_LEVEL}")
+
+# Constants
+DATABASE_LEVEL_NO = logging.getLevelName(LOGGER_DATABASE_LEVEL)
+
+
+async def log_to_database(db: MongoClient, log: dict) -> None:
+    """
+    Log a request with its details to the database.
+    If the logging fails, it logs an error message with the log content.
+
+    Parameters
+    ----------
+    db : MongoClient
+        The MongoDB client.
+
+    log : dict
+        The log dictionary.
+    """
+    try:
+        await db.insert_log(log)
+    except:
+        LOGGER.error(f"FAIL TO LOG : {dumps(log).decode()}")
+
+
+def is_level_enabled(level: str) -> bool:
+    """
+    Check if the logs with the given level are written to the database.
+
+    Parameters
+    ----------
+    level : str
+        The level of the log. (e.g., info, warning, error)
+
+    Returns
+    -------
+    enabled : bool
+        Indicates if the log is written to the database.
+    """
+    return logging.getLevelName(level.upper()) >= DATABASE_LEVEL_NO
@@ -1,7 +1,15 @@
 import os
+from datetime import datetime, timedelta
+from typing import AsyncGenerator
+
 from bson import ObjectId
 
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import BulkWriteError, CollectionInvalid, OperationFailure
+from pymongo.write_concern import WriteConcern
+
+from ..utils.deadline import REQUEST_DEADLINE_MS
 
 # from pymongo.server_api import ServerApi
 
@@ -13,8 +21,32 @@ MONGODB_PASSWORD = os.getenv("MONGODB_PASSWORD", None)
 if MONGODB_HOST is None or MONGODB_USERNAME is None or MONGODB_PASSWORD is None:
     raise ValueError("MongoDB environment variables are not set.")
 
+MONGODB_LOGS_TTL_DAYS = int(os.getenv("MONGODB_LOGS_TTL_DAYS", 30))
+MONGODB_LOGS_CAPPED_SIZE_MB = int(os.getenv("MONGODB_LOGS_CAPPED_SIZE_MB", 0))
+MONGODB_LOGS_WRITE_CONCERN = os.getenv("MONGODB_LOGS_WRITE_CONCERN", "1")
+
+if MONGODB_LOGS_WRITE_CONCERN.isdigit():
+    MONGODB_LOGS_WRITE_CONCERN = int(MONGODB_LOGS_WRITE_CONCERN)
+
 DEV_MODE = os.getenv("DEV_MODE", "false").lower() == "true"
 
+# Constants
+LOGS_INDEXES = [
+    [("timestamp", DESCENDING)],
+    [("path", ASCENDING), ("timestamp", DESCENDING)],
+    [("status_code", ASCENDING), ("timestamp", DESCENDING)],
+    [("level", ASCENDING), ("timestamp", DESCENDING)],
+    [("pdf_id", ASCENDING), ("timestamp", DESCENDING)],
+    [("route", ASCENDING), ("timestamp", DESCENDING)],
+    [("correlation_id", ASCENDING)],
+]
+CONVERSATIONS_INDEXES = [
+    [("pdf_id", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING)],
+]
+USAGE_PERCENTILES = [0.5, 0.9, 0.99]
+LATENCY_PERCENTILES = [0.5, 0.95, 0.99]
+USAGE_TIMINGS = ["ttft_ms", "generation_ms"]
+
 
 class MongoClient:
     """
@@ -25,6 +57,8 @@ class MongoClient:
     def __init__(self) -> None:
         """
         Constructor method for `MongoClient`.
+        Operations time out after `REQUEST_DEADLINE_MS`, \
+        so an operation abandoned by an expired request deadline does not run forever.
 
         Attributes
         ----------
@@ -39,12 +73,17 @@ class MongoClient:
 
         logs : AsyncIOMotorCollection
             The collection for logs.
+            Its write concern is set by `MONGODB_LOGS_WRITE_CONCERN`.
+
+        conversations : AsyncIOMotorCollection
+            The collection for the archived chat history messages.
         """
         self.client = AsyncIOMotorClient(
             host=MONGODB_HOST if not DEV_MODE else "localhost",
             port=27017 if not DEV_MODE else int(os.getenv("MONGODB_PORT", 27017)),
             username=MONGODB_USERNAME,
             password=MONGODB_PASSWORD,
+            timeoutMS=REQUEST_DEADLINE_MS,
         )
 
         # Database
@@ -52,7 +91,8 @@ class MongoClient:
 
         # Collections
         self.pdfs = self.db["pdfs"]
-        self.logs = self.db["logs"]
+        self.logs = self.db.get_collection("logs", write_concern=WriteConcern(w=MONGODB_LOGS_WRITE_CONCERN))
+        self.conversations = self.db["conversations"]
 
     async def close(self) -> None:
         """
@@ -66,7 +106,47 @@ class MongoClient:
         """
         await self.client.admin.command("ping")
 
-    async def insert_pdf(self, metadata: dict, text: str) -> str:
+    async def setup_logs(self) -> None:
+        """
+        Provision the collection for logs.
+        If the collection does not exist, it is created as a time-series collection \
+        whose documents expire after `MONGODB_LOGS_TTL_DAYS` days.
+        If `MONGODB_LOGS_CAPPED_SIZE_MB` is set, it is created as a capped collection instead.
+        Then, the indexes on timestamp, path, status code, level, PDF ID, route \
+        and correlation ID are created.
+        Existing collections and indexes are left as they are.
+        """
+        if MONGODB_LOGS_CAPPED_SIZE_MB > 0:
+            options = {"capped": True, "size": MONGODB_LOGS_CAPPED_SIZE_MB * 1024 * 1024}
+        else:
+            options = {
+                "timeseries": {"timeField": "timestamp", "granularity": "seconds"},
+                "expireAfterSeconds": MONGODB_LOGS_TTL_DAYS * 24 * 60 * 60,
+            }
+
+        # Create the collection, the other workers may have already created it
+        try:
+            await self.db.create_collection("logs", **options)
+        except CollectionInvalid:
+            pass
+        except OperationFailure as e:
+            # NamespaceExists
+            if e.code != 48:
+                raise
+
+        # Create the indexes
+        for keys in LOGS_INDEXES:
+            await self.logs.create_index(keys)
+
+    async def setup_conversations(self) -> None:
+        """
+        Create the indexes of the collection for the archived chat history messages.
+        Existing indexes are left as they are.
+        """
+        for keys in CONVERSATIONS_INDEXES:
+            await self.conversations.create_index(keys)
+
+    async def insert_pdf(self, metadata: dict, text: str, pages: list[dict] | None = None) -> str:
         """
         Insert a PDF document into the database.
 
@@ -78,6 +158,9 @@ class MongoClient:
         text : str
             The text content of the PDF document.
 
+        pages : list[dict] | None
+            The offsets of the pages in the text content.
+
         Returns
         -------
         pdf_id : str
@@ -85,7 +168,7 @@ class MongoClient:
             If the document was not inserted, raise an exception.
         """
         # Insert the PDF document
-        result = await self.pdfs.insert_one({"metadata": metadata, "text": text})
+        result = await self.pdfs.insert_one({"metadata": metadata, "text": text, "pages": pages})
 
         # Check if the document was inserted
         pdf_id = result.inserted_id
@@ -94,6 +177,45 @@ class MongoClient:
 
         return str(pdf_id)
 
+    async def insert_pdfs(self, pdfs: list[dict]) -> list[str]:
+        """
+        Insert many PDF documents into the database with a single request.
+        The documents with a `pdf_id` are inserted with it as their ID, \
+        and the ones whose ID already exists are skipped as already inserted, \
+        so the same documents can be inserted again safely.
+
+        Parameters
+        ----------
+        pdfs : list[dict]
+            The PDF documents with their metadata, text content, page offsets and optionally their IDs.
+
+        Returns
+        -------
+        pdf_ids : list[str]
+            The IDs of the inserted (or already inserted) PDF documents, in the order of the documents.
+            If the documents were not inserted, raise an exception.
+        """
+        documents = [
+            {"metadata": pdf["metadata"], "text": pdf["text"], "pages": pdf.get("pages")}
+            | ({"_id": ObjectId(pdf["pdf_id"])} if pdf.get("pdf_id") else {})
+            for pdf in pdfs
+        ]
+
+        try:
+            result = await self.pdfs.insert_many(documents, ordered=False)
+            inserted_ids = result.inserted_ids
+        except BulkWriteError as e:
+            # DuplicateKey
+            if any(error["code"] != 11000 for error in e.details.get("writeErrors", [])):
+                raise
+            inserted_ids = [document["_id"] for document in documents]
+
+        # Check if the documents were inserted
+        if len(inserted_ids) != len(documents):
+            raise Exception("Failed to insert pdf documents (MongoDB).")
+
+        return [str(pdf_id) for pdf_id in inserted_ids]
+
     async def find_pdf(self, pdf_id: str | ObjectId) -> dict:
         """
         Find a PDF document by its ID.
@@ -118,6 +240,54 @@ class MongoClient:
 
         return pdf
 
+    async def iter_pdfs(self) -> AsyncGenerator[dict, None]:
+        """
+        Iterate over the text contents of all PDF documents, in the order of their IDs.
+
+        Yields
+        ------
+        pdf : dict
+            The ID, text content and page offsets of a PDF document.
+        """
+        async for pdf in self.pdfs.find({}, {"text": 1, "pages": 1}).sort("_id", 1):
+            yield pdf
+
+    async def pdfs_without_digest(self, pdf_ids: list[str]) -> set[str]:
+        """
+        Find the PDF documents that have no digest yet.
+
+        Parameters
+        ----------
+        pdf_ids : list[str]
+            The IDs of the PDF documents.
+
+        Returns
+        -------
+        pdf_ids : set[str]
+            The IDs of the given PDF documents without a digest.
+        """
+        query = {"_id": {"$in": [ObjectId(pdf_id) for pdf_id in pdf_ids]}, "digest": {"$exists": False}}
+        return {str(pdf["_id"]) async for pdf in self.pdfs.find(query, {"_id": 1})}
+
+    async def set_digest(self, pdf_id: str, digest: dict) -> None:
+        """
+        Store the digest of a PDF document with the document.
+        If the document is not found, raise an exception.
+
+        Parameters
+        ----------
+        pdf_id : str
+            The ID of the PDF document.
+
+        digest : dict
+            The digest with the summary, the outline and the key terms.
+        """
+        result = await self.pdfs.update_one({"_id": ObjectId(pdf_id)}, {"$set": {"digest": digest}})
+
+        # Check if the document was found
+        if result.matched_count == 0:
+            raise Exception(f"Failed to find document with ID {pdf_id} (MongoDB).")
+
     async def insert_log(self, log: dict) -> str:
         """
         Insert a log into the database.
@@ -142,3 +312,182 @@ class MongoClient:
             raise Exception("Failed to insert log document (MongoDB).")
 
         return str(log_id)
+
+    async def archive_messages(self, messages: list[dict]) -> None:
+        """
+        Insert chat history messages into the archive with a single request.
+
+        Parameters
+        ----------
+        messages : list[dict]
+            The messages with the PDF ID of their chat history ("pdf_id"), the message ("message") \
+            and the time of the message as a timestamp ("timestamp"), oldest first.
+        """
+        documents = [
+            {
+                "pdf_id": message["pdf_id"],
+                "message": message["message"],
+                "timestamp": datetime.fromtimestamp(message["timestamp"]),
+            }
+            for message in messages
+        ]
+        await self.conversations.insert_many(documents, ordered=True)
+
+    async def recent_messages(self, pdf_id: str, limit: int) -> list[dict]:
+        """
+        Find the last archived messages of a chat history.
+
+        Parameters
+        ----------
+        pdf_id : str
+            The ID of the PDF document of the chat history.
+
+        limit : int
+            The maximum number of messages.
+
+        Returns
+        -------
+        messages : list[dict]
+            The last messages of the chat history, oldest first.
+        """
+        cursor = (
+            self.conversations.find({"pdf_id": pdf_id}, {"message": True})
+            .sort([("timestamp", DESCENDING), ("_id", DESCENDING)])
+            .limit(limit)
+        )
+        documents = await cursor.to_list(length=limit)
+        return [document["message"] for document in reversed(documents)]
+
+    async def usage_report(self, days: int, pdf_id: str | None = None) -> dict:
+        """
+        Aggregate the usage logs of the chat turns of the last days.
+        The token counts and the prompt sizes are summed, \
+        and the percentiles in `USAGE_PERCENTILES` of the timings are computed \
+        per PDF document and per day.
+
+        Parameters
+        ----------
+        days : int
+            The number of days to aggregate.
+
+        pdf_id : str | None
+            The ID of the PDF document to aggregate.
+            If it is None, all PDF documents are aggregated.
+
+        Returns
+        -------
+        report : dict
+            The totals and percentiles per PDF document ("documents"), most turns first, \
+            and per day ("days"), oldest first.
+        """
+        match = {"usage": {"$exists": True}, "timestamp": {"$gte": datetime.now() - timedelta(days=days)}}
+        if pdf_id is not None:
+            match["pdf_id"] = pdf_id
+
+        def group(key: object) -> dict:
+            fields = {
+                "_id": key,
+                "turns": {"$sum": 1},
+                "prompt_tokens": {"$sum": "$usage.prompt_tokens"},
+                "response_tokens": {"$sum": "$usage.response_tokens"},
+                "document_chars": {"$sum": "$usage.prompt_chars.document"},
+                "history_chars": {"$sum": "$usage.prompt_chars.history"},
+                "message_chars": {"$sum": "$usage.prompt_chars.message"},
+            }
+            for timing in USAGE_TIMINGS:
+                fields[timing] = {
+                    "$percentile": {"input": f"$usage.{timing}", "p": USAGE_PERCENTILES, "method": "approximate"}
+                }
+            return {"$group": fields}
+
+        pipeline = [
+            {"$match": match},
+            {
+                "$facet": {
+                    "documents": [group("$pdf_id"), {"$sort": {"turns": DESCENDING}}],
+                    "days": [
+                        group({"$dateTrunc": {"date": "$timestamp", "unit": "day"}}),
+                        {"$sort": {"_id": ASCENDING}},
+                    ],
+                }
+            },
+        ]
+        result = await self.logs.aggregate(pipeline).to_list(length=1)
+
+        # Name the group keys and the percentiles
+        report = {}
+        for facet, key in (("documents", "pdf_id"), ("days", "day")):
+            report[facet] = []
+            for item in result[0][facet] if result else []:
+                item[key] = item.pop("_id")
+                for timing in USAGE_TIMINGS:
+                    item[timing] = {f"p{round(p * 100)}": value for p, value in zip(USAGE_PERCENTILES, item[timing])}
+                report[facet].append(item)
+
+        return report
+
+    async def latency_report(self, minutes: int, route: str | None = None) -> dict:
+        """
+        Aggregate the completed request logs of the last minutes.
+        The percentiles in `LATENCY_PERCENTILES` of the durations are computed \
+        per route and status code, and the error rates are computed per route.
+        The number of requests includes the requests dropped by the log sampling, \
+        while the durations are only known for the recorded requests.
+
+        Parameters
+        ----------
+        minutes : int
+            The number of minutes to aggregate.
+
+        route : str | None
+            The route template to aggregate. (e.g., /v1/chat/{pdf_id})
+            If it is None, all routes are aggregated.
+
+        Returns
+        -------
+        report : dict
+            The request counts and duration percentiles per route and status code ("latency"), \
+            and the request counts and error rates per route ("errors"), most requests first.
+        """
+        # The match uses the timestamp index, or the route index if a route is given
+        match = {"timestamp": {"$gte": datetime.now() - timedelta(minutes=minutes)}}
+        if route is not None:
+            match["route"] = route
+        match["duration_ms"] = {"$exists": True}
+
+        requests = {"$sum": {"$add": [1, {"$ifNull": ["$sampling.dropped", 0]}]}}
+        pipeline = [
+            {"$match": match},
+            {
+                "$group": {
+                    "_id": {"route": "$route", "status_code": "$status_code"},
+                    "requests": requests,
+                    "recorded": {"$sum": 1},
+                    "duration_ms": {
+                        "$percentile": {"input": "$duration_ms", "p": LATENCY_PERCENTILES, "method": "approximate"}
+                    },
+                }
+            },
+            {"$sort": {"requests": DESCENDING}},
+        ]
+        groups = await self.logs.aggregate(pipeline).to_list(length=None)
+
+        # Name the percentiles and sum the requests per route
+        latency, errors = [], {}
+        for group in groups:
+            key = group.pop("_id")
+            percentiles = zip(LATENCY_PERCENTILES, group.pop("duration_ms"))
+            latency.append(key | group | {f"p{round(p * 100)}": value for p, value in percentiles})
+
+            counts = errors.setdefault(key["route"], {"route": key["route"], "requests": 0, "errors": 0})
+            counts["requests"] += group["requests"]
+            if key["status_code"] is not None and key["status_code"] >= 500:
+                counts["errors"] += group["requests"]
+
+        for counts in errors.values():
+            counts["error_rate"] = counts["errors"] / counts["requests"]
+
+        return {
+            "latency": latency,
+            "errors": sorted(errors.values(), key=lambda counts: counts["requests"], reverse=True),
+        }
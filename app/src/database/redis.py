@@ -1,18 +1,85 @@
-import json
 import os
+import time
+import zlib
 
 import redis.asyncio as redis
 
+from ..utils.serialization import dumps, loads
+
 # Environment variable/s
 REDIS_HOST = os.getenv("REDIS_HOST", None)
 REDIS_PASSWORD = os.getenv("REDIS_PASSWORD", None)
 REDIS_LIST_LIMIT = int(os.getenv("REDIS_LIST_LIMIT", 30))
+REDIS_PDF_CACHE_TTL = int(os.getenv("REDIS_PDF_CACHE_TTL", 3600))
+REDIS_HISTORY_TTL = int(os.getenv("REDIS_HISTORY_TTL", 86400))
 
 if REDIS_HOST is None or REDIS_PASSWORD is None:
     raise ValueError("Redis environment variables are not set.")
 
 DEV_MODE = os.getenv("DEV_MODE", "false").lower() == "true"
 
+# Constants
+PDF_CACHE_PREFIX = "pdf:"
+PDF_CACHE_HITS_KEY = "metrics:pdf_cache:hits"
+PDF_CACHE_MISSES_KEY = "metrics:pdf_cache:misses"
+CHAT_CANCELLED_KEY = "metrics:chat:cancelled"
+DEADLINE_EXCEEDED_KEY = "metrics:deadline_exceeded"
+INFLIGHT_KEY = "metrics:affinity:inflight"
+INFLIGHT_HEARTBEAT_KEY = "metrics:affinity:heartbeat"
+INFLIGHT_TTL = 60
+HISTORY_ARCHIVE_KEY = "history:archive"
+RATE_LIMIT_PREFIX = "ratelimit:"
+
+# The bucket is refilled by the elapsed time on the Redis clock, so all workers and nodes share it
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2]) / 1000
+local clock = redis.call("TIME")
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+
+local bucket = redis.call("HMGET", KEYS[1], "tokens", "timestamp")
+local tokens = tonumber(bucket[1]) or capacity
+local timestamp = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - timestamp) * rate)
+
+local allowed = 0
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_after = math.ceil((1 - tokens) / rate)
+end
+
+local reset = math.ceil((capacity - tokens) / rate)
+redis.call("HSET", KEYS[1], "tokens", tostring(tokens), "timestamp", now)
+redis.call("PEXPIRE", KEYS[1], reset + 1000)
+
+return {allowed, math.floor(tokens), retry_after, reset}
+"""
+
+# The count of a worker is stamped with the Redis clock, so a count that is not refreshed expires on all nodes
+INFLIGHT_SET_SCRIPT = """
+local clock = redis.call("TIME")
+if tonumber(ARGV[2]) > 0 then
+    redis.call("HSET", KEYS[1], ARGV[1], ARGV[2])
+    redis.call("ZADD", KEYS[2], tonumber(clock[1]), ARGV[1])
+else
+    redis.call("HDEL", KEYS[1], ARGV[1])
+    redis.call("ZREM", KEYS[2], ARGV[1])
+end
+"""
+
+INFLIGHT_GET_SCRIPT = """
+local clock = redis.call("TIME")
+local expired = redis.call("ZRANGEBYSCORE", KEYS[2], "-inf", tonumber(clock[1]) - tonumber(ARGV[1]))
+if #expired > 0 then
+    redis.call("HDEL", KEYS[1], unpack(expired))
+    redis.call("ZREM", KEYS[2], unpack(expired))
+end
+return redis.call("HGETALL", KEYS[1])
+"""
+
 
 class RedisClient:
     """
@@ -22,12 +89,29 @@ class RedisClient:
     def __init__(self) -> None:
         """
         Constructor method for `RedisClient`.
+
+        Attributes
+        ----------
+        client : redis.Redis
+            The Redis client.
+
+        token_bucket : AsyncScript
+            The token bucket script of the rate limits.
+
+        inflight_set : AsyncScript
+            The script that sets the number of requests in progress on a worker.
+
+        inflight_get : AsyncScript
+            The script that removes the expired counts and reads the others.
         """
         self.client = redis.Redis(
             host=REDIS_HOST if not DEV_MODE else "localhost",
             port=6379 if not DEV_MODE else int(os.getenv("REDIS_PORT", 6379)),
             password=REDIS_PASSWORD,
         )
+        self.token_bucket = self.client.register_script(TOKEN_BUCKET_SCRIPT)
+        self.inflight_set = self.client.register_script(INFLIGHT_SET_SCRIPT)
+        self.inflight_get = self.client.register_script(INFLIGHT_GET_SCRIPT)
 
     async def close(self) -> None:
         """
@@ -44,6 +128,9 @@ class RedisClient:
     async def push(self, key: str, content: list[dict]) -> None:
         """
         Push content to a list in Redis with the given key.
+        Only the last `REDIS_LIST_LIMIT` items are kept, and the key expires \
+        after `REDIS_HISTORY_TTL` seconds without a push or a read.
+        The items are also queued for the archive in MongoDB, so the trimmed and expired items are not lost.
 
         Parameters
         ----------
@@ -53,13 +140,39 @@ class RedisClient:
         content : list[dict]
             The content to push to the list.
         """
-        for item in content:
-            item = json.dumps(item)
-            await self.client.rpush(key, item)
+        if not content:
+            return
+
+        timestamp = time.time()
+        archived = [dumps({"pdf_id": key, "message": item, "timestamp": timestamp}) for item in content]
+
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.rpush(key, *[dumps(item) for item in content])
+            pipe.ltrim(key, -REDIS_LIST_LIMIT, -1)
+            if REDIS_HISTORY_TTL > 0:
+                pipe.expire(key, REDIS_HISTORY_TTL)
+            pipe.rpush(HISTORY_ARCHIVE_KEY, *archived)
+            await pipe.execute()
+
+    async def restore(self, key: str, content: list[dict]) -> None:
+        """
+        Replace a list in Redis with content loaded from the archive.
+        The content is not queued for the archive again.
+
+        Parameters
+        ----------
+        key : str
+            The key of the list.
 
-            # Check if the list is too long
-            if await self.length(key) > REDIS_LIST_LIMIT:
-                await self.pop(key)
+        content : list[dict]
+            The content of the list.
+        """
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.delete(key)
+            pipe.rpush(key, *[dumps(item) for item in content[-REDIS_LIST_LIMIT:]])
+            if REDIS_HISTORY_TTL > 0:
+                pipe.expire(key, REDIS_HISTORY_TTL)
+            await pipe.execute()
 
     async def pop(self, key: str) -> None:
         """
@@ -75,6 +188,7 @@ class RedisClient:
     async def get(self, key: str) -> list[dict] | None:
         """
         Get all items from a list in Redis with the given key.
+        The expiration of the key is extended by `REDIS_HISTORY_TTL` seconds.
 
         Parameters
         ----------
@@ -87,8 +201,13 @@ class RedisClient:
             The items in the list.
             If the list is empty, return None.
         """
-        items = await self.client.lrange(key, 0, -1)
-        items = [json.loads(item) for item in items]
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.lrange(key, 0, -1)
+            if REDIS_HISTORY_TTL > 0:
+                pipe.expire(key, REDIS_HISTORY_TTL)
+            items, *_ = await pipe.execute()
+
+        items = [loads(item) for item in items]
         if len(items) == 0:
             return None
         return items
@@ -108,3 +227,231 @@ class RedisClient:
             The length of the list.
         """
         return await self.client.llen(key)
+
+    async def get_pdf(self, pdf_id: str) -> dict | None:
+        """
+        Get a cached PDF document with the given ID.
+        The hit/miss counters are incremented in Redis, \
+        so the hit rate is shared by all workers.
+
+        Parameters
+        ----------
+        pdf_id : str
+            The ID of the PDF document.
+
+        Returns
+        -------
+        pdf : dict | None
+            The PDF document with its metadata, text, page offsets and digest.
+            If the document is not cached, return None.
+        """
+        value = await self.client.get(PDF_CACHE_PREFIX + pdf_id)
+        if value is None:
+            await self.client.incr(PDF_CACHE_MISSES_KEY)
+            return None
+
+        await self.client.incr(PDF_CACHE_HITS_KEY)
+        return loads(zlib.decompress(value))
+
+    async def set_pdf(self, pdf_id: str, pdf: dict) -> None:
+        """
+        Cache a PDF document with the given ID.
+        Only the metadata, text, page offsets and digest are stored, compressed with zlib.
+        The key expires after `REDIS_PDF_CACHE_TTL` seconds, \
+        so it can be evicted by the `volatile-lfu` policy of the server.
+
+        Parameters
+        ----------
+        pdf_id : str
+            The ID of the PDF document.
+
+        pdf : dict
+            The PDF document.
+        """
+        value = {
+            "metadata": pdf["metadata"],
+            "text": pdf["text"],
+            "pages": pdf.get("pages"),
+            "digest": pdf.get("digest"),
+        }
+        value = zlib.compress(dumps(value))
+        await self.client.set(PDF_CACHE_PREFIX + pdf_id, value, ex=REDIS_PDF_CACHE_TTL)
+
+    async def delete_pdf(self, pdf_id: str) -> None:
+        """
+        Remove a cached PDF document with the given ID, so it is read from MongoDB again.
+
+        Parameters
+        ----------
+        pdf_id : str
+            The ID of the PDF document.
+        """
+        await self.client.delete(PDF_CACHE_PREFIX + pdf_id)
+
+    async def pdf_cache_stats(self) -> dict:
+        """
+        Get the hit/miss statistics of the PDF cache.
+
+        Returns
+        -------
+        stats : dict
+            The number of hits, misses and the hit rate.
+        """
+        hits, misses = await self.client.mget(PDF_CACHE_HITS_KEY, PDF_CACHE_MISSES_KEY)
+        hits, misses = int(hits or 0), int(misses or 0)
+        total = hits + misses
+
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / total if total > 0 else 0.0,
+        }
+
+    async def count_cancelled_chat(self, count: int = 1) -> None:
+        """
+        Increment the number of chat generations cancelled by client disconnects.
+
+        Parameters
+        ----------
+        count : int
+            The number of cancelled generations.
+        """
+        await self.client.incrby(CHAT_CANCELLED_KEY, count)
+
+    async def cancelled_chats(self) -> int:
+        """
+        Get the number of chat generations cancelled by client disconnects.
+
+        Returns
+        -------
+        count : int
+            The number of cancelled generations.
+        """
+        return int(await self.client.get(CHAT_CANCELLED_KEY) or 0)
+
+    async def count_deadline_exceeded(self, stage: str) -> None:
+        """
+        Increment the number of requests that ran out of time at the given stage.
+
+        Parameters
+        ----------
+        stage : str
+            The stage that ran out of time.
+        """
+        await self.client.hincrby(DEADLINE_EXCEEDED_KEY, stage, 1)
+
+    async def deadline_stats(self) -> dict[str, int]:
+        """
+        Get the number of requests that ran out of time per stage.
+
+        Returns
+        -------
+        stats : dict[str, int]
+            The number of deadline breaches by stage.
+        """
+        stats = await self.client.hgetall(DEADLINE_EXCEEDED_KEY)
+        return {stage.decode(): int(count) for stage, count in stats.items()}
+
+    async def set_inflight(self, node: str, worker: str, count: int) -> None:
+        """
+        Set the number of requests in progress on a worker of a node.
+        The count expires after `INFLIGHT_TTL` seconds unless it is set again, \
+        so the requests of a killed worker are not counted forever.
+
+        Parameters
+        ----------
+        node : str
+            The name of the node.
+
+        worker : str
+            The name of the worker. (e.g., hostname:pid)
+
+        count : int
+            The number of requests in progress, the count is removed if it is 0.
+        """
+        await self.inflight_set(keys=[INFLIGHT_KEY, INFLIGHT_HEARTBEAT_KEY], args=[f"{node}|{worker}", count])
+
+    async def inflight_requests(self) -> dict[str, int]:
+        """
+        Get the number of requests in progress per node.
+        The counts of the workers that were not refreshed in `INFLIGHT_TTL` seconds are removed first.
+
+        Returns
+        -------
+        loads : dict[str, int]
+            The number of requests in progress per node.
+        """
+        counts = await self.inflight_get(keys=[INFLIGHT_KEY, INFLIGHT_HEARTBEAT_KEY], args=[INFLIGHT_TTL])
+
+        loads: dict[str, int] = {}
+        for field, count in zip(counts[::2], counts[1::2]):
+            node = field.decode().rpartition("|")[0]
+            loads[node] = loads.get(node, 0) + int(count)
+        return loads
+
+    async def take_token(self, key: str, capacity: int, rate: float) -> tuple[bool, int, int, int]:
+        """
+        Take a token from a token bucket atomically.
+        The bucket holds up to `capacity` tokens and is refilled with `rate` tokens per second.
+        Its key expires when the bucket would be full again.
+
+        Parameters
+        ----------
+        key : str
+            The key of the bucket. (e.g., /v1/chat:ip:127.0.0.1)
+
+        capacity : int
+            The maximum number of tokens in the bucket.
+
+        rate : float
+            The number of tokens added to the bucket per second.
+
+        Returns
+        -------
+        allowed : bool
+            Indicates if a token was taken.
+
+        remaining : int
+            The number of tokens left in the bucket.
+
+        retry_after_ms : int
+            The time in milliseconds until a token is available, 0 if a token was taken.
+
+        reset_ms : int
+            The time in milliseconds until the bucket is full.
+        """
+        allowed, remaining, retry_after_ms, reset_ms = await self.token_bucket(
+            keys=[RATE_LIMIT_PREFIX + key], args=[capacity, rate]
+        )
+        return bool(allowed), int(remaining), int(retry_after_ms), int(reset_ms)
+
+    async def take_archive(self, count: int) -> list[dict]:
+        """
+        Take the oldest items queued for the archive.
+        The items are removed from the queue, so each item is taken by a single worker.
+
+        Parameters
+        ----------
+        count : int
+            The maximum number of items to take.
+
+        Returns
+        -------
+        items : list[dict]
+            The items with the key of their list ("pdf_id"), the item ("message") \
+            and the time of the push ("timestamp"), oldest first.
+        """
+        items = await self.client.lpop(HISTORY_ARCHIVE_KEY, count)
+        return [loads(item) for item in items or []]
+
+    async def return_archive(self, items: list[dict]) -> None:
+        """
+        Put items taken from the archive queue back to its front, in the same order.
+
+        Parameters
+        ----------
+        items : list[dict]
+            The items taken with `take_archive`.
+        """
+        if items:
+            await self.client.lpush(HISTORY_ARCHIVE_KEY, *[dumps(item) for item in reversed(items)])
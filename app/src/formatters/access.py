@@ -1,19 +1,16 @@
 import http
 import logging
-import os
-from copy import copy
-from datetime import datetime, timedelta
 
 import click
 from uvicorn.logging import AccessFormatter as UvicornAccessFormatter
 
+from .base import BOLD_STYLE, FastFormatterMixin
+
 # Constants
 TRACE_LOG_LEVEL = 5
-PID_MAX_LENGTH = len(str(os.getpid())) if len(str(os.getpid())) > 3 else 3 + 5
-LOCAL_OFFSET = timedelta(hours=3)
 
 
-class AccessFormatter(UvicornAccessFormatter):
+class AccessFormatter(FastFormatterMixin, UvicornAccessFormatter):
     """
     Formatter for access handler.
     This formatter colorizes the status code \
@@ -34,6 +31,18 @@ class AccessFormatter(UvicornAccessFormatter):
         logging.CRITICAL: lambda level_name: click.style(str(level_name), fg="bright_red", bold=True),
     }
 
+    def __init__(self, *args, **kwargs) -> None:
+        """
+        Initialize the formatter.
+
+        Attributes
+        ----------
+        _status_codes : dict[int, str]
+            The formatted status codes and their phrases.
+        """
+        super().__init__(*args, **kwargs)
+        self._status_codes = {}
+
     def color_default(self, asctime: str, level_no: int) -> str:
         """
         Colorize the asctime based on the log level.
@@ -65,6 +74,7 @@ class AccessFormatter(UvicornAccessFormatter):
         If no valid status code is provided, \
         the status code is retured without a phrase.
         If use_colors is True, the status code is colorized.
+        The result is cached per status code.
 
         Parameters
         ----------
@@ -76,6 +86,10 @@ class AccessFormatter(UvicornAccessFormatter):
         status_and_phrase : str
             The status code and its phrase.
         """
+        status_and_phrase = self._status_codes.get(status_code)
+        if status_and_phrase is not None:
+            return status_and_phrase
+
         try:
             status_phrase = http.HTTPStatus(status_code).phrase
         except ValueError:
@@ -91,54 +105,11 @@ class AccessFormatter(UvicornAccessFormatter):
                 return status_and_phrase
 
             func = self.status_code_colours.get(status_code // 100, default)
-            return func(status_and_phrase)
+            status_and_phrase = func(status_and_phrase)
 
+        self._status_codes[status_code] = status_and_phrase
         return status_and_phrase
 
-    def normalize_default(self, recordcopy: logging.LogRecord) -> logging.LogRecord:
-        """
-        Formats the default log record's message such that \
-        the record's attributes are changed with a pattern \
-        and the message is colorized.
-
-        Parameters
-        ----------
-        recordcopy : logging.LogRecord
-            The log record to format.
-        """
-        correlation_id = recordcopy.__dict__.get("correlation_id", "")
-        levelname = recordcopy.levelname
-        asctime = recordcopy.__dict__.get("asctime", "")
-        if asctime != "":
-            asctime = (datetime.strptime(asctime, "%Y-%m-%d %H:%M:%S,%f") + LOCAL_OFFSET).strftime(
-                "%Y-%m-%d %H:%M:%S,%f"
-            )[:-3]
-        _norm_process = "PID: " + str(recordcopy.__dict__.get("process", ""))
-        process = _norm_process + " " * (PID_MAX_LENGTH - len(_norm_process))
-        message = recordcopy.__dict__.get("message", "")
-        module = recordcopy.__dict__.get("module", "")
-        lineno = recordcopy.__dict__.get("lineno", "")
-        seperator = " " * (8 - len(recordcopy.levelname))
-
-        # Colorize if use_colors is True
-        if self.use_colors:
-            correlation_id = self.color_default(correlation_id, recordcopy.levelno)
-            levelname = self.color_level_name(levelname, recordcopy.levelno)
-            asctime = self.color_default(asctime, recordcopy.levelno)
-            message = click.style(message, fg="bright_white")
-            process = self.color_default(process, recordcopy.levelno)
-            module = click.style(str(module), fg="bright_white")
-            lineno = click.style(str(lineno), fg="bright_white")
-
-        # Update the record's attributes
-        recordcopy.asctime = asctime
-        recordcopy.message = message
-        recordcopy.module = module
-        recordcopy.lineno = lineno
-        recordcopy.__dict__["pid"] = process
-        recordcopy.__dict__["correlation_id"] = correlation_id
-        recordcopy.__dict__["levelprefix"] = levelname + ":" + seperator
-
     def formatMessage(self, record: logging.LogRecord) -> str:
         """
         Format the HTTP log record's message such that \
@@ -155,13 +126,15 @@ class AccessFormatter(UvicornAccessFormatter):
         formatted_message : str
             The formatted message.
         """
-        recordcopy = copy(record)
-        self.normalize_default(recordcopy)
-        client_addr, method, full_path, http_version, status_code = recordcopy.args
+        fields = self.default_fields(record)
+        client_addr, method, full_path, http_version, status_code = record.args
         status_code = self.get_status_code(int(status_code))
         request_line = "%s %s HTTP/%s" % (method, full_path, http_version)
         if self.use_colors:
-            request_line = click.style(request_line, bold=True)
-        recordcopy.message = f'{client_addr} - "{request_line}" {status_code}'
+            request_line = BOLD_STYLE[0] + request_line + BOLD_STYLE[1]
+        fields["message"] = f'{client_addr} - "{request_line}" {status_code}'
+        fields["client_addr"] = client_addr
+        fields["request_line"] = request_line
+        fields["status_code"] = status_code
 
-        return super().formatMessage(recordcopy)
+        return self.format_fields(record, fields)
@@ -0,0 +1,245 @@
+import logging
+import os
+import time
+from collections import ChainMap
+from copy import copy
+
+import click
+
+# Constants
+PID_MAX_LENGTH = len(str(os.getpid())) if len(str(os.getpid())) > 3 else 3 + 5
+LOCAL_OFFSET_SECONDS = 3 * 60 * 60
+STYLE_MARKER = "\x00"
+
+
+def style_parts(text_style: str) -> tuple[str, str]:
+    """
+    Split a styled marker into the escape sequences before and after the text.
+
+    Parameters
+    ----------
+    text_style : str
+        The styled marker. (e.g., `click.style(STYLE_MARKER, fg="red")`)
+
+    Returns
+    -------
+    start : str
+        The escape sequence before the text.
+
+    end : str
+        The escape sequence after the text.
+    """
+    start, end = text_style.split(STYLE_MARKER)
+    return start, end
+
+
+WHITE_STYLE = style_parts(click.style(STYLE_MARKER, fg="bright_white"))
+BOLD_STYLE = style_parts(click.style(STYLE_MARKER, bold=True))
+
+
+class FastFormatterMixin:
+    """
+    Mixin for the formatters of the application.
+    It formats the records without copying them, \
+    and it caches the level prefixes, the color escape sequences, \
+    the PID field and the date part of the asctime.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        """
+        Initialize the formatter.
+
+        Attributes
+        ----------
+        _level_styles : dict[int, tuple[str, str]]
+            The color escape sequences per log level.
+
+        _level_prefixes : dict[tuple[int, str], str]
+            The level prefixes per log level and level name.
+
+        _processes : dict[int, str]
+            The PID fields per process ID.
+
+        _asctime_cache : tuple[int, str]
+            The last formatted second and its date part.
+        """
+        super().__init__(*args, **kwargs)
+        self._level_styles = {}
+        self._level_prefixes = {}
+        self._processes = {}
+        self._asctime_cache = (None, "")
+
+    def formatTime(self, record: logging.LogRecord, datefmt: str | None = None) -> str:
+        """
+        Format the creation time of the record in the local time zone.
+        The date part is only formatted once per second.
+
+        Parameters
+        ----------
+        record : logging.LogRecord
+            The log record.
+
+        datefmt : str | None
+            The date format. If it is given, the default implementation is used.
+
+        Returns
+        -------
+        asctime : str
+            The formatted creation time.
+        """
+        if datefmt is not None:
+            return super().formatTime(record, datefmt)
+
+        second = int(record.created)
+        cached_second, date = self._asctime_cache
+        if cached_second != second:
+            date = time.strftime("%Y-%m-%d %H:%M:%S", self.converter(second + LOCAL_OFFSET_SECONDS))
+            self._asctime_cache = (second, date)
+
+        return "%s,%03d" % (date, record.msecs)
+
+    def level_style(self, level_no: int) -> tuple[str, str]:
+        """
+        Get the color escape sequences of the given log level.
+
+        Parameters
+        ----------
+        level_no : int
+            The log level number.
+
+        Returns
+        -------
+        style : tuple[str, str]
+            The escape sequences before and after the text.
+        """
+        style = self._level_styles.get(level_no)
+        if style is None:
+            style = style_parts(self.color_default(STYLE_MARKER, level_no))
+            self._level_styles[level_no] = style
+
+        return style
+
+    def level_prefix(self, level_no: int, level_name: str) -> str:
+        """
+        Get the level prefix of the given log level.
+
+        Parameters
+        ----------
+        level_no : int
+            The log level number.
+
+        level_name : str
+            The log level name.
+
+        Returns
+        -------
+        level_prefix : str
+            The level prefix. (e.g., "INFO:    ")
+        """
+        key = (level_no, level_name)
+        prefix = self._level_prefixes.get(key)
+        if prefix is None:
+            seperator = " " * (8 - len(level_name))
+            if self.use_colors:
+                level_name = self.color_level_name(level_name, level_no)
+            prefix = level_name + ":" + seperator
+            self._level_prefixes[key] = prefix
+
+        return prefix
+
+    def process_field(self, process: int | str) -> str:
+        """
+        Get the padded PID field of the given process.
+
+        Parameters
+        ----------
+        process : int | str
+            The process ID.
+
+        Returns
+        -------
+        process_field : str
+            The PID field. (e.g., "PID: 1234")
+        """
+        field = self._processes.get(process)
+        if field is None:
+            field = "PID: " + str(process)
+            field = field + " " * (PID_MAX_LENGTH - len(field))
+            self._processes[process] = field
+
+        return field
+
+    def default_fields(self, record: logging.LogRecord) -> dict:
+        """
+        Get the fields of the record that are changed with a pattern \
+        and colorized if use_colors is True.
+
+        Parameters
+        ----------
+        record : logging.LogRecord
+            The log record.
+
+        Returns
+        -------
+        fields : dict
+            The changed fields of the record.
+        """
+        attributes = record.__dict__
+        correlation_id = attributes.get("correlation_id", "")
+        if correlation_id:
+            correlation_id = f"[{correlation_id}] "
+        asctime = attributes.get("asctime", "")
+        process = self.process_field(attributes.get("process", ""))
+        message = attributes.get("message", "")
+        module = attributes.get("module", "")
+        lineno = attributes.get("lineno", "")
+
+        # Colorize if use_colors is True
+        if self.use_colors:
+            start, end = self.level_style(record.levelno)
+            correlation_id = start + correlation_id + end if correlation_id else correlation_id
+            asctime = start + str(asctime) + end
+            process = start + process + end
+            message = WHITE_STYLE[0] + str(message) + WHITE_STYLE[1]
+            module = WHITE_STYLE[0] + str(module) + WHITE_STYLE[1]
+            lineno = WHITE_STYLE[0] + str(lineno) + WHITE_STYLE[1]
+
+        return {
+            "asctime": asctime,
+            "message": message,
+            "module": module,
+            "lineno": lineno,
+            "correlation_id": correlation_id,
+            "pid": process,
+            "levelprefix": self.level_prefix(record.levelno, record.levelname),
+        }
+
+    def format_fields(self, record: logging.LogRecord, fields: dict) -> str:
+        """
+        Format the record with the changed fields without copying the record.
+        If use_colors is True, the colored message of the record is used if it exists.
+
+        Parameters
+        ----------
+        record : logging.LogRecord
+            The log record.
+
+        fields : dict
+            The changed fields of the record.
+
+        Returns
+        -------
+        formatted_message : str
+            The formatted message.
+        """
+        if self.use_colors and "color_message" in record.__dict__:
+            message = str(record.__dict__["color_message"])
+            fields["message"] = message % record.args if record.args else message
+
+        if type(self._style) is logging.PercentStyle:
+            return self._style._fmt % ChainMap(fields, record.__dict__)
+
+        # Other styles are formatted on a copy of the record
+        recordcopy = copy(record)
+        recordcopy.__dict__.update(fields)
+        return self._style.format(recordcopy)
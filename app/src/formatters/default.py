@@ -1,19 +1,17 @@
 import logging
-import os
-from copy import copy
-from datetime import datetime, timedelta
+from datetime import datetime
 
 import click
 from uvicorn.logging import DefaultFormatter as UvicornDefaultFormatter
 
+from .base import FastFormatterMixin
+
 # Constants
 TRACE_LOG_LEVEL = 5
-PID_MAX_LENGTH = len(str(os.getpid())) if len(str(os.getpid())) > 3 else 3 + 5
-LOCAL_OFFSET = timedelta(hours=3)
 
 
 # Formatters
-class DefaultFormatter(UvicornDefaultFormatter):
+class DefaultFormatter(FastFormatterMixin, UvicornDefaultFormatter):
     """
     Formatter for default handler.
     This formatter colorizes the log level name and the message.
@@ -74,41 +72,4 @@ class DefaultFormatter(UvicornDefaultFormatter):
         formatted_message : str
             The formatted message.
         """
-        recordcopy = copy(record)
-        correlation_id = recordcopy.__dict__.get("correlation_id", "")
-        levelname = recordcopy.levelname
-        asctime = recordcopy.__dict__.get("asctime", "")
-        if asctime != "":
-            asctime = (datetime.strptime(asctime, "%Y-%m-%d %H:%M:%S,%f") + LOCAL_OFFSET).strftime(
-                "%Y-%m-%d %H:%M:%S,%f"
-            )[:-3]
-        _norm_process = "PID: " + str(recordcopy.__dict__.get("process", ""))
-        process = _norm_process + " " * (PID_MAX_LENGTH - len(_norm_process))
-        message = recordcopy.__dict__.get("message", "")
-        module = recordcopy.__dict__.get("module", "")
-        lineno = recordcopy.__dict__.get("lineno", "")
-        seperator = " " * (8 - len(recordcopy.levelname))
-
-        # Colorize if use_colors is True
-        if self.use_colors:
-            correlation_id = self.color_default(correlation_id, recordcopy.levelno)
-            levelname = self.color_level_name(levelname, recordcopy.levelno)
-            asctime = self.color_default(asctime, recordcopy.levelno)
-            message = click.style(message, fg="bright_white")
-            process = self.color_default(process, recordcopy.levelno)
-            module = click.style(str(module), fg="bright_white")
-            lineno = click.style(str(lineno), fg="bright_white")
-            if "color_message" in recordcopy.__dict__:
-                recordcopy.msg = recordcopy.__dict__["color_message"]
-                recordcopy.__dict__["message"] = recordcopy.getMessage()
-
-        # Update the record's attributes
-        recordcopy.asctime = asctime
-        recordcopy.message = message
-        recordcopy.module = module
-        recordcopy.lineno = lineno
-        recordcopy.__dict__["correlation_id"] = correlation_id
-        recordcopy.__dict__["pid"] = process
-        recordcopy.__dict__["levelprefix"] = levelname + ":" + seperator
-
-        return super().formatMessage(recordcopy)
+        return self.format_fields(record, self.default_fields(record))
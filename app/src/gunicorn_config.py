@@ -0,0 +1,53 @@
+import gc
+
+from gunicorn.arbiter import Arbiter
+
+from .logger.logger import (
+    LOG_FILE_BACKUP_COUNT,
+    LOG_FILE_MAX_BYTES,
+    LOGGER_PATH,
+    LOGGER_SINK_COMPRESS,
+    LOGGER_SINK_SOCKET,
+)
+from .logger.sink import LogSink
+
+# Log sink shared by all workers
+LOG_SINK = (
+    LogSink(LOGGER_SINK_SOCKET, LOGGER_PATH, LOG_FILE_MAX_BYTES, LOG_FILE_BACKUP_COUNT, LOGGER_SINK_COMPRESS)
+    if LOGGER_PATH and LOGGER_SINK_SOCKET
+    else None
+)
+
+# Start the log sink when gunicorn loads the config, before the application is preloaded,
+# so the records of the master's import and warm-up are written too (on_starting runs after the preload)
+if LOG_SINK is not None:
+    LOG_SINK.start()
+
+
+def when_ready(server: Arbiter) -> None:
+    """
+    Freeze the objects of the preloaded application before the workers are forked.
+    The frozen objects are ignored by the garbage collector, \
+    so the collections in the workers do not write to the shared pages \
+    and the memory stays shared copy-on-write.
+
+    Parameters
+    ----------
+    server : Arbiter
+        The gunicorn master.
+    """
+    gc.collect()
+    gc.freeze()
+
+
+def on_exit(server: Arbiter) -> None:
+    """
+    Stop the log sink after the workers exit.
+
+    Parameters
+    ----------
+    server : Arbiter
+        The gunicorn master.
+    """
+    if LOG_SINK is not None:
+        LOG_SINK.stop()
@@ -0,0 +1,318 @@
+import argparse
+import asyncio
+import hashlib
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from .database import MongoClient, RedisClient
+from .nlp import create_chat_client
+from .routers.pdf import PDF_DIGEST, build_digest
+from .search import create_search_index
+from .utils import dumps, loads, read_pdf_from_bytes
+
+# Constants
+DEFAULT_BATCH_SIZE = 32
+DEFAULT_DIGEST_CONCURRENCY = 4
+DEFAULT_CHECKPOINT = "ingested.jsonl"
+
+
+def collect_paths(source: Path) -> list[str]:
+    """
+    Collect the paths of the PDF files to ingest.
+    If the source is a directory, its PDF files are collected recursively.
+    Otherwise, it is a manifest with a path on each line, \
+    the relative paths are relative to the manifest, and the empty and "#" lines are skipped.
+
+    Parameters
+    ----------
+    source : Path
+        The directory or the manifest.
+
+    Returns
+    -------
+    paths : list[str]
+        The paths of the PDF files, without duplicates.
+    """
+    if source.is_dir():
+        paths = sorted(path for path in source.rglob("*") if path.suffix.lower() == ".pdf" and path.is_file())
+    else:
+        lines = [line.strip() for line in source.read_text().splitlines()]
+        paths = [source.parent / line for line in lines if line and not line.startswith("#")]
+
+    return list(dict.fromkeys(str(path) for path in paths))
+
+
+def read_checkpoint(checkpoint: Path) -> dict[str, str]:
+    """
+    Read the PDF IDs of the files ingested by the previous runs.
+
+    Parameters
+    ----------
+    checkpoint : Path
+        The checkpoint file, with a JSON line for each ingested or failed file.
+
+    Returns
+    -------
+    pdf_ids : dict[str, str]
+        The PDF IDs of the ingested files by their paths.
+        The failed files are not included, so they are tried again.
+    """
+    if not checkpoint.exists():
+        return {}
+
+    pdf_ids = {}
+    for line in checkpoint.read_bytes().splitlines():
+        # The last line may be cut by an interruption
+        try:
+            entry = loads(line)
+        except ValueError:
+            continue
+        if entry.get("pdf_id"):
+            pdf_ids[entry["path"]] = entry["pdf_id"]
+
+    return pdf_ids
+
+
+def pdf_id_of(path: str, content: bytes) -> str:
+    """
+    Derive the ID of an ingested PDF file from its path and content.
+    So, the file gets the same ID on each run, and it is inserted once.
+
+    Parameters
+    ----------
+    path : str
+        The path of the PDF file.
+
+    content : bytes
+        The content of the PDF file.
+
+    Returns
+    -------
+    pdf_id : str
+        The ID of the PDF document, a valid ObjectId.
+    """
+    digest = hashlib.blake2b(path.encode(), digest_size=12)
+    digest.update(content)
+    return digest.hexdigest()
+
+
+def parse_file(path: str) -> dict:
+    """
+    Parse a PDF file with the same extraction and limits as the upload endpoint.
+    It runs in the worker processes of the pool.
+
+    Parameters
+    ----------
+    path : str
+        The path of the PDF file.
+
+    Returns
+    -------
+    pdf : dict
+        The path, ID, metadata, text content and page offsets of the PDF file.
+        If the file cannot be read or parsed, the path and the error.
+    """
+    try:
+        content = Path(path).read_bytes()
+        metadata, text, pages = read_pdf_from_bytes(Path(path).name, content)
+    except Exception as e:
+        return {"path": path, "error": str(e) or repr(e)}
+
+    return {"path": path, "pdf_id": pdf_id_of(path, content), "metadata": metadata, "text": text, "pages": pages}
+
+
+class Progress:
+    """
+    Throughput of an ingestion run.
+    """
+
+    def __init__(self, total: int) -> None:
+        """
+        Constructor method for `Progress`.
+
+        Parameters
+        ----------
+        total : int
+            The number of files to ingest.
+
+        Attributes
+        ----------
+        files : int
+            The number of ingested files.
+
+        pages : int
+            The number of extracted pages of the ingested files.
+
+        failed : int
+            The number of files that failed.
+
+        start : float
+            The start time of the run.
+        """
+        self.total = total
+        self.files = 0
+        self.pages = 0
+        self.failed = 0
+        self.start = time.perf_counter()
+
+    def report(self) -> str:
+        """
+        Describe the progress and the throughput since the start.
+
+        Returns
+        -------
+        report : str
+            The processed files, failures, and files and pages per second.
+        """
+        elapsed = max(time.perf_counter() - self.start, 1e-9)
+        return (
+            f"{self.files + self.failed}/{self.total} files ({self.failed} failed) in {elapsed:.1f} s | "
+            + f"{self.files / elapsed:.2f} files/s | {self.pages / elapsed:.1f} pages/s"
+        )
+
+
+async def ingest(
+    paths: list[str],
+    checkpoint: Path,
+    workers: int | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    digest_concurrency: int = DEFAULT_DIGEST_CONCURRENCY,
+    verbose: bool = True,
+) -> dict[str, str]:
+    """
+    Ingest PDF files into MongoDB without the HTTP API.
+    The files are parsed in a process pool, and the documents are inserted in batches of `batch_size`.
+    After each batch, the paths and the PDF IDs (or the errors) are appended to the checkpoint, \
+    so an interrupted run continues from the last completed batch.
+    The IDs are derived from the paths and the contents of the files, \
+    so the documents of the interrupted batch that were already inserted are not inserted again.
+    If `SEARCH_INDEX_PATH` is set, the passages of each batch are added to the search index before the checkpoint, \
+    except the documents that are already in the index.
+    If `PDF_DIGEST` is set, the digests of the documents of each batch that have no digest yet \
+    are created before the checkpoint, `digest_concurrency` at a time, and any failure is logged.
+
+    Parameters
+    ----------
+    paths : list[str]
+        The paths of the PDF files.
+
+    checkpoint : Path
+        The checkpoint file, it is also the mapping from the paths to the PDF IDs.
+
+    workers : int | None
+        The number of worker processes. If it is None, the number of CPUs is used.
+
+    batch_size : int
+        The number of documents inserted with a single request.
+
+    digest_concurrency : int
+        The number of digests created at the same time.
+
+    verbose : bool
+        Whether to print the progress after each batch.
+
+    Returns
+    -------
+    pdf_ids : dict[str, str]
+        The PDF IDs of all ingested files by their paths, including the previous runs.
+    """
+    pdf_ids = read_checkpoint(checkpoint)
+    pending = [path for path in paths if path not in pdf_ids]
+    progress = Progress(len(pending))
+
+    loop = asyncio.get_running_loop()
+    workers = workers or os.cpu_count() or 1
+
+    context = multiprocessing.get_context("fork")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool, checkpoint.open("ab") as file:
+        # The workers are forked on the first task, before the database client starts its threads
+        await loop.run_in_executor(pool, os.getpid)
+        db = MongoClient()
+        index = create_search_index()
+        cache = RedisClient() if PDF_DIGEST else None
+        client = create_chat_client() if PDF_DIGEST else None
+        semaphore = asyncio.Semaphore(digest_concurrency)
+
+        async def digest(pdf: dict) -> None:
+            async with semaphore:
+                await build_digest(db, cache, client, pdf["pdf_id"], pdf["metadata"], pdf["text"])
+
+        async def flush(batch: list[dict]) -> None:
+            parsed = [pdf for pdf in batch if "error" not in pdf]
+            ids = await db.insert_pdfs(parsed) if parsed else []
+            for pdf, pdf_id in zip(parsed, ids):
+                pdf_ids[pdf["path"]] = pdf_id
+                progress.files += 1
+                progress.pages += len(pdf["pages"] or [])
+            progress.failed += len(batch) - len(parsed)
+
+            if index is not None:
+                indexed = await asyncio.to_thread(index.contains, ids)
+                for pdf in parsed:
+                    if pdf["pdf_id"] not in indexed:
+                        await asyncio.to_thread(index.add_pdf, pdf["pdf_id"], pdf["text"], pdf["pages"])
+
+            if PDF_DIGEST and ids:
+                undigested = await db.pdfs_without_digest(ids)
+                await asyncio.gather(*[digest(pdf) for pdf in parsed if pdf["pdf_id"] in undigested])
+
+            for pdf in batch:
+                entry = {"path": pdf["path"], "pdf_id": pdf.get("pdf_id"), "error": pdf.get("error")}
+                file.write(dumps(entry) + b"\n")
+            file.flush()
+            os.fsync(file.fileno())
+
+            if verbose:
+                print(progress.report(), flush=True)
+
+        # Keep a bounded number of files in progress, so the parsed documents do not pile up
+        futures, batch = deque(), []
+        for path in pending:
+            futures.append(loop.run_in_executor(pool, parse_file, path))
+            if len(futures) < 2 * workers:
+                continue
+
+            batch.append(await futures.popleft())
+            if len(batch) >= batch_size:
+                await flush(batch)
+                batch = []
+
+        while futures:
+            batch.append(await futures.popleft())
+            if len(batch) >= batch_size or not futures:
+                await flush(batch)
+                batch = []
+
+        await db.close()
+        if cache is not None:
+            await cache.close()
+
+    return pdf_ids
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest PDF files into the database without the HTTP API.")
+    parser.add_argument("source", type=Path, help="A directory of PDF files, or a manifest with a path on each line.")
+    parser.add_argument(
+        "--checkpoint",
+        type=Path,
+        default=Path(DEFAULT_CHECKPOINT),
+        help="The JSON lines file of the paths and PDF IDs, the ingested paths in it are skipped.",
+    )
+    parser.add_argument("--workers", type=int, default=None, help="The number of worker processes.")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="The documents per insert.")
+    parser.add_argument(
+        "--digest-concurrency",
+        type=int,
+        default=DEFAULT_DIGEST_CONCURRENCY,
+        help="The digests created at the same time if PDF_DIGEST is set.",
+    )
+    args = parser.parse_args()
+
+    paths = collect_paths(args.source)
+    pdf_ids = asyncio.run(ingest(paths, args.checkpoint, args.workers, args.batch_size, args.digest_concurrency))
+    print(f"{len(pdf_ids)}/{len(paths)} files are ingested, the PDF IDs are in {args.checkpoint}")
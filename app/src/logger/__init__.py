@@ -1,5 +1,9 @@
-from .logger import LOGGER
+from .logger import CORRELATION_ID, LOGGER, dropped_log_records, start_queue_listeners, stop_queue_listeners
 
 __all__ = [
+    "CORRELATION_ID",
     "LOGGER",
+    "dropped_log_records",
+    "start_queue_listeners",
+    "stop_queue_listeners",
 ]
@@ -1,25 +1,62 @@
 import logging
 import os
+import queue
 import sys
 import traceback
+from contextvars import ContextVar
 from http import HTTPStatus
-from logging import config
+from logging import config, handlers
 from pathlib import Path
 
 import click
 
+from .sink import SinkHandler
+
 # Environment variable/s
 LOGGER_USE_COLORS = os.getenv("LOGGER_USE_COLORS", "false").lower() == "true"
 LOGGER_ENDPOINT_FILTERS = eval(os.getenv("LOGGER_ENDPOINT_FILTERS", "[]"))
 LOGGER_STATUS_FILTERS = eval(os.getenv("LOGGER_STATUS_FILTERS", "[]"))
 LOGGER_SUSPENDED_PACKAGES = eval(os.getenv("LOGGER_SUSPENDED_PACKAGES", "[]"))
 LOGGER_PATH = os.getenv("LOGGER_PATH", "")
+LOGGER_USE_QUEUE = os.getenv("LOGGER_USE_QUEUE", "false").lower() == "true"
+LOGGER_QUEUE_SIZE = int(os.getenv("LOGGER_QUEUE_SIZE", 10000))
+LOGGER_SINK_SOCKET = os.getenv("LOGGER_SINK_SOCKET", "")
+LOGGER_SINK_COMPRESS = os.getenv("LOGGER_SINK_COMPRESS", "false").lower() == "true"
 
 if LOGGER_PATH == "":
     LOGGER_PATH = None
 
+if LOGGER_SINK_SOCKET == "":
+    LOGGER_SINK_SOCKET = None
+
 # Constants
 AVAILABLE_COLORS = [key for key in click.termui._ansi_colors if key != "reset"]
+QUEUED_LOGGERS = ["", "gunicorn.access", "uvicorn.access"]
+LOG_FILE_MAX_BYTES = 1024 * 1024 * 8
+LOG_FILE_BACKUP_COUNT = 1
+
+# Correlation ID of the current request, it is set by the logger middleware
+CORRELATION_ID: ContextVar[str] = ContextVar("correlation_id", default="")
+BASE_RECORD_FACTORY = logging.getLogRecordFactory()
+
+
+def correlation_record_factory(*args, **kwargs) -> logging.LogRecord:
+    """
+    Create a log record with the correlation ID of the current request.
+    The ID is attached when the record is created, \
+    so it is kept when the record is formatted in a queue listener thread.
+
+    Returns
+    -------
+    record : logging.LogRecord
+        The log record.
+    """
+    record = BASE_RECORD_FACTORY(*args, **kwargs)
+    record.correlation_id = CORRELATION_ID.get()
+    return record
+
+
+logging.setLogRecordFactory(correlation_record_factory)
 
 
 # Colorize text
@@ -154,6 +191,169 @@ COMMON_FILTERS = [EndpointFilter(path) for path in LOGGER_ENDPOINT_FILTERS] + [
 ]
 
 
+# Queue handler and listener
+class BlockingSentinelQueueListener(handlers.QueueListener):
+    """
+    Queue listener that waits for free space to enqueue the sentinel, \
+    so that it can be stopped even if the queue is full.
+    """
+
+    def enqueue_sentinel(self) -> None:
+        """
+        Put the sentinel into the queue to stop the listener.
+        """
+        self.queue.put(self._sentinel)
+
+
+class BoundedQueueHandler(handlers.QueueHandler):
+    """
+    This class is used to move the formatting and I/O of the given handlers \
+    to a listener thread through a bounded queue.
+    If the queue is full, the record is dropped and counted.
+    Until the listener is started in the current process (e.g., in the gunicorn master), \
+    the records are handled synchronously by the given handlers.
+    """
+
+    def __init__(self, targets: list[logging.Handler], maxsize: int) -> None:
+        """
+        Initialize the queue handler.
+
+        Parameters
+        ----------
+        targets : list[logging.Handler]
+            The handlers that the records are dispatched to.
+
+        maxsize : int
+            The maximum number of records in the queue.
+
+        Attributes
+        ----------
+        dropped : int
+            The number of dropped records since the listener started.
+        """
+        super().__init__(queue.Queue(maxsize))
+        self._targets = targets
+        self._maxsize = maxsize
+        self._listener = None
+        self._pid = None
+        self.dropped = 0
+
+    @property
+    def running(self) -> bool:
+        """
+        Indicates if the listener runs in the current process.
+        """
+        return self._pid == os.getpid()
+
+    def start(self) -> None:
+        """
+        Start the listener thread in the current process.
+        A new queue is created, since the queue and the thread are not inherited by forked workers.
+        """
+        if self.running:
+            return
+
+        self.queue = queue.Queue(self._maxsize)
+        self.dropped = 0
+        self._listener = BlockingSentinelQueueListener(self.queue, *self._targets, respect_handler_level=True)
+        self._listener.start()
+        self._pid = os.getpid()
+
+    def stop(self) -> None:
+        """
+        Stop the listener thread after the queued records are handled.
+        """
+        if not self.running:
+            return
+
+        self._pid = None
+        self._listener.stop()
+        self._listener = None
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Prepare the record for the queue.
+        The record is queued as it is, so that the formatters of the targets \
+        (e.g., the access formatter using the record's arguments) work in the listener thread.
+
+        Parameters
+        ----------
+        record : logging.LogRecord
+            The log record to prepare.
+
+        Returns
+        -------
+        record : logging.LogRecord
+            The prepared log record.
+        """
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """
+        Put the record into the queue without blocking.
+        If the queue is full, the record is dropped.
+
+        Parameters
+        ----------
+        record : logging.LogRecord
+            The log record to enqueue.
+        """
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """
+        Emit the record through the queue if the listener runs, otherwise synchronously.
+
+        Parameters
+        ----------
+        record : logging.LogRecord
+            The log record to emit.
+        """
+        if self.running:
+            super().emit(record)
+            return
+
+        for target in self._targets:
+            if record.levelno >= target.level:
+                target.handle(record)
+
+
+QUEUE_HANDLERS: list[BoundedQueueHandler] = []
+
+
+def start_queue_listeners() -> None:
+    """
+    Start the listener threads of the queue handlers.
+    It must be called in each worker after fork.
+    If `LOGGER_USE_QUEUE` is not set, the function does nothing.
+    """
+    for handler in QUEUE_HANDLERS:
+        handler.start()
+
+
+def stop_queue_listeners() -> None:
+    """
+    Stop the listener threads of the queue handlers.
+    """
+    for handler in QUEUE_HANDLERS:
+        handler.stop()
+
+
+def dropped_log_records() -> int:
+    """
+    Get the number of log records dropped because of a full queue.
+
+    Returns
+    -------
+    dropped : int
+        The number of dropped log records in the current worker.
+    """
+    return sum(handler.dropped for handler in QUEUE_HANDLERS)
+
+
 # Logger class
 class Logger:
     """
@@ -176,10 +376,20 @@ class Logger:
 
         _use_colors : bool
             Indicates if the logs are colorized.
+
+        _use_queue : bool
+            Indicates if the handlers are moved behind queue handlers.
+
+        _path_sink_socket : str | None
+            The path to the socket of the log sink.
+            If it is set, the file logs are sent to the log sink \
+            instead of being written by each process.
         """
-        self._formatter = "(%(asctime)s) (%(pid)s) | %(levelprefix)s %(message)s"
+        self._formatter = "(%(asctime)s) (%(pid)s) | %(levelprefix)s %(correlation_id)s%(message)s"
         self._path_file_log = LOGGER_PATH
         self._use_colors = LOGGER_USE_COLORS
+        self._use_queue = LOGGER_USE_QUEUE
+        self._path_sink_socket = LOGGER_SINK_SOCKET
 
     def _check_file_path(self) -> None:
         """
@@ -275,23 +485,23 @@ class Logger:
 
         if self._path_file_log:
             self._check_file_path()
+            if self._path_sink_socket:
+                file_handler = {
+                    "()": SinkHandler,
+                    "path": self._path_sink_socket,
+                }
+            else:
+                file_handler = {
+                    "class": "logging.handlers.RotatingFileHandler",
+                    "filename": self._path_file_log,
+                    "maxBytes": LOG_FILE_MAX_BYTES,
+                    "backupCount": LOG_FILE_BACKUP_COUNT,
+                }
+
             config["handlers"].update(
                 {
-                    "console_file": {
-                        "formatter": "default",
-                        "class": "logging.handlers.RotatingFileHandler",
-                        "filename": self._path_file_log,
-                        "maxBytes": 1024 * 1024 * 8,
-                        "backupCount": 1,
-                    },
-                    "access_file": {
-                        "formatter": "access",
-                        "class": "logging.handlers.RotatingFileHandler",
-                        "filename": self._path_file_log,
-                        "maxBytes": 1024 * 1024 * 8,
-                        "backupCount": 1,
-                        "filters": COMMON_FILTERS,
-                    },
+                    "console_file": file_handler | {"formatter": "default"},
+                    "access_file": file_handler | {"formatter": "access", "filters": COMMON_FILTERS},
                 }
             )
             config["root"]["handlers"].append("console_file")
@@ -313,8 +523,25 @@ class Logger:
         log_config = self.get_config()
         config.dictConfig(log_config)
 
+        if self._use_queue:
+            self._use_queue_handlers()
+
         return logging
 
+    def _use_queue_handlers(self) -> None:
+        """
+        Replace the handlers of the console and access loggers with queue handlers.
+        The listeners are started by `start_queue_listeners` in each worker.
+        """
+        for name in QUEUED_LOGGERS:
+            logger = logging.getLogger(name)
+            if len(logger.handlers) == 0:
+                continue
+
+            handler = BoundedQueueHandler(logger.handlers[:], LOGGER_QUEUE_SIZE)
+            logger.handlers = [handler]
+            QUEUE_HANDLERS.append(handler)
+
 
 # Logger instance
 LOGGER = Logger().configure()
@@ -0,0 +1,345 @@
+import gzip
+import logging
+import os
+import queue
+import shutil
+import signal
+import socketserver
+import struct
+import threading
+import time
+import traceback
+from logging import handlers
+from pathlib import Path
+
+# Constants
+FRAME_HEADER = struct.Struct(">L")
+BATCH_SIZE = 512
+BATCH_TIMEOUT = 0.5
+QUEUE_SIZE = 65536
+STARTUP_TIMEOUT = 5.0
+
+
+class SinkHandler(handlers.SocketHandler):
+    """
+    This class is used to send the formatted log records \
+    to the log sink over a Unix domain socket.
+    The records are formatted in the worker, so the sink only writes the lines.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Initialize the handler.
+
+        Parameters
+        ----------
+        path : str
+            The path to the Unix domain socket of the log sink.
+        """
+        super().__init__(path, None)
+        self._pid = os.getpid()
+
+    def makePickle(self, record: logging.LogRecord) -> bytes:
+        """
+        Create a length-prefixed frame with the formatted record.
+
+        Parameters
+        ----------
+        record : logging.LogRecord
+            The log record to send.
+
+        Returns
+        -------
+        frame : bytes
+            The frame to send.
+        """
+        line = (self.format(record) + "\n").encode("utf-8", errors="replace")
+        return FRAME_HEADER.pack(len(line)) + line
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """
+        Send the record to the log sink.
+        The socket inherited from the parent process is not shared \
+        and each worker opens its own connection.
+
+        Parameters
+        ----------
+        record : logging.LogRecord
+            The log record to send.
+        """
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self.sock = None
+            self.retryTime = None
+
+        super().emit(record)
+
+
+class RotatingWriter:
+    """
+    This class writes the lines into a file and rotates it \
+    when the file size exceeds the limit.
+    The rotated files are optionally compressed by a single background thread, one at a time, \
+    and the backups are shifted by the same thread before each compression, \
+    so a compression never writes or renames a backup that another one is still using.
+    """
+
+    def __init__(self, path: str, max_bytes: int, backup_count: int, compress: bool) -> None:
+        """
+        Initialize the writer.
+
+        Parameters
+        ----------
+        path : str
+            The path to the log file.
+
+        max_bytes : int
+            The maximum size of the log file in bytes.
+
+        backup_count : int
+            The number of rotated files to keep.
+
+        compress : bool
+            Indicates if the rotated files are compressed with gzip.
+        """
+        self._path = path
+        self._max_bytes = max_bytes
+        self._backup_count = backup_count
+        self._compress = compress
+        self._file = open(path, "ab")
+        self._size = self._file.tell()
+        self._rotated = queue.Queue()
+        self._compressor = None
+        if compress:
+            self._compressor = threading.Thread(target=self._compress_rotated, daemon=True)
+            self._compressor.start()
+
+    def _name(self, index: int) -> str:
+        """
+        Get the name of the rotated file with the given index.
+        """
+        return f"{self._path}.{index}" + (".gz" if self._compress else "")
+
+    def _shift(self) -> None:
+        """
+        Shift the backups by one index, the oldest backup is overwritten.
+        """
+        for index in range(self._backup_count - 1, 0, -1):
+            if os.path.exists(self._name(index)):
+                os.replace(self._name(index), self._name(index + 1))
+
+    def _compress_rotated(self) -> None:
+        """
+        Compress the rotated files in the order of their rotations, until None is received.
+        """
+        while (rotated := self._rotated.get()) is not None:
+            try:
+                self._shift()
+                compress_file(rotated, self._name(1))
+            except OSError:
+                pass
+
+    def _rotate(self) -> None:
+        """
+        Rotate the log file and queue the rotated file for compression if needed.
+        """
+        self._file.close()
+
+        if self._backup_count > 0:
+            if self._compress:
+                rotated = f"{self._path}.rotated.{time.time_ns()}"
+                os.replace(self._path, rotated)
+                self._rotated.put(rotated)
+            else:
+                self._shift()
+                os.replace(self._path, self._name(1))
+
+        self._file = open(self._path, "wb")
+        self._size = 0
+
+    def write(self, lines: list[bytes]) -> None:
+        """
+        Write the lines into the log file.
+
+        Parameters
+        ----------
+        lines : list[bytes]
+            The lines to write.
+        """
+        data = b"".join(lines)
+        if self._size > 0 and self._size + len(data) > self._max_bytes:
+            self._rotate()
+
+        self._file.write(data)
+        self._file.flush()
+        self._size += len(data)
+
+    def close(self) -> None:
+        """
+        Close the log file after the queued rotated files are compressed.
+        """
+        self._file.close()
+        if self._compressor is not None:
+            self._rotated.put(None)
+            self._compressor.join()
+
+
+def compress_file(source: str, target: str) -> None:
+    """
+    Compress the source file into the target file with gzip \
+    and remove the source file.
+
+    Parameters
+    ----------
+    source : str
+        The path to the file to compress.
+
+    target : str
+        The path to the compressed file.
+    """
+    with open(source, "rb") as file_in, gzip.open(target + ".tmp", "wb") as file_out:
+        shutil.copyfileobj(file_in, file_out)
+    os.replace(target + ".tmp", target)
+    os.remove(source)
+
+
+def run_sink(socket_path: str, log_path: str, max_bytes: int, backup_count: int, compress: bool) -> None:
+    """
+    Run the log sink.
+    The connections of the workers are served in threads that put the received lines into a queue.
+    The lines are written into the log file in batches by the main thread.
+    At most `QUEUE_SIZE` lines are queued, so the connections wait for the writer instead of filling the memory.
+    The sink stops after the queued lines are written when SIGTERM or SIGINT is received, \
+    or when its parent process exits.
+
+    Parameters
+    ----------
+    socket_path : str
+        The path to the Unix domain socket.
+
+    log_path : str
+        The path to the log file.
+
+    max_bytes : int
+        The maximum size of the log file in bytes.
+
+    backup_count : int
+        The number of rotated files to keep.
+
+    compress : bool
+        Indicates if the rotated files are compressed with gzip.
+    """
+    lines = queue.Queue(maxsize=QUEUE_SIZE)
+    stop = threading.Event()
+    parent = os.getppid()
+
+    class FrameHandler(socketserver.StreamRequestHandler):
+        def handle(self) -> None:
+            while True:
+                header = self.rfile.read(FRAME_HEADER.size)
+                if len(header) < FRAME_HEADER.size:
+                    return
+                lines.put(self.rfile.read(FRAME_HEADER.unpack(header)[0]))
+
+    socketserver.ThreadingUnixStreamServer.daemon_threads = True
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    server = socketserver.ThreadingUnixStreamServer(socket_path, FrameHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+
+    writer = RotatingWriter(log_path, max_bytes, backup_count, compress)
+    while not stop.is_set() or not lines.empty():
+        try:
+            batch = [lines.get(timeout=BATCH_TIMEOUT)]
+        except queue.Empty:
+            if os.getppid() != parent:
+                stop.set()
+            continue
+        while len(batch) < BATCH_SIZE:
+            try:
+                batch.append(lines.get_nowait())
+            except queue.Empty:
+                break
+        writer.write(batch)
+
+    server.shutdown()
+    server.server_close()
+    writer.close()
+    os.remove(socket_path)
+
+
+class LogSink:
+    """
+    This class manages the log sink process.
+    It is started by the gunicorn master, so that all workers \
+    write into the same log file through a single writer.
+    The process is forked directly instead of with `multiprocessing`, \
+    so the workers forked later do not inherit it as their child and do not stop it when they exit.
+    """
+
+    def __init__(
+        self, socket_path: str, log_path: str, max_bytes: int, backup_count: int, compress: bool
+    ) -> None:
+        """
+        Initialize the log sink.
+
+        Parameters
+        ----------
+        socket_path : str
+            The path to the Unix domain socket.
+
+        log_path : str
+            The path to the log file.
+
+        max_bytes : int
+            The maximum size of the log file in bytes.
+
+        backup_count : int
+            The number of rotated files to keep.
+
+        compress : bool
+            Indicates if the rotated files are compressed with gzip.
+        """
+        self._socket_path = socket_path
+        self._args = (socket_path, log_path, max_bytes, backup_count, compress)
+        self._pid = None
+
+    def start(self) -> None:
+        """
+        Start the log sink process and wait until its socket is ready.
+        The process exits with `os._exit`, so the exit handlers of the master are not run in it.
+        """
+        Path(self._socket_path).unlink(missing_ok=True)
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                run_sink(*self._args)
+            except BaseException:
+                traceback.print_exc()
+                code = 1
+            finally:
+                os._exit(code)
+
+        self._pid = pid
+
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while not os.path.exists(self._socket_path) and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+    def stop(self) -> None:
+        """
+        Stop the log sink process after the queued lines are written.
+        """
+        if self._pid is None:
+            return
+
+        try:
+            os.kill(self._pid, signal.SIGTERM)
+            os.waitpid(self._pid, 0)
+        except (ProcessLookupError, ChildProcessError):
+            pass
+        self._pid = None
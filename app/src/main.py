@@ -1,12 +1,22 @@
+import asyncio
+import os
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
 from fastapi import FastAPI
 
 from . import routers, middlewares
-from .database import MongoClient, RedisClient
-from .logger import LOGGER
-from .nlp import ChatClient
+from .database import MongoClient, RedisClient, run_history_archiver
+from .logger import LOGGER, start_queue_listeners, stop_queue_listeners
+from .nlp import create_chat_client
+from .search import create_search_index
+from .utils import AFFINITY_HEADER, ORJSONResponse
+from .warmup import STARTUP_PROFILE, warm_up
+
+# Environment variable/s
+CORS_ALLOW_ORIGINS = [
+    origin.strip() for origin in (os.getenv("CORS_ALLOW_ORIGINS") or "*").split(",") if origin.strip()
+]
 
 
 # Lifespan function
@@ -20,10 +30,14 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
     app : FastAPI
         FastAPI application instance.
     """
+    # Start the log listeners of the worker
+    start_queue_listeners()
+
     # Create a MongoDB client and check the connection
     mongo_client = MongoClient()
     redis_client = RedisClient()
-    chat_client = ChatClient()
+    chat_client = create_chat_client()
+    search_index = create_search_index()
 
     try:
         await mongo_client.ping()
@@ -32,36 +46,71 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
         LOGGER.error("Failed to connect to MongoDB or Redis.")
         exit(1)
 
+    # Provision the log store
+    try:
+        await mongo_client.setup_logs()
+    except Exception as e:
+        LOGGER.error(f"Failed to set up the logs collection: {repr(e)}")
+
+    # Provision the archive of the chat history
+    try:
+        await mongo_client.setup_conversations()
+    except Exception as e:
+        LOGGER.error(f"Failed to set up the conversations collection: {repr(e)}")
+
+    # Archive the chat history in the background
+    archiver_stop = asyncio.Event()
+    archiver = asyncio.create_task(run_history_archiver(mongo_client, redis_client, archiver_stop))
+
     # Set the MongoDB client in the application state
     app.state.mongo_client = mongo_client
     app.state.redis_client = redis_client
     app.state.chat_client = chat_client
+    app.state.search_index = search_index
 
     LOGGER.info("The worker is starting...")
+    if STARTUP_PROFILE:
+        LOGGER.info(f"Startup profile (ms): {STARTUP_PROFILE}")
 
     yield
 
     LOGGER.info("The worker is stopping...")
 
+    # Archive the queued chat history
+    archiver_stop.set()
+    await archiver
+
     # Close the MongoDB client
     await mongo_client.close()
     await redis_client.close()
 
+    # Flush the queued logs
+    stop_queue_listeners()
+
+
+# Warm up before the workers are forked
+warm_up()
 
 # FastAPI application instance
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 # Include routers
 app.include_router(routers.chat.router)
 app.include_router(routers.pdf.router)
+app.include_router(routers.search.router)
+app.include_router(routers.stats.router)
 
 # Middlewares
+app.add_middleware(middlewares.RateLimitMiddleware)
+
 app.add_middleware(
     middlewares.CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=CORS_ALLOW_ORIGINS,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[middlewares.CORRELATION_ID_HEADER, AFFINITY_HEADER, *middlewares.RATE_LIMIT_HEADERS],
     allow_credentials=False,
 )
 
 app.add_middleware(middlewares.LoggerMiddleware)
+app.add_middleware(middlewares.AffinityMiddleware)
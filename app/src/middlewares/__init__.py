@@ -1,8 +1,14 @@
 from fastapi.middleware.cors import CORSMiddleware
 
-from .logger import LoggerMiddleware
+from .affinity import AffinityMiddleware
+from .logger import CORRELATION_ID_HEADER, LoggerMiddleware
+from .rate_limit import RATE_LIMIT_HEADERS, RateLimitMiddleware
 
 __all__ = [
+    "AffinityMiddleware",
+    "CORRELATION_ID_HEADER",
     "CORSMiddleware",
     "LoggerMiddleware",
+    "RATE_LIMIT_HEADERS",
+    "RateLimitMiddleware",
 ]
@@ -0,0 +1,106 @@
+import asyncio
+import os
+import socket
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from ..database import RedisClient
+from ..database.redis import INFLIGHT_TTL
+from ..logger import LOGGER
+from ..utils import run_in_background
+from ..utils.affinity import AFFINITY_NODE
+
+# Constants
+HOSTNAME = socket.gethostname()
+HEARTBEAT_INTERVAL = INFLIGHT_TTL / 3
+
+
+class AffinityMiddleware:
+    """
+    Middleware for counting the requests in progress on this node in Redis.
+    The counts are the loads that bound the PDF ID affinity of the nodes.
+    A request is counted until its response is completed, \
+    and a WebSocket connection until it is closed.
+    Each worker sets its own count and refreshes it while it has requests in progress, \
+    so the count of a killed worker expires instead of raising the load of the node forever.
+    If `AFFINITY_NODE` is not set, the requests are not counted.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        """
+        Constructor method for `AffinityMiddleware`.
+
+        Parameters
+        ----------
+        app : ASGIApp
+            The next application in the middleware chain.
+
+        Attributes
+        ----------
+        inflight : int
+            The number of requests in progress on this worker.
+
+        heartbeat : asyncio.Task | None
+            The task that refreshes the count of this worker while it has requests in progress.
+        """
+        self.app = app
+        self.inflight = 0
+        self.heartbeat: asyncio.Task | None = None
+
+    async def report(self, cache: RedisClient) -> None:
+        """
+        Set the count of this worker in Redis.
+
+        Parameters
+        ----------
+        cache : RedisClient
+            The Redis client.
+        """
+        try:
+            await cache.set_inflight(AFFINITY_NODE, f"{HOSTNAME}:{os.getpid()}", self.inflight)
+        except Exception as e:
+            LOGGER.error(f"Failed to count the requests on node {AFFINITY_NODE}: {repr(e)}")
+
+    async def beat(self, cache: RedisClient) -> None:
+        """
+        Refresh the count of this worker until it has no requests in progress.
+
+        Parameters
+        ----------
+        cache : RedisClient
+            The Redis client.
+        """
+        while self.inflight > 0:
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+            await self.report(cache)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Count the request while it is in progress.
+
+        Parameters
+        ----------
+        scope : Scope
+            The scope of the connection.
+
+        receive : Receive
+            The receive channel of the connection.
+
+        send : Send
+            The send channel of the connection.
+        """
+        if scope["type"] not in ("http", "websocket") or not AFFINITY_NODE:
+            await self.app(scope, receive, send)
+            return
+
+        cache: RedisClient = scope["app"].state.redis_client
+        self.inflight += 1
+        await self.report(cache)
+        if self.heartbeat is None or self.heartbeat.done():
+            self.heartbeat = asyncio.create_task(self.beat(cache))
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.inflight -= 1
+            run_in_background(self.report(cache))
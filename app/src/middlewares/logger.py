@@ -1,45 +1,173 @@
-import json
+import os
+import random
+import re
+import time
+import uuid
+from collections import defaultdict
 from datetime import datetime
 from typing import Callable
 
 from fastapi import Request, Response, status
-from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 
-from ..database import MongoClient
-from ..logger import LOGGER
-from ..utils import CustomHTTPException
+from ..database import MongoClient, is_level_enabled, log_to_database
+from ..logger import CORRELATION_ID, LOGGER
+from ..utils import CustomHTTPException, ORJSONResponse
 
+# Environment variable/s
+LOGGER_SAMPLE_RATE = float(os.getenv("LOGGER_SAMPLE_RATE", 1.0))
+LOGGER_SAMPLE_RATES = eval(os.getenv("LOGGER_SAMPLE_RATES", "{}"))
+LOGGER_SLOW_REQUEST_MS = float(os.getenv("LOGGER_SLOW_REQUEST_MS", 1000))
+LOGGER_MERGE_ENTRIES = os.getenv("LOGGER_MERGE_ENTRIES", "false").lower() == "true"
 
-async def log_to_database(db: MongoClient, log: dict) -> None:
+# Constants
+DEFAULT_SAMPLE_GROUP = "*"
+CORRELATION_ID_HEADER = "X-Request-ID"
+CORRELATION_ID_PATTERN = re.compile(r"[A-Za-z0-9._-]{1,64}")
+
+
+def correlation_id_of(request: Request) -> str:
     """
-    Log a request with its details to the database.
-    If the logging fails, it logs an error message with the log content.
+    Get the correlation ID of a request.
+    The ID sent by the client in the `X-Request-ID` header is used if it is valid, \
+    otherwise a new ID is generated.
 
     Parameters
     ----------
-    db : MongoClient
-        The MongoDB client.
+    request : Request
+        The incoming request object.
 
-    log : dict
-        The log dictionary.
+    Returns
+    -------
+    correlation_id : str
+        The correlation ID of the request.
     """
-    try:
-        await db.insert_log(log)
-    except:
-        LOGGER.error(f"FAIL TO LOG : {json.dumps(log)}")
+    correlation_id = request.headers.get(CORRELATION_ID_HEADER, "")
+    if CORRELATION_ID_PATTERN.fullmatch(correlation_id):
+        return correlation_id
+
+    return uuid.uuid4().hex
+
+
+class LogSampler:
+    """
+    Sampling policy for the request logs.
+    Each request is sampled with the rate of the longest matching path prefix \
+    in `LOGGER_SAMPLE_RATES`, otherwise with `LOGGER_SAMPLE_RATE`.
+    The number of dropped requests is counted per sampling group, \
+    and it is attached to the next recorded log of the group.
+    So, the total number of requests is the number of recorded completion logs \
+    plus the sum of their dropped counts.
+    """
+
+    def __init__(self) -> None:
+        """
+        Constructor method for `LogSampler`.
+
+        Attributes
+        ----------
+        rates : dict[str, float]
+            The sampling rates of the path prefixes, longest prefix first.
+
+        dropped : dict[str, int]
+            The number of dropped requests per sampling group since the last recorded log.
+        """
+        self.rates = dict(sorted(LOGGER_SAMPLE_RATES.items(), key=lambda item: len(item[0]), reverse=True))
+        self.dropped = defaultdict(int)
+
+    def sample(self, path: str) -> tuple[bool, str, float]:
+        """
+        Make the sampling decision for a request.
+
+        Parameters
+        ----------
+        path : str
+            The path of the request.
+
+        Returns
+        -------
+        sampled : bool
+            Indicates if the request is sampled.
+
+        group : str
+            The sampling group of the request.
+
+        rate : float
+            The sampling rate of the group.
+        """
+        group, rate = DEFAULT_SAMPLE_GROUP, LOGGER_SAMPLE_RATE
+        for prefix, prefix_rate in self.rates.items():
+            if path.startswith(prefix):
+                group, rate = prefix, prefix_rate
+                break
+
+        return random.random() < rate, group, rate
+
+    def record(self, group: str, rate: float) -> dict:
+        """
+        Count a recorded request and reset the dropped count of its group.
+
+        Parameters
+        ----------
+        group : str
+            The sampling group of the request.
+
+        rate : float
+            The sampling rate of the group.
+
+        Returns
+        -------
+        sampling : dict
+            The sampling details to attach to the log.
+        """
+        dropped = self.dropped.pop(group, 0)
+        return {"group": group, "rate": rate, "dropped": dropped}
+
+    def drop(self, group: str) -> None:
+        """
+        Count a dropped request.
+
+        Parameters
+        ----------
+        group : str
+            The sampling group of the request.
+        """
+        self.dropped[group] += 1
 
 
 class LoggerMiddleware(BaseHTTPMiddleware):
     """
     Middleware for logging requests and any possible exception.
+    Errors (the responses with 4xx and 5xx status codes) and slow requests are always logged, \
+    the other requests are sampled with `LogSampler`.
     """
 
+    def __init__(self, *args, **kwargs) -> None:
+        """
+        Constructor method for `LoggerMiddleware`.
+
+        Attributes
+        ----------
+        sampler : LogSampler
+            The sampling policy for the request logs.
+
+        first_request : bool
+            Indicates if the worker has not served any request yet.
+        """
+        super().__init__(*args, **kwargs)
+        self.sampler = LogSampler()
+        self.first_request = True
+
     async def dispatch(self, request: Request, call_next: Callable[[Request], Response]) -> Response:
         """
         Dispatch method of the middleware.
         It logs the incoming request with its scope and host information.
         Moreover, it logs any possible exception that occurs during the request.
+        If `LOGGER_MERGE_ENTRIES` is set, the incoming request and its completion \
+        are logged as a single document.
+        Both entries share the correlation ID of the request, \
+        which is also sent back in the `X-Request-ID` header and shown in the console logs.
+        The completion entry has the route template and the duration measured with a monotonic clock.
 
         Parameters
         ----------
@@ -62,65 +190,89 @@ class LoggerMiddleware(BaseHTTPMiddleware):
         scope = request.scope
         http_type, http_version = scope["type"], scope["http_version"]
         method, path = scope["method"], scope["path"]
+        correlation_id = correlation_id_of(request)
+        CORRELATION_ID.set(correlation_id)
         request_log = {
+            "correlation_id": correlation_id,
             "client": f"{host}:{port}",
             "http": f"{http_type}/{http_version}",
             "path": path,
             "method": method,
         }
+        received_at = datetime.now()
+        start = time.perf_counter()
+        sampled, group, rate = self.sampler.sample(path)
 
         # Log the incoming request to the database
-        log = request_log | {
-            "level": "info",
-            "detail": "Incoming request.",
-            "timestamp": datetime.now(),
-        }
-        await log_to_database(db, log)
+        if sampled and not LOGGER_MERGE_ENTRIES and is_level_enabled("info"):
+            log = request_log | {
+                "level": "info",
+                "detail": "Incoming request.",
+                "timestamp": received_at,
+            }
+            await log_to_database(db, log)
 
         # Run the request
         try:
             response: Response = await call_next(request)
-
-            # Log the response to the database
-            log = request_log | {
+            log = {
                 "level": "info",
                 "detail": "Endpoint returns successfully.",
                 "status_code": response.status_code,
-                "timestamp": datetime.now(),
             }
-            await log_to_database(db, log)
-
-            return response
+            # The error responses returned without an exception (e.g., 404, 422 or 429)
+            if response.status_code >= status.HTTP_500_INTERNAL_SERVER_ERROR:
+                log["level"], log["detail"] = "error", "Endpoint returns a server error."
+            elif response.status_code >= status.HTTP_400_BAD_REQUEST:
+                log["level"], log["detail"] = "warning", "Endpoint returns a client error."
         # Catch the HTTP exception
         except CustomHTTPException as e:
-            # Log the exception to the database
-            log = request_log | {
+            log = {
                 "level": "error",
                 "status_code": e.status_code,
                 "detail": e.detail,
                 "traceback": e.trace,
-                "timestamp": datetime.now(),
             }
-            await log_to_database(db, log)
-
-            return JSONResponse(
+            response = ORJSONResponse(
                 status_code=e.status_code,
                 content={"detail": e.detail},
+                headers=e.headers,
             )
         # Catch any other exception
         except Exception as e:
-            # Log the exception to the database
             e = CustomHTTPException(e, status.HTTP_500_INTERNAL_SERVER_ERROR, "An unexpected error occurred.")
-            log = request_log | {
+            log = {
                 "level": "error",
                 "status_code": e.status_code,
                 "detail": e.detail,
                 "traceback": e.trace,
-                "timestamp": datetime.now(),
             }
-            await log_to_database(db, log)
-
-            return JSONResponse(
+            response = ORJSONResponse(
                 status_code=e.status_code,
                 content={"detail": e.detail},
             )
+
+        # Mark the slow requests
+        duration_ms = (time.perf_counter() - start) * 1000
+        response.headers[CORRELATION_ID_HEADER] = correlation_id
+        if self.first_request:
+            self.first_request = False
+            LOGGER.info(f"First request of the worker took {duration_ms:.3f} ms.")
+        if log["level"] == "info" and duration_ms >= LOGGER_SLOW_REQUEST_MS:
+            log["level"] = "warning"
+            log["detail"] = "Endpoint returns slowly."
+
+        # Log the response to the database, errors and slow requests are never dropped
+        if (sampled or log["level"] != "info") and is_level_enabled(log["level"]):
+            log = request_log | log
+            log["route"] = getattr(scope.get("route"), "path", path)
+            log["duration_ms"] = duration_ms
+            log["sampling"] = self.sampler.record(group, rate)
+            log["timestamp"] = datetime.now()
+            if LOGGER_MERGE_ENTRIES:
+                log["received_at"] = received_at
+            await log_to_database(db, log)
+        else:
+            self.sampler.drop(group)
+
+        return response
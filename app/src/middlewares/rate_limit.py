@@ -0,0 +1,215 @@
+import hashlib
+import math
+import os
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from starlette.websockets import WebSocketClose
+
+from ..database import RedisClient
+from ..logger import LOGGER
+from ..utils import CustomHTTPException, ORJSONResponse
+
+# Environment variable/s
+RATE_LIMITS = eval(os.getenv("RATE_LIMITS") or "{}")
+RATE_LIMIT_CLIENT_HEADER = os.getenv("RATE_LIMIT_CLIENT_HEADER", "")
+
+for prefix, limit in RATE_LIMITS.items():
+    if not limit.get("limit", 0) >= 1 or not limit.get("period", 0) > 0 or limit.get("pdf_limit", 1) < 1:
+        raise ValueError(
+            f"The rate limit of {prefix} is not valid, its limit and pdf_limit must be at least 1 "
+            + "and its period must be positive."
+        )
+
+# Constants
+RATE_LIMIT_HEADERS = ["RateLimit-Limit", "RateLimit-Remaining", "RateLimit-Reset", "Retry-After"]
+WS_POLICY_VIOLATION = 1008
+
+
+def client_key(scope: Scope) -> str:
+    """
+    Get the key of the client of a request.
+    The value of the `RATE_LIMIT_CLIENT_HEADER` header is used if it is set and sent \
+    (e.g., an API key checked by the gateway), and the IP address of the client otherwise.
+    The header value is hashed, so the API keys are not stored in Redis.
+
+    Parameters
+    ----------
+    scope : Scope
+        The scope of the connection.
+
+    Returns
+    -------
+    key : str
+        The key of the client. (e.g., ip:127.0.0.1)
+    """
+    if RATE_LIMIT_CLIENT_HEADER:
+        value = Headers(scope=scope).get(RATE_LIMIT_CLIENT_HEADER)
+        if value:
+            return "key:" + hashlib.blake2b(value.encode(), digest_size=16).hexdigest()
+
+    client = scope.get("client")
+    return "ip:" + (client[0] if client else "unknown")
+
+
+class RateLimitMiddleware:
+    """
+    Middleware for limiting the request rate of the clients with token buckets in Redis.
+    Each request takes a token from the bucket of its client for the longest matching path prefix \
+    in `RATE_LIMITS`, and from the bucket of its client and PDF ID if the prefix has a `pdf_limit`.
+    The buckets are shared by all workers and nodes.
+    A limited request returns 429 with the `Retry-After` header, \
+    and a limited WebSocket connection is closed with the policy violation code.
+    The responses have the `RateLimit-Limit`, `RateLimit-Remaining` and `RateLimit-Reset` headers \
+    of the bucket with the fewest tokens left.
+    If Redis is not available, the requests are not limited.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        """
+        Constructor method for `RateLimitMiddleware`.
+
+        Parameters
+        ----------
+        app : ASGIApp
+            The next application in the middleware chain.
+
+        Attributes
+        ----------
+        limits : dict[str, dict]
+            The limits of the path prefixes, longest prefix first.
+        """
+        self.app = app
+        self.limits = dict(sorted(RATE_LIMITS.items(), key=lambda item: len(item[0]), reverse=True))
+
+    def match(self, path: str) -> tuple[str, dict] | None:
+        """
+        Find the limit of a path.
+
+        Parameters
+        ----------
+        path : str
+            The path of the request.
+
+        Returns
+        -------
+        match : tuple[str, dict] | None
+            The longest matching path prefix and its limit.
+            If no prefix matches, return None.
+        """
+        for prefix, limit in self.limits.items():
+            if path.startswith(prefix):
+                return prefix, limit
+
+        return None
+
+    async def check(self, cache: RedisClient, scope: Scope, prefix: str, limit: dict) -> dict:
+        """
+        Take the tokens of a request from its buckets.
+
+        Parameters
+        ----------
+        cache : RedisClient
+            The Redis client.
+
+        scope : Scope
+            The scope of the connection.
+
+        prefix : str
+            The matching path prefix.
+
+        limit : dict
+            The limit of the prefix, with the number of requests ("limit") per period in seconds ("period"), \
+            and optionally the number of requests per PDF ID in the same period ("pdf_limit").
+
+        Returns
+        -------
+        state : dict
+            The state of the most restrictive bucket, with its limit, the remaining tokens, \
+            the seconds until it is full ("reset") and until a token is available ("retry_after"), \
+            and whether the request is allowed.
+        """
+        client = client_key(scope)
+        buckets = [(f"{prefix}:{client}", limit["limit"])]
+
+        # The PDF ID is the path segment after the prefix (e.g., /v1/chat/{pdf_id}/batch)
+        pdf_id = scope["path"][len(prefix) :].strip("/").split("/")[0]
+        if limit.get("pdf_limit") and pdf_id:
+            buckets.append((f"{prefix}:{client}:{pdf_id}", limit["pdf_limit"]))
+
+        state = None
+        for key, capacity in buckets:
+            allowed, remaining, retry_after_ms, reset_ms = await cache.take_token(
+                key, capacity, capacity / limit["period"]
+            )
+            if state is None or not allowed or remaining < state["remaining"]:
+                state = {
+                    "allowed": allowed,
+                    "limit": capacity,
+                    "remaining": remaining,
+                    "reset": math.ceil(reset_ms / 1000),
+                    "retry_after": math.ceil(retry_after_ms / 1000),
+                }
+            if not allowed:
+                break
+
+        return state
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Limit the request rate of the client.
+
+        Parameters
+        ----------
+        scope : Scope
+            The scope of the connection.
+
+        receive : Receive
+            The receive channel of the connection.
+
+        send : Send
+            The send channel of the connection.
+        """
+        match = self.match(scope["path"]) if scope["type"] in ("http", "websocket") else None
+        if match is None:
+            await self.app(scope, receive, send)
+            return
+
+        cache: RedisClient = scope["app"].state.redis_client
+        try:
+            state = await self.check(cache, scope, *match)
+        except Exception as e:
+            LOGGER.error(f"Failed to check the rate limit of {scope['path']}: {repr(e)}")
+            await self.app(scope, receive, send)
+            return
+
+        headers = {
+            "RateLimit-Limit": str(state["limit"]),
+            "RateLimit-Remaining": str(state["remaining"]),
+            "RateLimit-Reset": str(state["reset"]),
+        }
+
+        if not state["allowed"]:
+            if scope["type"] == "websocket":
+                await WebSocketClose(WS_POLICY_VIOLATION, "Rate limit exceeded")(scope, receive, send)
+                return
+
+            response = ORJSONResponse(
+                status_code=429,
+                content={"detail": f"Rate limit exceeded, retry after {state['retry_after']} seconds"},
+                headers=headers | {"Retry-After": str(state["retry_after"])},
+            )
+            await response(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).update(headers)
+            await send(message)
+
+        # The HTTP exceptions are turned into responses by the logger middleware
+        try:
+            await self.app(scope, receive, send_with_headers)
+        except CustomHTTPException as e:
+            e.headers = (e.headers or {}) | headers
+            raise
@@ -1,5 +1,13 @@
-from .gemini import ChatClient
+from .backend import CHAT_BACKEND, create_chat_client
+from .base import ChatClient, ChatModel, ChatSession
+from .digest import is_overview_question, render_digest
 
 __all__ = [
+    "CHAT_BACKEND",
+    "create_chat_client",
     "ChatClient",
+    "ChatModel",
+    "ChatSession",
+    "is_overview_question",
+    "render_digest",
 ]
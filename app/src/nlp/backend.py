@@ -0,0 +1,27 @@
+import os
+
+from .base import ChatClient
+
+# Environment variable/s
+CHAT_BACKEND = os.getenv("CHAT_BACKEND", "gemini").lower()
+
+# The backend is imported only if it is selected, \
+# so the other backends' dependencies and settings are not required
+if CHAT_BACKEND == "gemini":
+    from .gemini import GeminiClient as BackendClient
+elif CHAT_BACKEND == "simulated":
+    from .simulated import SimulatedClient as BackendClient
+else:
+    raise ValueError(f"Unknown chat backend: {CHAT_BACKEND}")
+
+
+def create_chat_client() -> ChatClient:
+    """
+    Create the client of the chat backend selected by `CHAT_BACKEND`.
+
+    Returns
+    -------
+    client : ChatClient
+        The client of the chat backend.
+    """
+    return BackendClient()
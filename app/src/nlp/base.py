@@ -0,0 +1,265 @@
+import time
+from abc import ABC, abstractmethod
+from typing import AsyncGenerator
+
+from .digest import DIGEST_PROMPT, parse_digest
+
+
+class ChatSession(ABC):
+    """
+    Chat session of a backend.
+    The history is a list of messages with the role ("user" or "model") and the text ("parts") of the message.
+    """
+
+    def __init__(self, history: list[dict] | None = None) -> None:
+        """
+        Constructor method for `ChatSession`.
+
+        Parameters
+        ----------
+        history : list[dict] | None
+            The chat history.
+
+        Attributes
+        ----------
+        usage : dict
+            The number of prompt and response tokens, the time to the first part \
+            and the total generation time in milliseconds of the last message.
+            It is filled when the response is completed.
+        """
+        self.history = list(history or [])
+        self.usage = {"prompt_tokens": 0, "response_tokens": 0, "ttft_ms": 0.0, "generation_ms": 0.0}
+
+    async def stream(self, message: str, timeout: float | None = None) -> AsyncGenerator[str, None]:
+        """
+        Send a message to the bot and stream the parts of the response.
+        The time to the first part and the total generation time are added to the usage \
+        when the response is completed.
+
+        Parameters
+        ----------
+        message : str
+            The message to send to the bot.
+
+        timeout : float | None
+            The timeout of the request in seconds.
+
+        Returns
+        -------
+        parts : AsyncGenerator[str, None]
+            The parts of the response.
+        """
+        start = time.perf_counter()
+        ttft_ms = None
+        async for part in self.generate(message, timeout):
+            if ttft_ms is None:
+                ttft_ms = (time.perf_counter() - start) * 1000
+            yield part
+
+        generation_ms = (time.perf_counter() - start) * 1000
+        self.usage.update(ttft_ms=generation_ms if ttft_ms is None else ttft_ms, generation_ms=generation_ms)
+
+    @abstractmethod
+    def generate(self, message: str, timeout: float | None = None) -> AsyncGenerator[str, None]:
+        """
+        Send a message to the backend and stream the parts of the response.
+        The message and the response are added to the history, \
+        and the token counts are set in the usage when the response is completed.
+
+        Parameters
+        ----------
+        message : str
+            The message to send to the bot.
+
+        timeout : float | None
+            The timeout of the request in seconds.
+
+        Returns
+        -------
+        parts : AsyncGenerator[str, None]
+            The parts of the response.
+        """
+
+
+class ChatModel(ABC):
+    """
+    Model of a backend whose system instructions contain a PDF document.
+    It can start any number of independent chat sessions.
+    """
+
+    def __init__(self, instructions: str) -> None:
+        """
+        Constructor method for `ChatModel`.
+
+        Parameters
+        ----------
+        instructions : str
+            The system instructions.
+        """
+        self.instructions = instructions
+
+    @abstractmethod
+    def start_chat(self, history: list[dict] | None = None) -> ChatSession:
+        """
+        Start a chat session.
+
+        Parameters
+        ----------
+        history : list[dict] | None
+            The chat history.
+
+        Returns
+        -------
+        chat : ChatSession
+            The chat session.
+        """
+
+
+class ChatClient(ABC):
+    """
+    Client of a chat backend.
+    It assembles the system instructions, the backends create the models and sessions.
+    """
+
+    def __init__(self) -> None:
+        """
+        Constructor method for `ChatClient`.
+        """
+        self.system_instructions = """You are an assistant that answers questions solely based on the PDF document content that will be provided to you.
+The PDF document will be parsed via Python and its text and its metadata will be extracted.
+The text and metadata will be provided to you in the chat.
+Any unrelated questions should be responded to with 'I can only answer questions related to the document.'.
+Please keep the conversation professional and respectful.
+Additionally, please only provide text-based responses.
+
+"""
+
+    def instructions(self, metadata: dict, content: str, pages: list[int] | None = None) -> str:
+        """
+        Create the system instructions that contain the PDF document.
+
+        Parameters
+        ----------
+        metadata : dict
+            The metadata of the PDF document.
+
+        content : str
+            The text content of the PDF document.
+
+        pages : list[int] | None
+            The page numbers that the content is limited to.
+            If it is None, the content is the whole text of the PDF document.
+
+        Returns
+        -------
+        instructions : str
+            The system instructions.
+        """
+        if pages is None:
+            scope = "The text content of the PDF document is as follows:"
+        else:
+            scope = (
+                f"The text content of the pages {', '.join(str(page) for page in sorted(set(pages)))} "
+                + "of the PDF document is as follows, the other pages are not provided:"
+            )
+
+        return (
+            self.system_instructions
+            + f"""{scope}
+{content}
+
+The metadata of the PDF document is as follows:
+{metadata}"""
+        )
+
+    @abstractmethod
+    def model(self, metadata: dict, content: str, pages: list[int] | None = None) -> ChatModel:
+        """
+        Create a model whose system instructions contain the PDF document.
+
+        Parameters
+        ----------
+        metadata : dict
+            The metadata of the PDF document.
+
+        content : str
+            The text content of the PDF document.
+
+        pages : list[int] | None
+            The page numbers that the content is limited to.
+            If it is None, the content is the whole text of the PDF document.
+
+        Returns
+        -------
+        model : ChatModel
+            The model for the chat sessions.
+        """
+
+    @abstractmethod
+    async def count_tokens(self, text: str) -> int:
+        """
+        Count the tokens of a text for the backend's model.
+
+        Parameters
+        ----------
+        text : str
+            The text to count.
+
+        Returns
+        -------
+        count : int
+            The number of tokens.
+        """
+
+    def chat(
+        self, metadata: dict, content: str, history: list[dict] | None = None, pages: list[int] | None = None
+    ) -> ChatSession:
+        """
+        Start a chat session about a PDF document.
+
+        Parameters
+        ----------
+        metadata : dict
+            The metadata of the PDF document.
+
+        content : str
+            The text content of the PDF document.
+
+        history : list[dict] | None
+            The chat history.
+
+        pages : list[int] | None
+            The page numbers that the content is limited to.
+            If it is None, the content is the whole text of the PDF document.
+
+        Returns
+        -------
+        chat : ChatSession
+            The chat session.
+        """
+        return self.model(metadata, content, pages).start_chat(history)
+
+    async def digest(self, metadata: dict, content: str, timeout: float | None = None) -> dict:
+        """
+        Create the digest of a PDF document with a single message about its whole content.
+
+        Parameters
+        ----------
+        metadata : dict
+            The metadata of the PDF document.
+
+        content : str
+            The text content of the PDF document.
+
+        timeout : float | None
+            The timeout of the request in seconds.
+
+        Returns
+        -------
+        digest : dict
+            The digest with the summary, the outline and the key terms.
+            If the response is not a valid digest, raise a `ValueError`.
+        """
+        chat = self.chat(metadata, content)
+        parts = [part async for part in chat.stream(DIGEST_PROMPT, timeout)]
+        return parse_digest("".join(parts))
@@ -0,0 +1,107 @@
+import os
+import re
+
+from ..utils import loads
+
+# Environment variable/s
+CHAT_DIGEST_MAX_WORDS = int(os.getenv("CHAT_DIGEST_MAX_WORDS", 12))
+
+# Constants
+DIGEST_PROMPT = """Create a digest of the PDF document as a JSON object with the following keys, and nothing else:
+- "summary": a summary of the document in one paragraph.
+- "outline": the main sections or topics of the document in their order, as a list of short strings.
+- "key_terms": the most important terms, names and concepts of the document, as a list of strings."""
+OVERVIEW_PATTERN = re.compile(
+    r"\b(what('s| is) (this|the) (document|pdf|paper|file|text) about"
+    r"|summar(y|ize|ise)|overview|tl;? ?dr|outline|table of contents"
+    r"|main (topic|idea|point|theme)s?|key (point|term|takeaway|concept|finding)s?)\b",
+    re.IGNORECASE,
+)
+PART_PATTERN = re.compile(
+    r"\b(sections?|chapters?|pages?|tables?(?! of contents)|figs?|figures?|appendix|appendices|paragraphs?"
+    r"|abstract|introduction|methods?|methodology|results?|discussion|conclusions?|references|equations?|lines?)\b"
+    r"|\b(part|step|item) \d",
+    re.IGNORECASE,
+)
+
+
+def parse_digest(response: str) -> dict:
+    """
+    Parse the digest of a PDF document from the response of the bot.
+    The JSON object is taken from the first "{" to the last "}", \
+    so a response wrapped in a code block is accepted.
+
+    Parameters
+    ----------
+    response : str
+        The response of the bot to `DIGEST_PROMPT`.
+
+    Returns
+    -------
+    digest : dict
+        The digest with the summary, the outline and the key terms.
+        If the response is not a valid digest, raise a `ValueError`.
+    """
+    start, end = response.find("{"), response.rfind("}")
+    if start == -1 or end < start:
+        raise ValueError("The digest is not a JSON object")
+
+    digest = loads(response[start : end + 1])
+    summary, outline, key_terms = digest.get("summary"), digest.get("outline"), digest.get("key_terms")
+    if not isinstance(summary, str) or not isinstance(outline, list) or not isinstance(key_terms, list):
+        raise ValueError("The digest does not have a summary, an outline and key terms")
+
+    return {
+        "summary": summary.strip(),
+        "outline": [str(item) for item in outline],
+        "key_terms": [str(item) for item in key_terms],
+    }
+
+
+def render_digest(digest: dict) -> str:
+    """
+    Render the digest of a PDF document as the content of a chat.
+
+    Parameters
+    ----------
+    digest : dict
+        The digest with the summary, the outline and the key terms.
+
+    Returns
+    -------
+    content : str
+        The digest as text, it states that the full text is not provided.
+    """
+    outline = "\n".join(f"- {item}" for item in digest["outline"])
+    return (
+        "This is a digest of the PDF document, its full text is not provided.\n\n"
+        + f"Summary:\n{digest['summary']}\n\n"
+        + f"Outline:\n{outline}\n\n"
+        + f"Key terms: {', '.join(digest['key_terms'])}"
+    )
+
+
+def is_overview_question(message: str) -> bool:
+    """
+    Check if a message is an overview question about the whole document \
+    that can be answered from its digest. (e.g., "What is this document about?")
+    Only the short messages of at most `CHAT_DIGEST_MAX_WORDS` words are considered, \
+    since longer messages usually ask for details.
+    The messages that refer to a part of the document are not overview questions, \
+    even with an overview phrasing. (e.g., "Summarize the methods section")
+
+    Parameters
+    ----------
+    message : str
+        The message to check.
+
+    Returns
+    -------
+    overview : bool
+        Indicates if the message is an overview question.
+    """
+    return (
+        len(message.split()) <= CHAT_DIGEST_MAX_WORDS
+        and OVERVIEW_PATTERN.search(message) is not None
+        and PART_PATTERN.search(message) is None
+    )
@@ -1,7 +1,10 @@
 import os
+from typing import AsyncGenerator
 
 import google.generativeai as genai
 
+from .base import ChatClient, ChatModel, ChatSession
+
 # Environment variable/s
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", None)
 GEMINI_MODEL_NAME = os.getenv("GEMINI_MODEL_NAME", None)
@@ -10,30 +13,119 @@ if GEMINI_API_KEY is None or GEMINI_MODEL_NAME is None:
     raise Exception("Environment variables for Gemini API are not set properly.")
 
 
-class ChatClient:
+class GeminiSession(ChatSession):
+    """
+    Chat session of the Gemini API.
+    """
+
+    def __init__(self, model: genai.GenerativeModel, history: list[dict] | None = None) -> None:
+        """
+        Constructor method for `GeminiSession`.
+
+        Parameters
+        ----------
+        model : genai.GenerativeModel
+            The Gemini model.
+
+        history : list[dict] | None
+            The chat history.
+
+        Attributes
+        ----------
+        session : genai.ChatSession
+            The chat session of the Gemini API.
+        """
+        super().__init__(history)
+        self.session = model.start_chat(history=history)
+
+    async def generate(self, message: str, timeout: float | None = None) -> AsyncGenerator[str, None]:
+        """
+        Send a message to the Gemini API and stream the parts of the response.
+        The timeout is passed to the Gemini API as the request timeout.
+
+        Parameters
+        ----------
+        message : str
+            The message to send to the bot.
+
+        timeout : float | None
+            The timeout of the request in seconds.
+
+        Returns
+        -------
+        parts : AsyncGenerator[str, None]
+            The parts of the response.
+        """
+        request_options = {"timeout": timeout} if timeout is not None else None
+        response = await self.session.send_message_async(message, stream=True, request_options=request_options)
+
+        parts = []
+        async for chunk in response:
+            text = chunk.candidates[0].content.parts[0].text
+            parts.append(text)
+            yield text
+
+        usage = response.usage_metadata
+        self.usage.update(prompt_tokens=usage.prompt_token_count, response_tokens=usage.candidates_token_count)
+        self.history += [{"role": "user", "parts": message}, {"role": "model", "parts": "".join(parts)}]
+
+
+class GeminiModel(ChatModel):
+    """
+    Model of the Gemini API.
+    """
+
+    def __init__(self, instructions: str) -> None:
+        """
+        Constructor method for `GeminiModel`.
+
+        Parameters
+        ----------
+        instructions : str
+            The system instructions.
+
+        Attributes
+        ----------
+        model : genai.GenerativeModel
+            The Gemini model.
+        """
+        super().__init__(instructions)
+        self.model = genai.GenerativeModel(model_name=GEMINI_MODEL_NAME, system_instruction=instructions)
+
+    def start_chat(self, history: list[dict] | None = None) -> GeminiSession:
+        """
+        Start a chat session with the Gemini API.
+
+        Parameters
+        ----------
+        history : list[dict] | None
+            The chat history.
+
+        Returns
+        -------
+        chat : GeminiSession
+            The chat session.
+        """
+        return GeminiSession(self.model, history)
+
+
+class GeminiClient(ChatClient):
     """
     This client is responsible for interacting with the Gemini API.
     """
 
     def __init__(self) -> None:
         """
-        Constructor method for `ChatClient`.
+        Constructor method for `GeminiClient`.
         """
+        super().__init__()
         genai.configure(api_key=GEMINI_API_KEY)
 
         self.model_name = GEMINI_MODEL_NAME
-        self.system_instructions = """You are an assistant that answers questions solely based on the PDF document content that will be provided to you.
-The PDF document will be parsed via Python and its text and its metadata will be extracted.
-The text and metadata will be provided to you in the chat.
-Any unrelated questions should be responded to with 'I can only answer questions related to the document.'.
-Please keep the conversation professional and respectful.
-Additionally, please only provide text-based responses.
 
-"""
-
-    def chat(self, metadata: dict, content: str, history: list[dict] | None = None) -> genai.ChatSession:
+    def model(self, metadata: dict, content: str, pages: list[int] | None = None) -> GeminiModel:
         """
-        Start a chat session with the Gemini API.
+        Create a Gemini model whose system instructions contain the PDF document.
 
         Parameters
         ----------
@@ -43,28 +135,30 @@ Additionally, please only provide text-based responses.
         content : str
             The text content of the PDF document.
 
-        history : dict | None
-            The chat history.
+        pages : list[int] | None
+            The page numbers that the content is limited to.
+            If it is None, the content is the whole text of the PDF document.
 
         Returns
         -------
-        chat : genai.ChatSession
-            The chat session.
+        model : GeminiModel
+            The model for the chat sessions.
         """
-        # Create the system instructions
-        instructions = (
-            self.system_instructions
-            + f"""The text content of the PDF document is as follows:
-{content}
+        return GeminiModel(self.instructions(metadata, content, pages))
 
-The metadata of the PDF document is as follows:
-{metadata}"""
-        )
-
-        # Initialize the model for the chat
-        model = genai.GenerativeModel(model_name=self.model_name, system_instruction=instructions)
+    async def count_tokens(self, text: str) -> int:
+        """
+        Count the tokens of a text with the Gemini API.
 
-        # Start the chat
-        chat = model.start_chat(history=history)
+        Parameters
+        ----------
+        text : str
+            The text to count.
 
-        return chat
+        Returns
+        -------
+        count : int
+            The number of tokens.
+        """
+        response = await genai.GenerativeModel(model_name=self.model_name).count_tokens_async(text)
+        return response.total_tokens
@@ -0,0 +1,223 @@
+import asyncio
+import os
+import random
+import zlib
+from collections import Counter
+from typing import AsyncGenerator
+
+from .base import ChatClient, ChatModel, ChatSession
+
+# Environment variable/s
+SIMULATED_LATENCY_MS = float(os.getenv("SIMULATED_LATENCY_MS", 200))
+SIMULATED_TOKENS_PER_SECOND = float(os.getenv("SIMULATED_TOKENS_PER_SECOND", 100))
+SIMULATED_RESPONSE_TOKENS = int(os.getenv("SIMULATED_RESPONSE_TOKENS", 50))
+SIMULATED_FAILURE_RATE = float(os.getenv("SIMULATED_FAILURE_RATE", 0.0))
+SIMULATED_SEED = int(os.getenv("SIMULATED_SEED", 0))
+
+# Constants
+CHUNK_TOKENS = 8
+
+
+class SimulatedBackendError(Exception):
+    """
+    Exception raised by the simulated backend for a simulated failure.
+    """
+
+
+def count_words(text: str) -> int:
+    """
+    Count the tokens of a text for the simulated backend, each word is a token.
+
+    Parameters
+    ----------
+    text : str
+        The text to count.
+
+    Returns
+    -------
+    count : int
+        The number of tokens.
+    """
+    return len(text.split())
+
+
+class SimulatedSession(ChatSession):
+    """
+    Chat session of the simulated backend.
+    """
+
+    def __init__(self, model: "SimulatedModel", history: list[dict] | None = None) -> None:
+        """
+        Constructor method for `SimulatedSession`.
+
+        Parameters
+        ----------
+        model : SimulatedModel
+            The simulated model.
+
+        history : list[dict] | None
+            The chat history.
+        """
+        super().__init__(history)
+        self.model = model
+
+    async def generate(self, message: str, timeout: float | None = None) -> AsyncGenerator[str, None]:
+        """
+        Stream a deterministic response made of the words of the PDF document.
+        The first part is sent after `SIMULATED_LATENCY_MS`, \
+        and the next parts at `SIMULATED_TOKENS_PER_SECOND`.
+        The message fails with `SIMULATED_FAILURE_RATE` probability before the first part.
+        The same message with the same history gets the same response and failure.
+
+        Parameters
+        ----------
+        message : str
+            The message to send to the bot.
+
+        timeout : float | None
+            The timeout of the request in seconds, it is not used.
+
+        Returns
+        -------
+        parts : AsyncGenerator[str, None]
+            The parts of the response.
+        """
+        rng = random.Random(zlib.crc32(f"{SIMULATED_SEED}:{len(self.history)}:{message}".encode()))
+
+        await asyncio.sleep(SIMULATED_LATENCY_MS / 1000)
+        if rng.random() < SIMULATED_FAILURE_RATE:
+            raise SimulatedBackendError("Simulated failure of the backend")
+
+        words = rng.choices(self.model.words, k=SIMULATED_RESPONSE_TOKENS)
+        parts = []
+        for start in range(0, len(words), CHUNK_TOKENS):
+            if start > 0:
+                await asyncio.sleep(CHUNK_TOKENS / SIMULATED_TOKENS_PER_SECOND)
+            parts.append(" ".join(words[start : start + CHUNK_TOKENS]) + " ")
+            yield parts[-1]
+
+        response = "".join(parts)
+        prompt = [self.model.instructions, message] + [item["parts"] for item in self.history]
+        self.usage.update(
+            prompt_tokens=sum(count_words(text) for text in prompt),
+            response_tokens=count_words(response),
+        )
+        self.history += [{"role": "user", "parts": message}, {"role": "model", "parts": response}]
+
+
+class SimulatedModel(ChatModel):
+    """
+    Model of the simulated backend.
+    """
+
+    def __init__(self, instructions: str) -> None:
+        """
+        Constructor method for `SimulatedModel`.
+
+        Parameters
+        ----------
+        instructions : str
+            The system instructions.
+
+        Attributes
+        ----------
+        words : list[str]
+            The words of the system instructions that the responses are made of.
+        """
+        super().__init__(instructions)
+        self.words = instructions.split() or ["..."]
+
+    def start_chat(self, history: list[dict] | None = None) -> SimulatedSession:
+        """
+        Start a chat session with the simulated backend.
+
+        Parameters
+        ----------
+        history : list[dict] | None
+            The chat history.
+
+        Returns
+        -------
+        chat : SimulatedSession
+            The chat session.
+        """
+        return SimulatedSession(self, history)
+
+
+class SimulatedClient(ChatClient):
+    """
+    Client of a simulated backend that works without network access.
+    Its latency, throughput and failure rate are set by the environment variables, \
+    so the request path can be load tested and profiled offline.
+    """
+
+    def model(self, metadata: dict, content: str, pages: list[int] | None = None) -> SimulatedModel:
+        """
+        Create a simulated model whose system instructions contain the PDF document.
+
+        Parameters
+        ----------
+        metadata : dict
+            The metadata of the PDF document.
+
+        content : str
+            The text content of the PDF document.
+
+        pages : list[int] | None
+            The page numbers that the content is limited to.
+            If it is None, the content is the whole text of the PDF document.
+
+        Returns
+        -------
+        model : SimulatedModel
+            The model for the chat sessions.
+        """
+        return SimulatedModel(self.instructions(metadata, content, pages))
+
+    async def count_tokens(self, text: str) -> int:
+        """
+        Count the tokens of a text, each word is a token.
+
+        Parameters
+        ----------
+        text : str
+            The text to count.
+
+        Returns
+        -------
+        count : int
+            The number of tokens.
+        """
+        return count_words(text)
+
+    async def digest(self, metadata: dict, content: str, timeout: float | None = None) -> dict:
+        """
+        Create a deterministic digest of a PDF document after `SIMULATED_LATENCY_MS`.
+        The summary is the first words of the content, \
+        and the key terms are its most frequent long words.
+
+        Parameters
+        ----------
+        metadata : dict
+            The metadata of the PDF document.
+
+        content : str
+            The text content of the PDF document.
+
+        timeout : float | None
+            The timeout of the request in seconds, it is not used.
+
+        Returns
+        -------
+        digest : dict
+            The digest with the summary, the outline and the key terms.
+        """
+        await asyncio.sleep(SIMULATED_LATENCY_MS / 1000)
+
+        words = content.split()
+        terms = Counter(word.strip(".,;:()").lower() for word in words if len(word) > 6)
+        return {
+            "summary": " ".join(words[:SIMULATED_RESPONSE_TOKENS]),
+            "outline": [metadata.get("title") or metadata.get("filename") or "Document"],
+            "key_terms": [term for term, _ in terms.most_common(10)],
+        }
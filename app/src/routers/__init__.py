@@ -1,7 +1,11 @@
 from . import chat
 from . import pdf
+from . import search
+from . import stats
 
 __all__ = [
     "chat",
     "pdf",
+    "search",
+    "stats",
 ]
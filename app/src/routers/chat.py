@@ -1,28 +1,443 @@
-from fastapi import APIRouter, FastAPI, Request, status
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel, ConfigDict
+import asyncio
+import os
+from datetime import datetime
+from typing import AsyncGenerator, Coroutine
 
-from ..database import MongoClient, RedisClient
-from ..nlp import ChatClient
-from ..utils import CustomHTTPException
+from fastapi import APIRouter, FastAPI, Request, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+from starlette.requests import ClientDisconnect
+
+from ..database import MongoClient, RedisClient, is_level_enabled, log_to_database
+from ..database.redis import REDIS_LIST_LIMIT
+from ..logger import CORRELATION_ID, LOGGER
+from ..nlp import CHAT_BACKEND, ChatClient, ChatSession, is_overview_question, render_digest
+from ..utils import (
+    CustomHTTPException,
+    Deadline,
+    DeadlineExceeded,
+    ORJSONResponse,
+    affinity_headers,
+    dumps,
+    loads,
+    run_in_background,
+    select_pages,
+)
+
+# Environment variable/s
+CHAT_BATCH_CONCURRENCY = int(os.getenv("CHAT_BATCH_CONCURRENCY", 4))
+CHAT_BATCH_MAX_QUESTIONS = int(os.getenv("CHAT_BATCH_MAX_QUESTIONS", 50))
+CHAT_CANCELLED_HISTORY = os.getenv("CHAT_CANCELLED_HISTORY", "skip").lower()
+CHAT_USE_DIGEST = os.getenv("CHAT_USE_DIGEST", "true").lower() == "true"
+
+# Constants
+PARTIAL_RESPONSE_SUFFIX = " [The response was interrupted.]"
 
 # Define router
 router = APIRouter()
 
 
+async def find_pdf(db: MongoClient, cache: RedisClient, pdf_id: str, deadline: Deadline) -> dict:
+    """
+    Find a PDF document by its ID with a read-through cache.
+    The document is read from Redis first, \
+    if it is not cached, it is read from MongoDB and cached.
+    Any failure of the cache is logged and the cache is bypassed, \
+    except running out of the deadline.
+
+    Parameters
+    ----------
+    db : MongoClient
+        The MongoDB client.
+
+    cache : RedisClient
+        The Redis client.
+
+    pdf_id : str
+        The ID of the PDF document.
+
+    deadline : Deadline
+        The deadline of the request.
+
+    Returns
+    -------
+    pdf : dict
+        The PDF document.
+        If the PDF document is not found, raise an exception.
+    """
+    try:
+        pdf = await deadline.run("cache", cache.get_pdf(pdf_id))
+        if pdf is not None:
+            return pdf
+    except DeadlineExceeded:
+        raise
+    except Exception as e:
+        LOGGER.error(f"Failed to read PDF document {pdf_id} from cache: {repr(e)}")
+
+    pdf = await deadline.run("database", db.find_pdf(pdf_id))
+
+    try:
+        await deadline.run("cache", cache.set_pdf(pdf_id, pdf))
+    except DeadlineExceeded:
+        raise
+    except Exception as e:
+        LOGGER.error(f"Failed to write PDF document {pdf_id} to cache: {repr(e)}")
+
+    return pdf
+
+
+async def find_history(db: MongoClient, cache: RedisClient, pdf_id: str, deadline: Deadline) -> list[dict] | None:
+    """
+    Find the chat history of a PDF document with the archive as a fallback.
+    The recent messages are read from Redis first, \
+    if the history has expired from Redis, its last `REDIS_LIST_LIMIT` messages \
+    are read from the archive in MongoDB and put back to Redis.
+    Any failure of the archive is logged and the chat continues without history, \
+    except running out of the deadline.
+
+    Parameters
+    ----------
+    db : MongoClient
+        The MongoDB client.
+
+    cache : RedisClient
+        The Redis client.
+
+    pdf_id : str
+        The ID of the PDF document.
+
+    deadline : Deadline
+        The deadline of the request.
+
+    Returns
+    -------
+    history : list[dict] | None
+        The chat history.
+        If the PDF document has no chat history, return None.
+    """
+    history = await deadline.run("cache", cache.get(pdf_id))
+    if history is not None:
+        return history
+
+    try:
+        history = await deadline.run("database", db.recent_messages(pdf_id, REDIS_LIST_LIMIT))
+        if not history:
+            return None
+        await deadline.run("cache", cache.restore(pdf_id, history))
+    except DeadlineExceeded:
+        raise
+    except Exception as e:
+        LOGGER.error(f"Failed to load the archived chat history of PDF document {pdf_id}: {repr(e)}")
+
+    return history or None
+
+
+def select_content(pdf: dict, body: "PageSelection") -> tuple[str, list[int] | None]:
+    """
+    Select the content of the PDF document to chat about.
+    Documents stored without page offsets are used as a whole.
+
+    Parameters
+    ----------
+    pdf : dict
+        The PDF document.
+
+    body : PageSelection
+        The request body with the page selection.
+
+    Returns
+    -------
+    content : str
+        The text content to chat about.
+
+    pages : list[int] | None
+        The selected page numbers.
+        If no page is selected, it is None.
+        If the page selection is invalid, raise an HTTP exception.
+    """
+    pages = None
+    content = pdf["text"]
+    if pdf.get("pages"):
+        try:
+            pages = body.page_numbers(len(pdf["pages"]))
+        except Exception as e:
+            raise CustomHTTPException(
+                exception=e,
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid page selection, the PDF has {len(pdf['pages'])} pages",
+            )
+        if pages is not None:
+            content = select_pages(pdf["text"], pdf["pages"], pages)
+
+    return content, pages
+
+
+def digest_content(pdf: dict, pages: list[int] | None) -> str | None:
+    """
+    Get the digest of the PDF document as the content to answer the overview questions.
+    The digest is only used for the whole document, and if `CHAT_USE_DIGEST` is set.
+
+    Parameters
+    ----------
+    pdf : dict
+        The PDF document.
+
+    pages : list[int] | None
+        The selected page numbers.
+
+    Returns
+    -------
+    content : str | None
+        The rendered digest.
+        If the digest can not be used, return None.
+    """
+    if not CHAT_USE_DIGEST or pages is not None or not pdf.get("digest"):
+        return None
+
+    return render_digest(pdf["digest"])
+
+
+async def send_message(
+    chat: ChatSession, message: str, deadline: Deadline, parts: list[str] | None = None
+) -> str:
+    """
+    Send a message to the bot and collect the streamed response.
+    The remaining time of the deadline is passed to the backend as the request timeout.
+
+    Parameters
+    ----------
+    chat : ChatSession
+        The chat session.
+
+    message : str
+        The message to send to the bot.
+
+    deadline : Deadline
+        The deadline of the request.
+
+    parts : list[str] | None
+        The list to collect the parts of the response into.
+        It keeps the partial response if the generation is cancelled.
+
+    Returns
+    -------
+    response : str
+        The response of the bot.
+    """
+    parts = [] if parts is None else parts
+    async for part in chat.stream(message, deadline.remaining()):
+        parts.append(part)
+
+    return "".join(parts)
+
+
+async def wait_for_disconnect(request: Request) -> None:
+    """
+    Wait until the client of a request disconnects.
+    The request body must be read before.
+
+    Parameters
+    ----------
+    request : Request
+        The incoming request object.
+    """
+    while (await request.receive())["type"] != "http.disconnect":
+        pass
+
+
+async def run_until_disconnect(request: Request, coroutine: Coroutine) -> object:
+    """
+    Run a coroutine and cancel it if the client disconnects before it completes.
+    The cancelled coroutine is awaited, so its resources are released when the function returns.
+    If the disconnect cannot be watched, the error is logged and the coroutine runs to completion.
+
+    Parameters
+    ----------
+    request : Request
+        The incoming request object.
+
+    coroutine : Coroutine
+        The coroutine to run.
+
+    Returns
+    -------
+    result : object
+        The result of the coroutine.
+        If the client disconnects, raise `ClientDisconnect`.
+    """
+    task = asyncio.create_task(coroutine)
+    watcher = asyncio.create_task(wait_for_disconnect(request))
+    try:
+        await asyncio.wait((task, watcher), return_when=asyncio.FIRST_COMPLETED)
+        if watcher.done() and watcher.exception() is not None:
+            LOGGER.error(f"Failed to watch the client disconnect: {repr(watcher.exception())}")
+            await task
+
+        # The watcher only completes on an `http.disconnect` message
+        disconnected = not task.done()
+    finally:
+        watcher.cancel()
+        if not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    if disconnected:
+        raise ClientDisconnect()
+    return task.result()
+
+
+def prompt_size(content: str, history: list[dict] | None, message: str) -> dict:
+    """
+    Measure the size of the prompt of a chat turn by section.
+
+    Parameters
+    ----------
+    content : str
+        The text content of the PDF document.
+
+    history : list[dict] | None
+        The chat history sent with the message.
+
+    message : str
+        The message sent to the bot.
+
+    Returns
+    -------
+    prompt_chars : dict
+        The number of characters of the document, the history and the message.
+    """
+    return {
+        "document": len(content),
+        "history": sum(len(item["parts"]) for item in history or []),
+        "message": len(message),
+    }
+
+
+def record_usage(
+    db: MongoClient, pdf_id: str, path: str, endpoint: str, chat: ChatSession, prompt_chars: dict
+) -> None:
+    """
+    Write the usage of a completed chat turn to the logs in the background.
+    The usage has the token counts and the timings of the backend, and the prompt size by section.
+    If the info logs are not written to the database, the usage is not recorded.
+
+    Parameters
+    ----------
+    db : MongoClient
+        The MongoDB client.
+
+    pdf_id : str
+        The ID of the PDF document.
+
+    path : str
+        The path of the request.
+
+    endpoint : str
+        The name of the chat endpoint. (e.g., chat, batch, websocket)
+
+    chat : ChatSession
+        The chat session that completed the turn.
+
+    prompt_chars : dict
+        The prompt size by section.
+    """
+    if not is_level_enabled("info"):
+        return
+
+    log = {
+        "level": "info",
+        "detail": "Chat turn.",
+        "correlation_id": CORRELATION_ID.get(),
+        "path": path,
+        "pdf_id": pdf_id,
+        "usage": {"endpoint": endpoint, "backend": CHAT_BACKEND, **chat.usage, "prompt_chars": prompt_chars},
+        "timestamp": datetime.now(),
+    }
+    run_in_background(log_to_database(db, log))
+
+
+def partial_turn(message: str, parts: list[str]) -> list[dict]:
+    """
+    Get the chat history messages of a cancelled generation.
+    If `CHAT_CANCELLED_HISTORY` is "partial", the partial response is recorded \
+    with `PARTIAL_RESPONSE_SUFFIX`, otherwise the turn is skipped.
+
+    Parameters
+    ----------
+    message : str
+        The message sent to the bot.
+
+    parts : list[str]
+        The parts of the response received before the cancellation.
+
+    Returns
+    -------
+    messages : list[dict]
+        The messages to add to the chat history, empty if the turn is skipped.
+    """
+    if CHAT_CANCELLED_HISTORY != "partial" or len(parts) == 0:
+        return []
+
+    return [
+        {"role": "user", "parts": message},
+        {"role": "model", "parts": "".join(parts) + PARTIAL_RESPONSE_SUFFIX},
+    ]
+
+
+async def update_history(cache: RedisClient, pdf_id: str, messages: list[dict], cancelled: int = 0) -> None:
+    """
+    Add messages to the chat history and count the cancelled generations.
+    Any failure is logged.
+
+    Parameters
+    ----------
+    cache : RedisClient
+        The Redis client.
+
+    pdf_id : str
+        The ID of the PDF document.
+
+    messages : list[dict]
+        The messages to add to the chat history.
+
+    cancelled : int
+        The number of cancelled generations.
+    """
+    try:
+        if cancelled > 0:
+            await cache.count_cancelled_chat(cancelled)
+        if len(messages) > 0:
+            await cache.push(pdf_id, messages)
+    except Exception as e:
+        LOGGER.error(f"Failed to update the chat history of PDF document {pdf_id}: {repr(e)}")
+
+
 @router.post("/v1/chat/{pdf_id}")
-async def chat_about_pdf(request: Request, pdf_id: str) -> JSONResponse:
+async def chat_about_pdf(request: Request, pdf_id: str) -> ORJSONResponse:
     """
     This endpoint is used to chat with the bot using the uploaded PDF file.
+    The overview questions (e.g., "What is this document about?") are answered \
+    from the digest of the document if it has one, instead of its whole text.
+    If `AFFINITY_NODES` is set, the `X-Affinity-Node` header names the node for the document.
+    Each stage of the request draws from the request's deadline, \
+    if a stage runs out of time, it returns 504 with the name of the stage.
     """
     app: FastAPI = request.app
     db: MongoClient = app.state.mongo_client
     cache: RedisClient = app.state.redis_client
     client: ChatClient = app.state.chat_client
+    deadline = Deadline.from_connection(request)
 
     # Get and validate the request body
     try:
-        message = ChatRequest(**(await request.json())).message
+        body = ChatRequest(**loads(await deadline.run("body", request.body())))
+        message = body.message
+    except DeadlineExceeded as e:
+        raise CustomHTTPException(
+            exception=e,
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=str(e),
+        )
     except Exception as e:
         raise CustomHTTPException(
             exception=e,
@@ -30,9 +445,15 @@ async def chat_about_pdf(request: Request, pdf_id: str) -> JSONResponse:
             detail="Invalid request body",
         )
 
-    # Find the PDF in the database
+    # Find the PDF in the cache or the database
     try:
-        pdf = await db.find_pdf(pdf_id)
+        pdf = await find_pdf(db, cache, pdf_id, deadline)
+    except DeadlineExceeded as e:
+        raise CustomHTTPException(
+            exception=e,
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=str(e),
+        )
     except Exception as e:
         raise CustomHTTPException(
             exception=e,
@@ -40,27 +461,48 @@ async def chat_about_pdf(request: Request, pdf_id: str) -> JSONResponse:
             detail="PDF not found",
         )
 
+    # Select the pages, the overview questions are answered from the digest
+    content, pages = select_content(pdf, body)
+    digest = digest_content(pdf, pages)
+    if digest is not None and is_overview_question(message):
+        content = digest
+
     # Chat with the bot using the message, text, metadata, and history
+    parts = []
     try:
-        # Get the chat history from Redis
-        history = await cache.get(pdf_id)
+        # Get the chat history from Redis or the archive
+        history = await find_history(db, cache, pdf_id, deadline)
 
         # Create chat session
-        chat = client.chat(pdf["metadata"], pdf["text"], history)
+        chat = client.chat(pdf["metadata"], content, history, pages)
 
-        # Send the message to the bot
-        response = []
-        async for part in await chat.send_message_async(message, stream=True):
-            response.append(part.candidates[0].content.parts[0].text)
-        response = "".join(response)
+        # Send the message to the bot, the generation is cancelled if the client disconnects
+        response = await run_until_disconnect(
+            request, deadline.run("llm", send_message(chat, message, deadline, parts))
+        )
 
         # Update the chat history in Redis
-        await cache.push(
-            pdf_id,
-            [
-                {"role": "user", "parts": message},
-                {"role": "model", "parts": response},
-            ],
+        turn = [
+            {"role": "user", "parts": message},
+            {"role": "model", "parts": response},
+        ]
+        await deadline.run("history", cache.push(pdf_id, turn))
+
+        # Record the token counts and timings of the turn
+        record_usage(db, pdf_id, request.url.path, "chat", chat, prompt_size(content, history, message))
+    # Handle client disconnect
+    except ClientDisconnect as e:
+        await update_history(cache, pdf_id, partial_turn(message, parts), cancelled=1)
+        raise CustomHTTPException(
+            exception=e,
+            status_code=499,
+            detail="Client disconnected",
+        )
+    except DeadlineExceeded as e:
+        raise CustomHTTPException(
+            exception=e,
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=str(e),
         )
     except Exception as e:
         raise CustomHTTPException(
@@ -69,16 +511,343 @@ async def chat_about_pdf(request: Request, pdf_id: str) -> JSONResponse:
             detail="Failed to chat with the bot",
         )
 
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_200_OK,
         content={"response": response},
+        headers=await affinity_headers(cache, pdf_id),
+    )
+
+
+@router.post("/v1/chat/{pdf_id}/batch")
+async def batch_chat_about_pdf(request: Request, pdf_id: str) -> StreamingResponse:
+    """
+    This endpoint is used to ask many questions about the uploaded PDF file in one request.
+    The PDF document, the chat history and the model are loaded once, \
+    and the questions are sent to the bot with `CHAT_BATCH_CONCURRENCY` concurrent sessions.
+    The overview questions are answered from the digest of the document if it has one.
+    The answers are streamed as newline-delimited JSON in the order of the questions, \
+    each answer is sent as soon as it and the answers before it are completed.
+    All questions draw from the request's deadline, \
+    a question that runs out of time is answered with the name of the stage.
+    """
+    app: FastAPI = request.app
+    db: MongoClient = app.state.mongo_client
+    cache: RedisClient = app.state.redis_client
+    client: ChatClient = app.state.chat_client
+    deadline = Deadline.from_connection(request)
+
+    # Get and validate the request body
+    try:
+        body = BatchChatRequest(**loads(await deadline.run("body", request.body())))
+    except DeadlineExceeded as e:
+        raise CustomHTTPException(
+            exception=e,
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=str(e),
+        )
+    except Exception as e:
+        raise CustomHTTPException(
+            exception=e,
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid request body",
+        )
+
+    # Find the PDF in the cache or the database
+    try:
+        pdf = await find_pdf(db, cache, pdf_id, deadline)
+    except DeadlineExceeded as e:
+        raise CustomHTTPException(
+            exception=e,
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=str(e),
+        )
+    except Exception as e:
+        raise CustomHTTPException(
+            exception=e,
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="PDF not found",
+        )
+
+    # Select the pages
+    content, pages = select_content(pdf, body)
+    digest = digest_content(pdf, pages)
+
+    # Get the chat history from Redis or the archive and create the models, the overview questions use the digest
+    try:
+        history = await find_history(db, cache, pdf_id, deadline)
+        model = client.model(pdf["metadata"], content, pages)
+        digest_model = None
+        if digest is not None and any(is_overview_question(question) for question in body.questions):
+            digest_model = client.model(pdf["metadata"], digest)
+    except DeadlineExceeded as e:
+        raise CustomHTTPException(
+            exception=e,
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=str(e),
+        )
+    except Exception as e:
+        raise CustomHTTPException(
+            exception=e,
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to chat with the bot",
+        )
+
+    semaphore = asyncio.Semaphore(CHAT_BATCH_CONCURRENCY)
+
+    async def answer(question: str, parts: list[str]) -> str:
+        # Each question has its own session, so the answers do not see each other
+        async with semaphore:
+            overview = digest_model is not None and is_overview_question(question)
+            chat = (digest_model if overview else model).start_chat(history=history)
+            response = await deadline.run("llm", send_message(chat, question, deadline, parts))
+            prompt_chars = prompt_size(digest if overview else content, history, question)
+            record_usage(db, pdf_id, request.url.path, "batch", chat, prompt_chars)
+            return response
+
+    async def stream() -> AsyncGenerator[bytes, None]:
+        partials = [[] for _ in body.questions]
+        tasks = [asyncio.create_task(answer(question, parts)) for question, parts in zip(body.questions, partials)]
+        try:
+            for index, (question, task) in enumerate(zip(body.questions, tasks)):
+                try:
+                    item = {"index": index, "question": question, "response": await task}
+                except DeadlineExceeded as e:
+                    item = {"index": index, "question": question, "detail": str(e)}
+                except Exception as e:
+                    LOGGER.error(f"Failed to answer question {index} about PDF document {pdf_id}: {repr(e)}")
+                    item = {"index": index, "question": question, "detail": "Failed to chat with the bot"}
+                yield dumps(item) + b"\n"
+        finally:
+            # Stop the remaining questions if the client disconnects
+            messages, cancelled = [], 0
+            for question, parts, task in zip(body.questions, partials, tasks):
+                # The awaited task is cancelled together with the stream
+                if not task.done() or task.cancelled():
+                    task.cancel()
+                    cancelled += 1
+                    messages += partial_turn(question, parts)
+                elif task.exception() is None:
+                    messages += [{"role": "user", "parts": question}, {"role": "model", "parts": task.result()}]
+
+            # Update the chat history in the background, since the stream may be cancelled
+            run_in_background(update_history(cache, pdf_id, messages if body.save_history else [], cancelled))
+
+    return StreamingResponse(
+        stream(),
+        status_code=status.HTTP_200_OK,
+        media_type="application/x-ndjson",
+        headers=await affinity_headers(cache, pdf_id),
     )
 
 
-# Request body model
-class ChatRequest(BaseModel):
+async def write_history(cache: RedisClient, pdf_id: str, queue: asyncio.Queue) -> None:
+    """
+    Write the turns of a WebSocket chat session to the chat history in Redis.
+    The turns are written one by one in their order until None is received.
+    Any failure is logged and the turn is skipped.
+
+    Parameters
+    ----------
+    cache : RedisClient
+        The Redis client.
+
+    pdf_id : str
+        The ID of the PDF document.
+
+    queue : asyncio.Queue
+        The queue of the turns, each turn is a list of messages.
+    """
+    while (turn := await queue.get()) is not None:
+        try:
+            await cache.push(pdf_id, turn)
+        except Exception as e:
+            LOGGER.error(f"Failed to update the chat history of PDF document {pdf_id}: {repr(e)}")
+
+
+@router.websocket("/v1/chat/{pdf_id}/ws")
+async def chat_about_pdf_websocket(websocket: WebSocket, pdf_id: str) -> None:
+    """
+    This endpoint is used to chat with the bot over a WebSocket connection.
+    The PDF document, the chat history and the model are loaded once per connection, \
+    and the conversation window is kept in memory for the following messages.
+    The overview questions are answered from the digest of the document if it has one.
+    The response is streamed as it is generated, \
+    and the chat history in Redis is updated in the background.
+    The pages can be selected with the `pages` and `page_range` query parameters.
+    Opening the session and each message have their own deadline.
+    """
+    app: FastAPI = websocket.app
+    db: MongoClient = app.state.mongo_client
+    cache: RedisClient = app.state.redis_client
+    client: ChatClient = app.state.chat_client
+    deadline = Deadline.from_connection(websocket)
+
+    async def forward(chat: ChatSession, message: str, parts: list[str], deadline: Deadline) -> None:
+        # Send each part of the response as soon as it is received
+        async for part in chat.stream(message, deadline.remaining()):
+            parts.append(part)
+            await websocket.send_text(dumps({"type": "chunk", "text": part}).decode())
+
+    await websocket.accept()
+
+    # Find the PDF, select its pages and create the model with the chat history
+    detail = "Invalid page selection"
+    try:
+        selection = PageSelection(
+            pages=websocket.query_params.getlist("pages") or None,
+            page_range=websocket.query_params.getlist("page_range") or None,
+        )
+        detail = "PDF not found"
+        pdf = await find_pdf(db, cache, pdf_id, deadline)
+        detail = "Failed to start the chat session"
+        content, pages = select_content(pdf, selection)
+        model = client.model(pdf["metadata"], content, pages)
+        digest = digest_content(pdf, pages)
+        digest_model = client.model(pdf["metadata"], digest) if digest is not None else None
+        history = await find_history(db, cache, pdf_id, deadline) or []
+    except Exception as e:
+        code = status.WS_1008_POLICY_VIOLATION
+        if isinstance(e, CustomHTTPException):
+            detail = e.detail
+        elif isinstance(e, DeadlineExceeded):
+            code, detail = status.WS_1013_TRY_AGAIN_LATER, str(e)
+        LOGGER.error(f"Failed to start the chat session of PDF document {pdf_id}: {repr(e)}")
+        await websocket.send_text(dumps({"type": "error", "detail": detail}).decode())
+        await websocket.close(code=code)
+        return
+
+    queue = asyncio.Queue()
+    writer = asyncio.create_task(write_history(cache, pdf_id, queue))
+    try:
+        while True:
+            # Get and validate the message
+            try:
+                message = WebSocketMessage(**loads(await websocket.receive_text())).message
+            except WebSocketDisconnect:
+                raise
+            except Exception:
+                await websocket.send_text(dumps({"type": "error", "detail": "Invalid message"}).decode())
+                continue
+
+            # Stream the response of the bot, the session is created from the in-memory window
+            parts = []
+            deadline = Deadline.from_connection(websocket)
+            try:
+                overview = digest_model is not None and is_overview_question(message)
+                chat = (digest_model if overview else model).start_chat(history=history)
+                await deadline.run("llm", forward(chat, message, parts, deadline))
+                response = "".join(parts)
+                prompt_chars = prompt_size(digest if overview else content, history, message)
+                record_usage(db, pdf_id, websocket.url.path, "websocket", chat, prompt_chars)
+            # Stop the generation if the client disconnects
+            except WebSocketDisconnect:
+                if turn := partial_turn(message, parts):
+                    queue.put_nowait(turn)
+                run_in_background(update_history(cache, pdf_id, [], cancelled=1))
+                raise
+            except DeadlineExceeded as e:
+                await websocket.send_text(dumps({"type": "error", "detail": str(e)}).decode())
+                continue
+            except Exception as e:
+                LOGGER.error(f"Failed to chat with the bot about PDF document {pdf_id}: {repr(e)}")
+                await websocket.send_text(dumps({"type": "error", "detail": "Failed to chat with the bot"}).decode())
+                continue
+
+            # Keep the conversation window as long as the chat history in Redis
+            turn = [{"role": "user", "parts": message}, {"role": "model", "parts": response}]
+            history = history + turn
+            history = history[max(len(history) - (REDIS_LIST_LIMIT - REDIS_LIST_LIMIT % 2), 0) :]
+
+            # Update the chat history in Redis in the background
+            queue.put_nowait(turn)
+            await websocket.send_text(dumps({"type": "end"}).decode())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        # Write the remaining turns
+        queue.put_nowait(None)
+        await writer
+
+
+# Request body models
+class PageSelection(BaseModel):
+    """
+    Page selection of the chat endpoints.
+    Inputs other than this model's attributes will be ignored.
+
+    Attributes
+    ----------
+    pages : list[int] | None
+        The page numbers to chat about, starting from 1.
+
+    page_range : tuple[int, int] | None
+        The first and last page numbers to chat about, inclusive.
+    """
+
+    model_config = ConfigDict(extra="ignore")
+
+    pages: list[int] | None = None
+    page_range: tuple[int, int] | None = None
+
+    @model_validator(mode="after")
+    def check_pages(self) -> "PageSelection":
+        """
+        Check that the page numbers are positive and the page range is ordered.
+        """
+        if self.pages is not None and (len(self.pages) == 0 or min(self.pages) < 1):
+            raise ValueError("Page numbers must be positive")
+        if self.page_range is not None and not (1 <= self.page_range[0] <= self.page_range[1]):
+            raise ValueError("Page range must be positive and ordered")
+        return self
+
+    def page_numbers(self, page_count: int) -> list[int] | None:
+        """
+        Get the selected page numbers from the pages and the page range.
+
+        Parameters
+        ----------
+        page_count : int
+            The number of pages of the PDF document.
+
+        Returns
+        -------
+        page_numbers : list[int] | None
+            The sorted page numbers.
+            If no page is selected, return None.
+            If a page number exceeds the page count, raise an exception.
+        """
+        if self.pages is None and self.page_range is None:
+            return None
+
+        page_numbers = set(self.pages or [])
+        if self.page_range is not None:
+            page_numbers.update(self.page_range)
+
+        if max(page_numbers) > page_count:
+            raise ValueError(f"Page number exceeds the page count ({page_count})")
+
+        if self.page_range is not None:
+            page_numbers.update(range(self.page_range[0], self.page_range[1] + 1))
+
+        return sorted(page_numbers)
+
+
+class ChatRequest(PageSelection):
     """
     Request body model for the chat endpoint.
+
+    Attributes
+    ----------
+    message : str
+        The message to send to the bot.
+    """
+
+    message: str
+
+
+class WebSocketMessage(BaseModel):
+    """
+    Message model for the WebSocket chat endpoint.
     Inputs other than this model's attributes will be ignored.
 
     Attributes
@@ -90,3 +859,21 @@ class ChatRequest(BaseModel):
     model_config = ConfigDict(extra="ignore")
 
     message: str
+
+
+class BatchChatRequest(PageSelection):
+    """
+    Request body model for the batch chat endpoint.
+
+    Attributes
+    ----------
+    questions : list[str]
+        The questions to send to the bot, at most `CHAT_BATCH_MAX_QUESTIONS`.
+
+    save_history : bool
+        Indicates if the questions and answers are added to the chat history.
+        Each question is answered with the chat history before the batch in any case.
+    """
+
+    questions: list[str] = Field(min_length=1, max_length=CHAT_BATCH_MAX_QUESTIONS)
+    save_history: bool = True
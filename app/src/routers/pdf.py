@@ -1,20 +1,111 @@
+import asyncio
+import os
+
 from fastapi import APIRouter, FastAPI, Request, status
-from fastapi.responses import JSONResponse
 from starlette.requests import ClientDisconnect
 from streaming_form_data import StreamingFormDataParser
-from streaming_form_data.targets import ValueTarget
 
-from ..database import MongoClient
-from ..utils import CustomHTTPException, MaxBodySizeError, MaxBodySizeValidator, read_pdf_from_bytes
+from ..database import MongoClient, RedisClient
+from ..logger import LOGGER
+from ..nlp import ChatClient
+from ..search import SearchIndex
+from ..utils import (
+    CustomHTTPException,
+    Deadline,
+    DeadlineExceeded,
+    InvalidFileError,
+    MaxBodySizeError,
+    MaxBodySizeValidator,
+    ORJSONResponse,
+    PDFLimitError,
+    PDFTarget,
+    affinity_headers,
+    read_pdf_from_bytes,
+    run_in_background,
+)
+from ..utils.deadline import REQUEST_DEADLINE_MS
+
+# Environment variable/s
+PDF_DIGEST = os.getenv("PDF_DIGEST", "false").lower() == "true"
 
 # Define router
 router = APIRouter()
 
+# Constants
+CLOSE_HEADERS = {"Connection": "close"}
+
+
+async def build_digest(
+    db: MongoClient, cache: RedisClient, client: ChatClient, pdf_id: str, metadata: dict, text: str
+) -> None:
+    """
+    Create the digest of an uploaded PDF document and store it with the document.
+    The cached document is removed, so the chat endpoints read the document with its digest.
+    It has its own deadline of `REQUEST_DEADLINE_MS`, and any failure is logged.
+
+    Parameters
+    ----------
+    db : MongoClient
+        The MongoDB client.
+
+    cache : RedisClient
+        The Redis client.
+
+    client : ChatClient
+        The chat client.
+
+    pdf_id : str
+        The ID of the PDF document.
+
+    metadata : dict
+        The metadata of the PDF document.
+
+    text : str
+        The text content of the PDF document.
+    """
+    deadline = Deadline(REQUEST_DEADLINE_MS, cache)
+    try:
+        digest = await deadline.run("digest", client.digest(metadata, text, deadline.remaining()))
+        await db.set_digest(pdf_id, digest)
+        await cache.delete_pdf(pdf_id)
+    except Exception as e:
+        LOGGER.error(f"Failed to create the digest of PDF document {pdf_id}: {repr(e)}")
+
+
+async def index_pdf(index: SearchIndex, pdf_id: str, text: str, pages: list[dict] | None) -> None:
+    """
+    Add the passages of an uploaded PDF document to the search index in a thread.
+    Any failure is logged.
+
+    Parameters
+    ----------
+    index : SearchIndex
+        The search index.
+
+    pdf_id : str
+        The ID of the PDF document.
+
+    text : str
+        The text content of the PDF document.
+
+    pages : list[dict] | None
+        The start and end offsets of the pages in the text.
+    """
+    try:
+        await asyncio.to_thread(index.add_pdf, pdf_id, text, pages)
+    except Exception as e:
+        LOGGER.error(f"Failed to index PDF document {pdf_id}: {repr(e)}")
+
 
 @router.post("/v1/pdf")
-async def upload_pdf(request: Request) -> JSONResponse:
+async def upload_pdf(request: Request) -> ORJSONResponse:
     """
     This endpoint is used to upload a PDF file to the server.
+    Reading the body and inserting the document draw from the request's deadline, \
+    if a stage runs out of time, it returns 504 with the name of the stage.
+    If `PDF_DIGEST` is set, the digest of the document is created in the background.
+    If `SEARCH_INDEX_PATH` is set, the passages of the document are added to the search index in the background.
+    If `AFFINITY_NODES` is set, the `X-Affinity-Node` header names the node for the document.
 
     Parameters
     ----------
@@ -23,29 +114,40 @@ async def upload_pdf(request: Request) -> JSONResponse:
 
     Returns
     -------
-    response : JSONResponse
+    response : ORJSONResponse
         JSON response containing the status of the request.
     """
     app: FastAPI = request.app
     db: MongoClient = app.state.mongo_client
+    cache: RedisClient = app.state.redis_client
+    client: ChatClient = app.state.chat_client
+    index: SearchIndex | None = app.state.search_index
+    deadline = Deadline.from_connection(request)
+
+    async def read_body(validator: MaxBodySizeValidator, parser: StreamingFormDataParser) -> None:
+        # Validate and parse each chunk of the body as soon as it is received
+        async for chunk in request.stream():
+            validator.chunk(chunk)
+            parser.data_received(chunk)
 
     # Read the incoming stream
     try:
-        # Create a target for the file
+        # Reject the request by its declared size before reading the body
         validator = MaxBodySizeValidator()
-        file = ValueTarget()
+        validator.content_length(request.headers.get("content-length"))
+
+        # Create a target for the file, it validates the file while the body is read
+        file = PDFTarget()
         parser = StreamingFormDataParser(headers=request.headers)
         parser.register("file", file)
 
         # Read the incoming stream
-        async for chunk in request.stream():
-            validator.chunk(chunk)
-            parser.data_received(chunk)
+        await deadline.run("body", read_body(validator, parser))
 
         # Get the filename
         filename = file.multipart_filename
-        if filename is None or not filename.endswith(".pdf"):
-            raise Exception("Invalid file format")
+        if filename is None:
+            raise InvalidFileError("Missing file")
     # Handle client disconnect
     except ClientDisconnect as e:
         raise CustomHTTPException(
@@ -53,24 +155,40 @@ async def upload_pdf(request: Request) -> JSONResponse:
             status_code=499,
             detail="Client disconnected",
         )
-    # Handle file size error
+    # Handle slow upload, the rest of the body is not read
+    except DeadlineExceeded as e:
+        raise CustomHTTPException(
+            exception=e,
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=str(e),
+            headers=CLOSE_HEADERS,
+        )
+    # Handle file size error, the rest of the body is not read
     except MaxBodySizeError as e:
         raise CustomHTTPException(
             exception=e,
             status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
             detail=f"Request body size exceeded {validator.max_size} bytes ({e.body_len} bytes received)",
+            headers=CLOSE_HEADERS,
         )
-    # Handle other errors
+    # Handle other errors, the rest of the body is not read
     except Exception as e:
         raise CustomHTTPException(
             exception=e,
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid file data",
+            headers=CLOSE_HEADERS,
         )
 
-    # Parse the PDF file
+    # Parse the PDF file, the text is truncated or rejected at the extraction limits
     try:
-        metadata, text = read_pdf_from_bytes(filename, file.value)
+        metadata, text, pages = read_pdf_from_bytes(filename, file.value)
+    except PDFLimitError as e:
+        raise CustomHTTPException(
+            exception=e,
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e),
+        )
     except Exception as e:
         raise CustomHTTPException(
             exception=e,
@@ -80,15 +198,30 @@ async def upload_pdf(request: Request) -> JSONResponse:
 
     # Insert the PDF document into the database
     try:
-        pdf_id = await db.insert_pdf(metadata, text)
-    except:
+        pdf_id = await deadline.run("database", db.insert_pdf(metadata, text, pages))
+    except DeadlineExceeded as e:
+        raise CustomHTTPException(
+            exception=e,
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=str(e),
+        )
+    except Exception as e:
         raise CustomHTTPException(
             exception=e,
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to insert PDF document into the database",
         )
 
-    return JSONResponse(
+    # Create the digest of the document for the overview questions
+    if PDF_DIGEST:
+        run_in_background(build_digest(db, cache, client, pdf_id, metadata, text))
+
+    # Add the document to the search index
+    if index is not None:
+        run_in_background(index_pdf(index, pdf_id, text, pages))
+
+    return ORJSONResponse(
         status_code=status.HTTP_201_CREATED,
         content={"pdf_id": pdf_id},
+        headers=await affinity_headers(cache, pdf_id),
     )
@@ -0,0 +1,70 @@
+import asyncio
+import os
+
+from fastapi import APIRouter, FastAPI, Request, status
+
+from ..search import SearchIndex
+from ..utils import CustomHTTPException, ORJSONResponse
+
+# Environment variable/s
+SEARCH_MAX_LIMIT = int(os.getenv("SEARCH_MAX_LIMIT", 100))
+
+# Define router
+router = APIRouter()
+
+
+@router.get("/v1/search")
+async def search(request: Request, q: str = "", limit: int = 10) -> ORJSONResponse:
+    """
+    This endpoint is used to search the passages of all uploaded PDF documents.
+    The `limit` passages most similar to the query `q` are ranked, \
+    and they are grouped by PDF document in the order of their best passages.
+    The index is searched in a thread, so the event loop of the worker is not blocked.
+    If `SEARCH_INDEX_PATH` is not set, it returns 503.
+    """
+    app: FastAPI = request.app
+    index: SearchIndex | None = app.state.search_index
+
+    if index is None:
+        raise CustomHTTPException(
+            exception=None,
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="The search index is not enabled",
+        )
+
+    if not q.strip():
+        raise CustomHTTPException(
+            exception=None,
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The query must not be empty",
+        )
+
+    if not 1 <= limit <= SEARCH_MAX_LIMIT:
+        raise CustomHTTPException(
+            exception=None,
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"The limit must be between 1 and {SEARCH_MAX_LIMIT}",
+        )
+
+    # Search the index
+    try:
+        passages = await asyncio.to_thread(index.search, q, limit)
+    except Exception as e:
+        raise CustomHTTPException(
+            exception=e,
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to search the documents",
+        )
+
+    # Group the passages by PDF document, the best passage of each document comes first
+    documents: dict[str, dict] = {}
+    for passage in passages:
+        document = documents.setdefault(passage["pdf_id"], {"pdf_id": passage["pdf_id"], "score": passage["score"]})
+        document.setdefault("passages", []).append(
+            {"page": passage["page"], "text": passage["text"], "score": passage["score"]}
+        )
+
+    return ORJSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={"documents": list(documents.values())},
+    )
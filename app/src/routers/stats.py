@@ -0,0 +1,112 @@
+import asyncio
+
+from fastapi import APIRouter, FastAPI, Request, status
+
+from ..database import MongoClient, RedisClient
+from ..logger import dropped_log_records
+from ..utils import CustomHTTPException, ORJSONResponse
+
+# Define router
+router = APIRouter()
+
+
+@router.get("/v1/stats/usage")
+async def usage_stats(request: Request, days: int = 7, pdf_id: str | None = None) -> ORJSONResponse:
+    """
+    This endpoint is used to report the usage of the chat turns of the last days.
+    The token counts and the prompt sizes are summed, \
+    and the percentiles of the time to first token and the generation time are computed \
+    per PDF document and per day.
+    The report can be limited to a PDF document with the `pdf_id` query parameter.
+    """
+    app: FastAPI = request.app
+    db: MongoClient = app.state.mongo_client
+
+    if days < 1:
+        raise CustomHTTPException(
+            exception=None,
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The number of days must be positive",
+        )
+
+    # Aggregate the usage logs
+    try:
+        report = await db.usage_report(days, pdf_id)
+    except Exception as e:
+        raise CustomHTTPException(
+            exception=e,
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to aggregate the usage",
+        )
+
+    return ORJSONResponse(
+        status_code=status.HTTP_200_OK,
+        content=report,
+    )
+
+
+@router.get("/v1/stats/latency")
+async def latency_stats(request: Request, minutes: int = 60, route: str | None = None) -> ORJSONResponse:
+    """
+    This endpoint is used to report the latency and the error rate of the requests of the last minutes.
+    The p50, p95 and p99 durations are computed per route and status code, \
+    and the rate of the 5xx responses is computed per route.
+    The report can be limited to a route template with the `route` query parameter.
+    """
+    app: FastAPI = request.app
+    db: MongoClient = app.state.mongo_client
+
+    if minutes < 1:
+        raise CustomHTTPException(
+            exception=None,
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The number of minutes must be positive",
+        )
+
+    # Aggregate the request logs
+    try:
+        report = await db.latency_report(minutes, route)
+    except Exception as e:
+        raise CustomHTTPException(
+            exception=e,
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to aggregate the latency",
+        )
+
+    return ORJSONResponse(
+        status_code=status.HTTP_200_OK,
+        content=report,
+    )
+
+
+@router.get("/v1/stats/counters")
+async def counter_stats(request: Request) -> ORJSONResponse:
+    """
+    This endpoint is used to report the counters of the cache, the cancelled chats and the deadlines.
+    The counters in Redis are shared by all workers and nodes, \
+    while the number of dropped log records is counted by the worker that serves the request.
+    """
+    app: FastAPI = request.app
+    cache: RedisClient = app.state.redis_client
+
+    # Read the counters
+    try:
+        pdf_cache, cancelled_chats, deadline_exceeded = await asyncio.gather(
+            cache.pdf_cache_stats(), cache.cancelled_chats(), cache.deadline_stats()
+        )
+    except Exception as e:
+        raise CustomHTTPException(
+            exception=e,
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to read the counters",
+        )
+
+    return ORJSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "pdf_cache": pdf_cache,
+            "cancelled_chats": cancelled_chats,
+            "deadline_exceeded": deadline_exceeded,
+            "dropped_log_records": dropped_log_records(),
+        },
+    )
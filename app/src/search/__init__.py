@@ -0,0 +1,11 @@
+from .embedding import EMBEDDING_DIM, embed
+from .index import SEARCH_INDEX_PATH, SearchIndex, chunk_text, create_search_index
+
+__all__ = [
+    "EMBEDDING_DIM",
+    "embed",
+    "SEARCH_INDEX_PATH",
+    "SearchIndex",
+    "chunk_text",
+    "create_search_index",
+]
@@ -0,0 +1,48 @@
+import argparse
+import asyncio
+import time
+from pathlib import Path
+
+from ..database import MongoClient
+from .index import SEARCH_INDEX_PATH, SearchIndex
+
+
+async def rebuild(index: SearchIndex) -> tuple[int, int]:
+    """
+    Rebuild the search index from all PDF documents in MongoDB.
+
+    Parameters
+    ----------
+    index : SearchIndex
+        The search index, its rows are removed first.
+
+    Returns
+    -------
+    counts : tuple[int, int]
+        The number of indexed documents and passages.
+    """
+    db = MongoClient()
+    index.clear()
+
+    documents = passages = 0
+    async for pdf in db.iter_pdfs():
+        passages += await asyncio.to_thread(index.add_pdf, str(pdf["_id"]), pdf["text"], pdf.get("pages"))
+        documents += 1
+
+    await db.close()
+    return documents, passages
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the search index from the PDF documents in the database.")
+    parser.add_argument(
+        "--path", type=Path, default=SEARCH_INDEX_PATH or None, help="The directory of the search index."
+    )
+    args = parser.parse_args()
+
+    if args.path is None:
+        parser.error("the directory of the search index is required, set SEARCH_INDEX_PATH or --path")
+
+    start = time.perf_counter()
+    documents, passages = asyncio.run(rebuild(SearchIndex(args.path)))
+    print(f"{passages} passages of {documents} documents are indexed in {time.perf_counter() - start:.1f} s")
@@ -0,0 +1,69 @@
+import re
+import zlib
+
+import numpy as np
+
+# Constants
+EMBEDDING_DIM = 256
+TOKEN_PATTERN = re.compile(r"\w+")
+STOPWORDS = frozenset(
+    (
+        "and are but for from has had have her his its not our that the their them then there these they this "
+        + "those was were what when where which who why will with would you your about into than also been can"
+    ).split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Split a text into the lowercase words of the embedding.
+    The words with fewer than three characters and the stopwords are skipped.
+
+    Parameters
+    ----------
+    text : str
+        The text to split.
+
+    Returns
+    -------
+    tokens : list[str]
+        The words of the text.
+    """
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if len(token) > 2 and token not in STOPWORDS]
+
+
+def embed(texts: list[str]) -> np.ndarray:
+    """
+    Embed texts with the hashing trick, on the CPU and without a model.
+    The words and the pairs of adjacent words are hashed into `EMBEDDING_DIM` signed buckets, \
+    the counts are scaled sublinearly, and the vectors are normalized, \
+    so the dot product of two vectors is their cosine similarity.
+
+    Parameters
+    ----------
+    texts : list[str]
+        The texts to embed.
+
+    Returns
+    -------
+    vectors : np.ndarray
+        The float32 vectors of the texts, with the shape (len(texts), `EMBEDDING_DIM`).
+        The vector of a text without words is zero.
+    """
+    vectors = np.zeros((len(texts), EMBEDDING_DIM), dtype=np.float32)
+    for i, text in enumerate(texts):
+        tokens = tokenize(text)
+        features = tokens + [f"{first} {second}" for first, second in zip(tokens, tokens[1:])]
+        if not features:
+            continue
+
+        hashes = np.fromiter((zlib.crc32(feature.encode()) for feature in features), np.uint32, len(features))
+        signs = np.where(hashes >> 31, -1.0, 1.0)
+        counts = np.bincount(hashes % EMBEDDING_DIM, weights=signs, minlength=EMBEDDING_DIM)
+        vector = np.sign(counts) * np.log1p(np.abs(counts))
+
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vectors[i] = vector / norm
+
+    return vectors
@@ -0,0 +1,558 @@
+import fcntl
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from .embedding import EMBEDDING_DIM, embed
+
+# Environment variable/s
+SEARCH_INDEX_PATH = os.getenv("SEARCH_INDEX_PATH", "")
+SEARCH_CHUNK_WORDS = int(os.getenv("SEARCH_CHUNK_WORDS", 120))
+SEARCH_LISTS = int(os.getenv("SEARCH_LISTS", 1024))
+SEARCH_PROBES = int(os.getenv("SEARCH_PROBES", 16))
+
+# Constants
+CHUNK_DTYPE = np.dtype([("pdf_id", "S24"), ("page", "<i4"), ("offset", "<i8"), ("length", "<i4")])
+VECTOR_DTYPE = np.dtype(np.float16)
+VECTOR_SIZE = EMBEDDING_DIM * VECTOR_DTYPE.itemsize
+CHUNKS_FILE = "chunks.bin"
+VECTORS_FILE = "vectors.f16"
+PASSAGES_FILE = "passages.txt"
+ASSIGNMENTS_FILE = "assignments.i32"
+CENTROIDS_FILE = "centroids.f32"
+LOCK_FILE = "index.lock"
+TRAINING_ROWS_PER_LIST = 16
+MIN_TRAINING_LISTS = 64
+SAMPLE_ROWS_PER_LIST = 32
+KMEANS_ITERATIONS = 10
+ASSIGN_BLOCK_ROWS = 65536
+UNPOSTED_ROWS_LIMIT = 4096
+
+# The float32 values of all float16 bit patterns, a lookup is faster than the conversion of numpy
+FLOAT16_TABLE = np.arange(2**16, dtype=np.uint32).astype(np.uint16).view(np.float16).astype(np.float32)
+
+
+def to_float32(vectors: np.ndarray) -> np.ndarray:
+    """
+    Convert float16 vectors to float32 with a lookup table.
+
+    Parameters
+    ----------
+    vectors : np.ndarray
+        The float16 vectors.
+
+    Returns
+    -------
+    vectors : np.ndarray
+        The float32 vectors.
+    """
+    return np.take(FLOAT16_TABLE, vectors.view(np.uint16))
+
+
+def chunk_text(text: str, pages: list[dict] | None, words: int = SEARCH_CHUNK_WORDS) -> list[tuple[int, str]]:
+    """
+    Split the text of a PDF document into passages of `words` words within its pages.
+
+    Parameters
+    ----------
+    text : str
+        The text content of the PDF document.
+
+    pages : list[dict] | None
+        The start and end offsets of the pages in the text.
+        If it is None, the text is a single page.
+
+    words : int
+        The maximum number of words of a passage.
+
+    Returns
+    -------
+    passages : list[tuple[int, str]]
+        The page numbers (starting from 1) and the texts of the passages.
+    """
+    pages = pages or [{"start": 0, "end": len(text)}]
+
+    passages = []
+    for number, page in enumerate(pages, 1):
+        tokens = text[page["start"] : page["end"]].split()
+        for start in range(0, len(tokens), words):
+            passages.append((number, " ".join(tokens[start : start + words])))
+
+    return passages
+
+
+def train_centroids(vectors: np.ndarray, lists: int, iterations: int = KMEANS_ITERATIONS) -> np.ndarray:
+    """
+    Cluster normalized vectors with spherical k-means.
+
+    Parameters
+    ----------
+    vectors : np.ndarray
+        The float32 vectors to cluster, at least `lists` of them.
+
+    lists : int
+        The number of clusters.
+
+    iterations : int
+        The number of iterations.
+
+    Returns
+    -------
+    centroids : np.ndarray
+        The normalized float32 centroids of the clusters, with the shape (lists, `EMBEDDING_DIM`).
+    """
+    rng = np.random.default_rng(0)
+    centroids = vectors[rng.choice(len(vectors), lists, replace=False)].copy()
+
+    for _ in range(iterations):
+        assignments = np.argmax(vectors @ centroids.T, axis=1)
+
+        # Sum the vectors of each cluster, the empty clusters restart from a random vector
+        order = np.argsort(assignments, kind="stable")
+        clusters, starts = np.unique(assignments[order], return_index=True)
+        centroids[:] = vectors[rng.choice(len(vectors), lists)]
+        centroids[clusters] = np.add.reduceat(vectors[order], starts, axis=0)
+
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        centroids /= np.maximum(norms, 1e-12)
+
+    return centroids
+
+
+def assign_lists(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """
+    Assign vectors to the lists of their nearest centroids.
+
+    Parameters
+    ----------
+    vectors : np.ndarray
+        The vectors to assign.
+
+    centroids : np.ndarray
+        The centroids of the lists.
+
+    Returns
+    -------
+    assignments : np.ndarray
+        The int32 list of each vector.
+    """
+    assignments = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), ASSIGN_BLOCK_ROWS):
+        block = to_float32(vectors[start : start + ASSIGN_BLOCK_ROWS])
+        assignments[start : start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+
+    return assignments
+
+
+class SearchIndex:
+    """
+    Vector index of the passages of the PDF documents, stored in append-only files in a directory.
+    The float16 vectors are memory-mapped, so the index is shared by the workers through the page cache \
+    and only the pages of the visited rows are read.
+    Until the index has `TRAINING_ROWS_PER_LIST` rows for each of `MIN_TRAINING_LISTS` lists, all rows are scanned.
+    Then the lists are trained with k-means, each vector is assigned to its nearest list, \
+    and a search only scans the lists of the `probes` nearest centroids (inverted file index).
+    The new passages are assigned to the trained lists as they are added, \
+    and the lists are trained again each time the index can have twice as many lists, up to `lists`.
+    The writers of all processes take a file lock, and the chunk records are written last, \
+    so the readers only see complete rows.
+    """
+
+    def __init__(self, path: str | Path, lists: int = SEARCH_LISTS, probes: int = SEARCH_PROBES) -> None:
+        """
+        Constructor method for `SearchIndex`.
+        The directory is created if it does not exist.
+
+        Parameters
+        ----------
+        path : str | Path
+            The directory of the index.
+
+        lists : int
+            The maximum number of lists trained by this writer.
+
+        probes : int
+            The number of lists scanned by a search.
+
+        Attributes
+        ----------
+        count : int
+            The number of rows seen by this reader.
+
+        chunks : np.ndarray | None
+            The memory-mapped chunk records (PDF ID, page, passage offset and length).
+
+        vectors : np.ndarray | None
+            The memory-mapped float16 vectors.
+
+        centroids : np.ndarray | None
+            The centroids of the lists. If it is None, the index is not trained.
+
+        centroids_inode : int | None
+            The inode of the centroids file, it changes when the lists are trained again.
+
+        assignments : np.ndarray | None
+            The memory-mapped list of each row.
+
+        postings : np.ndarray | None
+            The rows sorted by their lists, up to `posted` rows.
+
+        offsets : np.ndarray | None
+            The start of each list in `postings`, and its end as the next item.
+
+        posted : int
+            The number of rows in `postings`, the later rows are checked one by one.
+
+        inode : int | None
+            The inode of the chunks file, it changes when the index is rebuilt.
+
+        lock : threading.Lock
+            The lock of the refreshes, so the searches can run in several threads.
+            A refresh replaces the arrays instead of changing them, so a search keeps using the arrays it started with.
+        """
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.lists = lists
+        self.probes = probes
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Forget the rows seen by this reader.
+        """
+        self.count = 0
+        self.chunks = None
+        self.vectors = None
+        self.centroids = None
+        self.centroids_inode = None
+        self.assignments = None
+        self.postings = None
+        self.offsets = None
+        self.posted = 0
+        self.inode = None
+
+    def add(self, pdf_id: str, passages: list[tuple[int, str]]) -> int:
+        """
+        Embed passages of a PDF document and append them to the index.
+        The rows of an interrupted write are dropped first.
+        If the index reaches the next training size, the lists are trained before the lock is released.
+
+        Parameters
+        ----------
+        pdf_id : str
+            The ID of the PDF document.
+
+        passages : list[tuple[int, str]]
+            The page numbers and the texts of the passages.
+
+        Returns
+        -------
+        count : int
+            The number of added rows.
+        """
+        if not passages:
+            return 0
+
+        vectors = embed([text for _, text in passages]).astype(VECTOR_DTYPE)
+        texts = [text.encode() for _, text in passages]
+
+        with (self.path / LOCK_FILE).open("a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+
+            count = self.size(CHUNKS_FILE) // CHUNK_DTYPE.itemsize
+            end = 0
+            if count > 0:
+                last = np.fromfile(self.path / CHUNKS_FILE, CHUNK_DTYPE, 1, offset=(count - 1) * CHUNK_DTYPE.itemsize)
+                end = int(last["offset"][0] + last["length"][0])
+
+            centroids = self.read_centroids()
+
+            records = np.zeros(len(passages), dtype=CHUNK_DTYPE)
+            records["pdf_id"] = pdf_id
+            records["page"] = [page for page, _ in passages]
+            records["length"] = [len(text) for text in texts]
+            records["offset"] = end + np.cumsum(records["length"]) - records["length"]
+
+            self.append(PASSAGES_FILE, end, b"".join(texts))
+            self.append(VECTORS_FILE, count * VECTOR_SIZE, vectors.tobytes())
+            if centroids is not None:
+                self.append(ASSIGNMENTS_FILE, count * 4, assign_lists(vectors, centroids).tobytes())
+            self.append(CHUNKS_FILE, count * CHUNK_DTYPE.itemsize, records.tobytes())
+
+            count += len(passages)
+            trained = 0 if centroids is None else len(centroids)
+            lists = min(self.lists, max(MIN_TRAINING_LISTS, 2 * trained))
+            if lists > trained and count >= lists * TRAINING_ROWS_PER_LIST:
+                self.train(count, lists)
+
+        return len(passages)
+
+    def clear(self) -> None:
+        """
+        Remove all rows and the trained lists of the index.
+        The readers start over on their next refresh.
+        """
+        with (self.path / LOCK_FILE).open("a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            for name in (CHUNKS_FILE, CENTROIDS_FILE, ASSIGNMENTS_FILE, VECTORS_FILE, PASSAGES_FILE):
+                (self.path / name).unlink(missing_ok=True)
+
+    def add_pdf(self, pdf_id: str, text: str, pages: list[dict] | None) -> int:
+        """
+        Split the text of a PDF document into passages and append them to the index.
+
+        Parameters
+        ----------
+        pdf_id : str
+            The ID of the PDF document.
+
+        text : str
+            The text content of the PDF document.
+
+        pages : list[dict] | None
+            The start and end offsets of the pages in the text.
+
+        Returns
+        -------
+        count : int
+            The number of added rows.
+        """
+        return self.add(pdf_id, chunk_text(text, pages))
+
+    def train(self, count: int, lists: int) -> None:
+        """
+        Train the lists on a sample of the rows and assign all rows to them.
+        The assignments are written before the centroids, so the readers see a complete index \
+        when the centroids appear. It is called by a writer that holds the lock.
+
+        Parameters
+        ----------
+        count : int
+            The number of rows in the index.
+
+        lists : int
+            The number of lists.
+        """
+        vectors = np.memmap(self.path / VECTORS_FILE, VECTOR_DTYPE, "r", shape=(count, EMBEDDING_DIM))
+
+        rng = np.random.default_rng(0)
+        sample = np.sort(rng.choice(count, min(count, lists * SAMPLE_ROWS_PER_LIST), replace=False))
+        centroids = train_centroids(to_float32(vectors[sample]), lists)
+
+        self.replace(ASSIGNMENTS_FILE, assign_lists(vectors, centroids).tobytes())
+        self.replace(CENTROIDS_FILE, centroids.tobytes())
+
+    def refresh(self) -> None:
+        """
+        Map the rows added since the last refresh, by this or any other process.
+        The rows of the trained lists are posted in bulk once more than `UNPOSTED_ROWS_LIMIT` rows wait.
+        """
+        try:
+            stat = os.stat(self.path / CHUNKS_FILE)
+        except FileNotFoundError:
+            self.reset()
+            return
+
+        count = stat.st_size // CHUNK_DTYPE.itemsize
+        if stat.st_ino != self.inode or count < self.count:
+            self.reset()
+            self.inode = stat.st_ino
+
+        # The rows are posted again to the lists trained since the last refresh
+        try:
+            centroids_inode = os.stat(self.path / CENTROIDS_FILE).st_ino
+        except FileNotFoundError:
+            centroids_inode = None
+
+        retrained = centroids_inode != self.centroids_inode
+        if retrained:
+            self.centroids = self.read_centroids()
+            self.centroids_inode = centroids_inode
+            self.assignments = None
+            self.postings = None
+
+        if count == 0 or (count == self.count and not retrained):
+            return
+
+        self.chunks = np.memmap(self.path / CHUNKS_FILE, CHUNK_DTYPE, "r", shape=(count,))
+        self.vectors = np.memmap(self.path / VECTORS_FILE, VECTOR_DTYPE, "r", shape=(count, EMBEDDING_DIM))
+        self.count = count
+
+        if self.centroids is not None:
+            self.assignments = np.memmap(self.path / ASSIGNMENTS_FILE, np.int32, "r", shape=(count,))
+            if count - self.posted > UNPOSTED_ROWS_LIMIT or self.postings is None:
+                self.postings = np.argsort(self.assignments, kind="stable").astype(np.int32)
+                self.offsets = np.searchsorted(self.assignments[self.postings], np.arange(len(self.centroids) + 1))
+                self.posted = count
+
+    def search(self, query: str, limit: int) -> list[dict]:
+        """
+        Find the passages most similar to a query.
+
+        Parameters
+        ----------
+        query : str
+            The query text.
+
+        limit : int
+            The maximum number of passages.
+
+        Returns
+        -------
+        passages : list[dict]
+            The PDF IDs, page numbers, texts and cosine similarities of the passages, most similar first.
+            The passages without a common word with the query are not included.
+        """
+        with self.lock:
+            self.refresh()
+            count, chunks, vectors, centroids = self.count, self.chunks, self.vectors, self.centroids
+            assignments, postings, offsets, posted = self.assignments, self.postings, self.offsets, self.posted
+
+        if count == 0:
+            return []
+
+        vector = embed([query])[0]
+        if not vector.any():
+            return []
+
+        if centroids is None:
+            rows = np.arange(count)
+            scores = to_float32(vectors) @ vector
+        else:
+            # Scan the lists of the nearest centroids, and the rows that are not posted yet
+            probes = min(self.probes, len(centroids))
+            nearest = np.argpartition(-(centroids @ vector), probes - 1)[:probes]
+            unposted = np.flatnonzero(np.isin(assignments[posted:], nearest)) + posted
+            rows = np.sort(np.concatenate([postings[offsets[i] : offsets[i + 1]] for i in nearest] + [unposted]))
+            scores = to_float32(vectors[rows]) @ vector
+
+        top = np.flatnonzero(scores > 0)
+        if len(top) > limit:
+            top = top[np.argpartition(-scores[top], limit - 1)[:limit]]
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        passages = []
+        with (self.path / PASSAGES_FILE).open("rb") as file:
+            for i in top:
+                chunk = chunks[rows[i]]
+                file.seek(int(chunk["offset"]))
+                passages.append(
+                    {
+                        "pdf_id": chunk["pdf_id"].decode(),
+                        "page": int(chunk["page"]),
+                        "text": file.read(int(chunk["length"])).decode(),
+                        "score": round(float(scores[i]), 4),
+                    }
+                )
+
+        return passages
+
+    def contains(self, pdf_ids: list[str]) -> set[str]:
+        """
+        Find the PDF documents that have passages in the index.
+
+        Parameters
+        ----------
+        pdf_ids : list[str]
+            The IDs of the PDF documents.
+
+        Returns
+        -------
+        indexed : set[str]
+            The IDs of the PDF documents in the index.
+        """
+        with self.lock:
+            self.refresh()
+            count, chunks = self.count, self.chunks
+
+        if count == 0 or not pdf_ids:
+            return set()
+
+        keys = np.array(pdf_ids, dtype=CHUNK_DTYPE["pdf_id"])
+        return {key.decode() for key in keys[np.isin(keys, chunks["pdf_id"])]}
+
+    def read_centroids(self) -> np.ndarray | None:
+        """
+        Read the centroids of the trained lists.
+
+        Returns
+        -------
+        centroids : np.ndarray | None
+            The centroids of the lists. If the index is not trained, return None.
+        """
+        try:
+            return np.fromfile(self.path / CENTROIDS_FILE, np.float32).reshape(-1, EMBEDDING_DIM)
+        except FileNotFoundError:
+            return None
+
+    def size(self, name: str) -> int:
+        """
+        Get the size of a file of the index.
+
+        Parameters
+        ----------
+        name : str
+            The name of the file.
+
+        Returns
+        -------
+        size : int
+            The size of the file in bytes, 0 if it does not exist.
+        """
+        try:
+            return os.path.getsize(self.path / name)
+        except FileNotFoundError:
+            return 0
+
+    def append(self, name: str, size: int, data: bytes) -> None:
+        """
+        Cut a file of the index to its committed size and append data to it.
+
+        Parameters
+        ----------
+        name : str
+            The name of the file.
+
+        size : int
+            The committed size of the file in bytes.
+
+        data : bytes
+            The data to append.
+        """
+        with (self.path / name).open("ab") as file:
+            file.truncate(size)
+            file.write(data)
+
+    def replace(self, name: str, data: bytes) -> None:
+        """
+        Replace a file of the index atomically.
+
+        Parameters
+        ----------
+        name : str
+            The name of the file.
+
+        data : bytes
+            The new content of the file.
+        """
+        temporary = self.path / f"{name}.tmp"
+        temporary.write_bytes(data)
+        os.replace(temporary, self.path / name)
+
+
+def create_search_index() -> SearchIndex | None:
+    """
+    Create the search index of `SEARCH_INDEX_PATH`.
+
+    Returns
+    -------
+    index : SearchIndex | None
+        The search index. If `SEARCH_INDEX_PATH` is not set, return None.
+    """
+    if not SEARCH_INDEX_PATH:
+        return None
+
+    return SearchIndex(SEARCH_INDEX_PATH)
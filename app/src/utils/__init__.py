@@ -1,10 +1,27 @@
-from .body_validator import MaxBodySizeError, MaxBodySizeValidator
+from .affinity import AFFINITY_HEADER, AffinityRing, affinity_headers
+from .body_validator import InvalidFileError, MaxBodySizeError, MaxBodySizeValidator, PDFTarget
+from .deadline import Deadline, DeadlineExceeded
 from .exceptions import CustomHTTPException
-from .pdf_reader import read_pdf_from_bytes
+from .pdf_reader import PDFLimitError, read_pdf_from_bytes, select_pages
+from .serialization import ORJSONResponse, dumps, loads
+from .tasks import run_in_background
 
 __all__ = [
+    "AFFINITY_HEADER",
+    "AffinityRing",
+    "affinity_headers",
+    "InvalidFileError",
     "MaxBodySizeError",
     "MaxBodySizeValidator",
+    "PDFTarget",
+    "Deadline",
+    "DeadlineExceeded",
     "CustomHTTPException",
+    "PDFLimitError",
     "read_pdf_from_bytes",
+    "select_pages",
+    "ORJSONResponse",
+    "dumps",
+    "loads",
+    "run_in_background",
 ]
@@ -0,0 +1,160 @@
+import bisect
+import hashlib
+import math
+import os
+from typing import Any
+
+# Environment variable/s
+AFFINITY_NODES = [node.strip() for node in os.getenv("AFFINITY_NODES", "").split(",") if node.strip()]
+AFFINITY_NODE = os.getenv("AFFINITY_NODE", "")
+AFFINITY_LOAD_FACTOR = float(os.getenv("AFFINITY_LOAD_FACTOR", 1.25))
+
+# Constants
+AFFINITY_HEADER = "X-Affinity-Node"
+VIRTUAL_NODES = 64
+
+
+def hash_key(key: str) -> int:
+    """
+    Hash a key to a position on the ring.
+    It is stable across processes, unlike the built-in `hash`.
+
+    Parameters
+    ----------
+    key : str
+        The key to hash.
+
+    Returns
+    -------
+    position : int
+        The 64-bit position of the key.
+    """
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+class AffinityRing:
+    """
+    Consistent hashing ring with bounded loads that maps the PDF IDs to the nodes.
+    Each node has `VIRTUAL_NODES` positions on the ring, \
+    and a key is mapped to the first node clockwise from its position.
+    If the loads of the nodes are given, a node is skipped while its load is above \
+    `load_factor` times the average load, so a hot document spills over to the next node \
+    and the other keys keep their nodes.
+    """
+
+    def __init__(self, nodes: list[str], load_factor: float = AFFINITY_LOAD_FACTOR) -> None:
+        """
+        Constructor method for `AffinityRing`.
+
+        Parameters
+        ----------
+        nodes : list[str]
+            The names of the nodes. (e.g., api-1, api-2)
+
+        load_factor : float
+            The maximum load of a node relative to the average load, greater than 1.
+
+        Attributes
+        ----------
+        positions : list[int]
+            The sorted positions of the virtual nodes.
+
+        owners : list[str]
+            The node of each position.
+        """
+        self.nodes = list(dict.fromkeys(nodes))
+        self.load_factor = load_factor
+
+        points = sorted((hash_key(f"{node}#{index}"), node) for node in self.nodes for index in range(VIRTUAL_NODES))
+        self.positions = [position for position, _ in points]
+        self.owners = [node for _, node in points]
+
+    def candidates(self, key: str) -> list[str]:
+        """
+        Get the nodes in the order they are tried for a key.
+
+        Parameters
+        ----------
+        key : str
+            The key to map. (e.g., the PDF ID)
+
+        Returns
+        -------
+        nodes : list[str]
+            The distinct nodes clockwise from the position of the key.
+        """
+        start = bisect.bisect(self.positions, hash_key(key))
+        nodes = []
+        for index in range(len(self.owners)):
+            node = self.owners[(start + index) % len(self.owners)]
+            if node not in nodes:
+                nodes.append(node)
+                if len(nodes) == len(self.nodes):
+                    break
+
+        return nodes
+
+    def node(self, key: str, loads: dict[str, int] | None = None) -> str:
+        """
+        Map a key to a node.
+
+        Parameters
+        ----------
+        key : str
+            The key to map. (e.g., the PDF ID)
+
+        loads : dict[str, int] | None
+            The current loads of the nodes. (e.g., the requests in progress)
+            If it is None, the loads are not bounded.
+
+        Returns
+        -------
+        node : str
+            The node of the key.
+        """
+        candidates = self.candidates(key)
+        if not loads:
+            return candidates[0]
+
+        # The new request is counted, so the capacity is at least 1
+        total = sum(loads.get(node, 0) for node in self.nodes) + 1
+        capacity = math.ceil(self.load_factor * total / len(self.nodes))
+        for node in candidates:
+            if loads.get(node, 0) < capacity:
+                return node
+
+        return candidates[0]
+
+
+AFFINITY_RING = AffinityRing(AFFINITY_NODES) if AFFINITY_NODES else None
+
+
+async def affinity_headers(cache: Any, pdf_id: str) -> dict[str, str]:
+    """
+    Get the header that tells the load balancer which node should serve a PDF document.
+    The node is picked from `AFFINITY_NODES` with the requests in progress of the nodes in Redis.
+    If the loads can not be read, the node is picked without them.
+    If `AFFINITY_NODES` is not set, return no header.
+
+    Parameters
+    ----------
+    cache : RedisClient
+        The Redis client to read the loads of the nodes from.
+
+    pdf_id : str
+        The ID of the PDF document.
+
+    Returns
+    -------
+    headers : dict[str, str]
+        The `X-Affinity-Node` header.
+    """
+    if AFFINITY_RING is None:
+        return {}
+
+    try:
+        loads = await cache.inflight_requests()
+    except Exception:
+        loads = None
+
+    return {AFFINITY_HEADER: AFFINITY_RING.node(pdf_id, loads)}
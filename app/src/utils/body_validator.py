@@ -1,8 +1,14 @@
 import os
 
+from streaming_form_data.targets import ValueTarget
+
 # Environment variable/s
 MAX_BODY_SIZE = int(os.getenv("MAX_BODY_SIZE_MB", 1))
 
+# Constants
+PDF_MAGIC_BYTES = b"%PDF-"
+PDF_CONTENT_TYPES = ("application/pdf", "application/x-pdf", "application/octet-stream")
+
 
 class MaxBodySizeError(Exception):
     """
@@ -21,6 +27,12 @@ class MaxBodySizeError(Exception):
         self.body_len = body_len
 
 
+class InvalidFileError(Exception):
+    """
+    A special exception for when the uploaded file is not a PDF file.
+    """
+
+
 class MaxBodySizeValidator:
     """
     Validator for the maximum body size.
@@ -61,3 +73,129 @@ class MaxBodySizeValidator:
         self.body_len += len(chunk)
         if self.body_len > self.max_size:
             raise MaxBodySizeError(body_len=self.body_len)
+
+    def content_length(self, content_length: str | None) -> None:
+        """
+        Check the declared content length of the body before it is read.
+
+        Parameters
+        ----------
+        content_length : str | None
+            The value of the `Content-Length` header.
+            If it is not provided or invalid, the body is checked while it is read.
+
+        Raises
+        ------
+        MaxBodySizeError
+            If the declared length exceeds the maximum size.
+        """
+        if content_length is None or not content_length.isdigit():
+            return
+
+        if int(content_length) > self.max_size:
+            raise MaxBodySizeError(body_len=int(content_length))
+
+
+class PDFTarget(ValueTarget):
+    """
+    Target for the uploaded PDF file.
+    It validates the file as soon as possible while the body is streamed:
+    the filename when the part's headers are parsed, \
+    the content type and the magic bytes with the first data chunk.
+    If a validation fails, raise an `InvalidFileError`.
+    The parser finishes the target after an error, so the first error is raised again by `on_finish`.
+    """
+
+    def __init__(self) -> None:
+        """
+        Constructor method for `PDFTarget`.
+
+        Attributes
+        ----------
+        _head : bytes
+            The first bytes of the file until the magic bytes are verified.
+
+        _verified : bool
+            Indicates if the magic bytes are verified.
+
+        _error : InvalidFileError | None
+            The first validation error of the file.
+        """
+        super().__init__()
+        self._head = b""
+        self._verified = False
+        self._error = None
+
+    def _reject(self, detail: str) -> None:
+        """
+        Keep the first validation error of the file and raise it.
+
+        Parameters
+        ----------
+        detail : str
+            The reason of the rejection.
+
+        Raises
+        ------
+        InvalidFileError
+            Always, with the reason of the rejection.
+        """
+        self._error = self._error or InvalidFileError(detail)
+        raise self._error
+
+    def on_start(self) -> None:
+        """
+        Validate the filename of the part.
+
+        Raises
+        ------
+        InvalidFileError
+            If the filename does not end with `.pdf`.
+        """
+        filename = self.multipart_filename
+        if filename is None or not filename.endswith(".pdf"):
+            self._reject("Invalid file format")
+
+    def on_data_received(self, chunk: bytes) -> None:
+        """
+        Validate the content type and the magic bytes with the first data chunk/s \
+        and store the chunk.
+
+        Parameters
+        ----------
+        chunk : bytes
+            The data chunk of the file.
+
+        Raises
+        ------
+        InvalidFileError
+            If the content type or the magic bytes are not of a PDF file.
+        """
+        if not self._verified:
+            content_type = self.multipart_content_type
+            if content_type is not None and content_type.split(";")[0].strip().lower() not in PDF_CONTENT_TYPES:
+                self._reject("Invalid content type")
+
+            self._head += chunk
+            if len(self._head) >= len(PDF_MAGIC_BYTES):
+                if not self._head.startswith(PDF_MAGIC_BYTES):
+                    self._reject("Invalid file signature")
+                self._verified = True
+                self._head = b""
+
+        super().on_data_received(chunk)
+
+    def on_finish(self) -> None:
+        """
+        Validate that the file contains the magic bytes.
+
+        Raises
+        ------
+        InvalidFileError
+            If the file was rejected, with the first error, \
+            or if the file is shorter than the magic bytes.
+        """
+        if self._error is not None:
+            raise self._error
+        if not self._verified:
+            self._reject("Invalid file signature")
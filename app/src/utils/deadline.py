@@ -0,0 +1,123 @@
+import asyncio
+import os
+import time
+from typing import Any, Awaitable
+
+from starlette.requests import HTTPConnection
+
+from .tasks import run_in_background
+
+# Environment variable/s
+REQUEST_DEADLINE_MS = float(os.getenv("REQUEST_DEADLINE_MS", 60000))
+
+# Constants
+DEADLINE_HEADER = "X-Request-Timeout-Ms"
+
+
+class DeadlineExceeded(Exception):
+    """
+    Exception raised when a stage of a request runs out of time.
+    """
+
+    def __init__(self, stage: str) -> None:
+        """
+        Constructor method for `DeadlineExceeded`.
+
+        Parameters
+        ----------
+        stage : str
+            The stage that ran out of time. (e.g., cache, database, llm)
+        """
+        super().__init__(f"Deadline exceeded at stage {stage}")
+        self.stage = stage
+
+
+class Deadline:
+    """
+    Deadline of a request that each stage of the request draws from.
+    """
+
+    def __init__(self, timeout_ms: float, cache: Any | None = None) -> None:
+        """
+        Constructor method for `Deadline`.
+
+        Parameters
+        ----------
+        timeout_ms : float
+            The time budget of the request in milliseconds.
+
+        cache : RedisClient | None
+            The Redis client to count the deadline breaches in.
+
+        Attributes
+        ----------
+        expires_at : float
+            The monotonic time when the deadline expires.
+        """
+        self.expires_at = time.monotonic() + timeout_ms / 1000
+        self.cache = cache
+
+    @classmethod
+    def from_connection(cls, connection: HTTPConnection) -> "Deadline":
+        """
+        Create the deadline of an HTTP request or a WebSocket message.
+        The timeout is `REQUEST_DEADLINE_MS`, \
+        and it can be lowered by the client with the `X-Request-Timeout-Ms` header.
+        Invalid header values are ignored.
+
+        Parameters
+        ----------
+        connection : HTTPConnection
+            The incoming request or WebSocket connection.
+
+        Returns
+        -------
+        deadline : Deadline
+            The deadline of the request.
+        """
+        timeout_ms = REQUEST_DEADLINE_MS
+        try:
+            requested_ms = float(connection.headers.get(DEADLINE_HEADER, "inf"))
+            if requested_ms > 0:
+                timeout_ms = min(timeout_ms, requested_ms)
+        except ValueError:
+            pass
+
+        return cls(timeout_ms, getattr(connection.app.state, "redis_client", None))
+
+    def remaining(self) -> float:
+        """
+        Get the remaining time of the deadline.
+
+        Returns
+        -------
+        remaining : float
+            The remaining time in seconds, zero if the deadline has expired.
+        """
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    async def run(self, stage: str, awaitable: Awaitable) -> Any:
+        """
+        Run a stage of the request within the remaining time.
+        If the stage runs out of time, it is cancelled, \
+        the breach is counted in Redis in the background and `DeadlineExceeded` is raised.
+
+        Parameters
+        ----------
+        stage : str
+            The name of the stage. (e.g., cache, database, llm)
+
+        awaitable : Awaitable
+            The awaitable of the stage.
+
+        Returns
+        -------
+        result : Any
+            The result of the awaitable.
+        """
+        try:
+            return await asyncio.wait_for(awaitable, self.remaining())
+        except TimeoutError as e:
+            if self.cache is not None:
+                run_in_background(self.cache.count_deadline_exceeded(stage))
+            raise DeadlineExceeded(stage) from e
@@ -8,7 +8,9 @@ class CustomHTTPException(Exception):
     detail message, and traceback.
     """
 
-    def __init__(self, exception: Exception | None, status_code: int, detail: str) -> None:
+    def __init__(
+        self, exception: Exception | None, status_code: int, detail: str, headers: dict | None = None
+    ) -> None:
         """
         Constructor method for `CustomHTTPException`.
 
@@ -22,10 +24,14 @@ class CustomHTTPException(Exception):
 
         detail : str
             The detail message of the exception.
+
+        headers : dict | None
+            The headers of the response. (e.g., {"Connection": "close"})
         """
         self.trace = self._trace(exception) if exception is not None else None
         self.status_code = status_code
         self.detail = detail
+        self.headers = headers
 
     def _trace(self, exception: Exception) -> dict:
         """
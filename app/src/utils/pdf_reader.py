@@ -1,14 +1,61 @@
+import os
+import time
 from io import BytesIO
 
 import pymupdf
 
 from .text import clean_text, detect_language
 
+# Environment variable/s
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", 1000))
+PDF_MAX_CHARACTERS = int(os.getenv("PDF_MAX_CHARACTERS", 1000000))
+PDF_PAGE_TIMEOUT_MS = float(os.getenv("PDF_PAGE_TIMEOUT_MS", 2000))
+PDF_LIMIT_POLICY = os.getenv("PDF_LIMIT_POLICY", "truncate").lower()
 
-def read_pdf_from_bytes(filename: str, pdf_bytes: bytes) -> tuple[dict, str]:
+
+class PDFLimitError(Exception):
+    """
+    A special exception for when a PDF file exceeds an extraction limit \
+    and the limit policy is "reject".
+    """
+
+    def __init__(self, reason: str, limit: int | float) -> None:
+        """
+        Constructor method for `PDFLimitError`.
+
+        Parameters
+        ----------
+        reason : str
+            The exceeded limit. (e.g., pages, characters, page_time)
+
+        limit : int | float
+            The value of the exceeded limit.
+        """
+        super().__init__(f"PDF file exceeds the {reason} limit ({limit})")
+        self.reason = reason
+        self.limit = limit
+
+
+def read_pdf_from_bytes(
+    filename: str,
+    pdf_bytes: bytes,
+    max_pages: int = PDF_MAX_PAGES,
+    max_characters: int = PDF_MAX_CHARACTERS,
+    page_timeout_ms: float = PDF_PAGE_TIMEOUT_MS,
+    policy: str = PDF_LIMIT_POLICY,
+) -> tuple[dict, str, list[dict]]:
     """
     Read a PDF file from bytes.
-    Return the metadata and text content of the PDF file.
+    Return the metadata, text content and page offsets of the PDF file.
+    The text of each page is cleaned separately and the pages are joined with a space.
+    The pages are extracted one by one until a limit is reached, a limit of 0 is disabled:
+    - `max_pages`: the pages after it are not extracted.
+    - `max_characters`: the page that exceeds it is cut, the pages after it are not extracted.
+    - `page_timeout_ms`: the pages after the first page that takes longer are not extracted, \
+    since the extraction of a page can not be interrupted.
+    If the policy is "truncate", the extracted text is kept and the metadata has \
+    the reason, the last page and the text length of the truncation under "truncation".
+    If the policy is "reject", raise a `PDFLimitError`.
 
     Parameters
     ----------
@@ -18,6 +65,18 @@ def read_pdf_from_bytes(filename: str, pdf_bytes: bytes) -> tuple[dict, str]:
     pdf_bytes : bytes
         The PDF file as bytes.
 
+    max_pages : int
+        The maximum number of pages to extract.
+
+    max_characters : int
+        The maximum length of the text content.
+
+    page_timeout_ms : float
+        The maximum extraction time of a page in milliseconds.
+
+    policy : str
+        The policy when a limit is reached. ("truncate" or "reject")
+
     Returns
     -------
     metadata : dict
@@ -25,28 +84,98 @@ def read_pdf_from_bytes(filename: str, pdf_bytes: bytes) -> tuple[dict, str]:
 
     text : str
         The text content of the PDF file.
+
+    pages : list[dict]
+        The offsets of the extracted pages in the text content.
+        Each item has the page number (starting from 1), \
+        and the start and end offsets of the page's text.
     """
     with pymupdf.Document(stream=BytesIO(pdf_bytes), filetype="pdf") as doc:
-        text = ""
-        page_counter = 0
+        texts = []
+        pages = []
+        offset = 0
+        truncation = None
+
+        page_count = doc.page_count
+        if max_pages > 0 and page_count > max_pages:
+            if policy == "reject":
+                raise PDFLimitError("pages", max_pages)
+            truncation = {"reason": "pages", "page": max_pages}
+
+        for page_number in range(1, (page_count if truncation is None else max_pages) + 1):
+            # Create a text page from the PDF page and clean its text
+            start = time.perf_counter()
+            textpage = doc.load_page(page_number - 1).get_textpage()
+            page_text = clean_text(textpage.extractText())
+            duration_ms = (time.perf_counter() - start) * 1000
+
+            # Cut the page at the character limit
+            reason = None
+            separator = 1 if len(texts) > 0 and len(page_text) > 0 else 0
+            if max_characters > 0 and offset + separator + len(page_text) > max_characters:
+                page_text = page_text[: max(max_characters - offset - separator, 0)].rstrip()
+                separator = 1 if len(texts) > 0 and len(page_text) > 0 else 0
+                reason, limit = "characters", max_characters
+            elif page_timeout_ms > 0 and duration_ms > page_timeout_ms:
+                reason, limit = "page_time", page_timeout_ms
+
+            if reason is not None and policy == "reject":
+                raise PDFLimitError(reason, limit)
 
-        for page in doc:
-            page_counter += 1
-            # Create a text page from the PDF page
-            textpage = page.get_textpage()
-            text += textpage.extractText() + "\n"
+            # Keep the offsets of the page, empty pages have an empty range
+            offset += separator
+            if len(page_text) > 0:
+                texts.append(page_text)
+            pages.append({"page": page_number, "start": offset, "end": offset + len(page_text)})
+            offset += len(page_text)
+
+            if reason is not None:
+                truncation = {"reason": reason, "page": page_number}
+                break
 
         metadata = doc.metadata
         metadata = {key: metadata[key] for key in ["title", "author", "subject", "keywords"]}
         metadata["filename"] = filename
-        metadata["page_count"] = page_counter
+        metadata["page_count"] = page_count
 
-    # Clean the text
-    text = clean_text(text)
+    text = " ".join(texts)
     if len(text) == 0:
         raise Exception("Empty PDF file or unsupported format")
 
+    # Record where the text content ends if it is truncated
+    metadata["truncated"] = truncation is not None
+    metadata["truncation"] = None if truncation is None else truncation | {"characters": len(text)}
+
     # Detect the language of the text
     metadata["language"] = detect_language(text)
 
-    return metadata, text
+    return metadata, text, pages
+
+
+def select_pages(text: str, pages: list[dict], page_numbers: list[int]) -> str:
+    """
+    Select the text of the given pages.
+    Each page's text is prefixed with its page number.
+
+    Parameters
+    ----------
+    text : str
+        The text content of the PDF file.
+
+    pages : list[dict]
+        The offsets of the pages in the text content.
+
+    page_numbers : list[int]
+        The page numbers to select, starting from 1.
+
+    Returns
+    -------
+    selected_text : str
+        The text of the selected pages.
+    """
+    selected = []
+    for number in sorted(set(page_numbers)):
+        page = pages[number - 1]
+        selected.append(f"[Page {number}]\n{text[page['start']:page['end']]}")
+
+    return "\n\n".join(selected)
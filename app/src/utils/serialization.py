@@ -0,0 +1,86 @@
+from typing import Any
+
+import orjson
+from bson import ObjectId
+from fastapi.responses import ORJSONResponse as FastAPIORJSONResponse
+
+# Constants
+DUMPS_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def default(obj: Any) -> Any:
+    """
+    Serialize the objects that are not supported by orjson natively.
+
+    Parameters
+    ----------
+    obj : Any
+        The object to serialize.
+
+    Returns
+    -------
+    serialized : Any
+        The serializable representation of the object.
+    """
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any) -> bytes:
+    """
+    Serialize an object to JSON with orjson.
+    Datetimes are serialized in ISO 8601 format and ObjectIds as strings.
+
+    Parameters
+    ----------
+    obj : Any
+        The object to serialize.
+
+    Returns
+    -------
+    data : bytes
+        The JSON document as UTF-8 bytes.
+    """
+    return orjson.dumps(obj, default=default, option=DUMPS_OPTIONS)
+
+
+def loads(data: bytes | bytearray | memoryview | str) -> Any:
+    """
+    Deserialize a JSON document with orjson.
+
+    Parameters
+    ----------
+    data : bytes | bytearray | memoryview | str
+        The JSON document.
+
+    Returns
+    -------
+    obj : Any
+        The deserialized object.
+    """
+    return orjson.loads(data)
+
+
+class ORJSONResponse(FastAPIORJSONResponse):
+    """
+    JSON response serialized with `dumps`.
+    """
+
+    def render(self, content: Any) -> bytes:
+        """
+        Render the content of the response.
+
+        Parameters
+        ----------
+        content : Any
+            The content to render.
+
+        Returns
+        -------
+        body : bytes
+            The body of the response.
+        """
+        return dumps(content)
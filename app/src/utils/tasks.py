@@ -0,0 +1,19 @@
+import asyncio
+from typing import Coroutine
+
+# References to the background tasks, so they are not garbage collected before they finish
+BACKGROUND_TASKS: set[asyncio.Task] = set()
+
+
+def run_in_background(coroutine: Coroutine) -> None:
+    """
+    Run a coroutine in a background task that is not cancelled with the request.
+
+    Parameters
+    ----------
+    coroutine : Coroutine
+        The coroutine to run.
+    """
+    task = asyncio.create_task(coroutine)
+    BACKGROUND_TASKS.add(task)
+    task.add_done_callback(BACKGROUND_TASKS.discard)
@@ -5,6 +5,12 @@ from langdetect import DetectorFactory, detect
 # Set the seed for the language detector
 DetectorFactory.seed = 0
 
+# Constants
+HYPHENATED_LINE_BREAK = re.compile(r"-\n")
+NEWLINES = re.compile(r"\n+")
+SPACES = re.compile(r"\s+")
+NON_ASCII = re.compile(r"[^\x00-\x7F]+")
+
 
 def clean_text(text: str) -> str:
     """
@@ -21,10 +27,10 @@ def clean_text(text: str) -> str:
     cleaned_text : str
         The cleaned text.
     """
-    text = re.sub(r"-\n", "", text)  # Remove hyphenated line breaks
-    text = re.sub(r"\n+", "\n", text)  # Remove extra newlines
-    text = re.sub(r"\s+", " ", text)  # Remove extra spaces
-    text = re.sub(r"[^\x00-\x7F]+", "", text)  # Remove non-ASCII characters
+    text = HYPHENATED_LINE_BREAK.sub("", text)  # Remove hyphenated line breaks
+    text = NEWLINES.sub("\n", text)  # Remove extra newlines
+    text = SPACES.sub(" ", text)  # Remove extra spaces
+    text = NON_ASCII.sub("", text)  # Remove non-ASCII characters
 
     return text.strip()
 
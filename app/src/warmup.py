@@ -0,0 +1,71 @@
+import os
+import time
+from contextlib import contextmanager
+from typing import Generator
+
+import pymupdf
+from langdetect.detector_factory import init_factory
+
+from .utils import dumps, loads, read_pdf_from_bytes
+
+# Environment variable/s
+WARMUP = os.getenv("WARMUP", "true").lower() == "true"
+
+# Startup profile, the duration of each step in milliseconds
+STARTUP_PROFILE: dict[str, float] = {}
+
+
+@contextmanager
+def profile(step: str) -> Generator:
+    """
+    Measure the duration of a startup step and store it in `STARTUP_PROFILE`.
+
+    Parameters
+    ----------
+    step : str
+        The name of the step.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STARTUP_PROFILE[step] = round((time.perf_counter() - start) * 1000, 3)
+
+
+def sample_pdf() -> bytes:
+    """
+    Create a single page PDF file with text content.
+
+    Returns
+    -------
+    pdf_bytes : bytes
+        The PDF file as bytes.
+    """
+    with pymupdf.open() as doc:
+        page = doc.new_page()
+        page.insert_text((72, 72), "This document warms up the PDF parser and the language detector.")
+        return doc.tobytes()
+
+
+def warm_up() -> None:
+    """
+    Load the read-only tables and run the code paths that are slow on their first use.
+    With `--preload`, this runs in the gunicorn master before fork, \
+    so the workers share the loaded state copy-on-write \
+    and the first request of a worker does not pay for it.
+    If `WARMUP` is not set, the function does nothing.
+    """
+    if not WARMUP:
+        return
+
+    # Language profiles of langdetect, loaded on the first detection otherwise
+    with profile("warmup.langdetect"):
+        init_factory()
+
+    # PDF parsing, text cleaning and language detection
+    with profile("warmup.pdf_reader"):
+        read_pdf_from_bytes("warmup.pdf", sample_pdf())
+
+    # JSON serialization
+    with profile("warmup.serialization"):
+        loads(dumps({"role": "user", "parts": "warm up"}))
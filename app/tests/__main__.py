@@ -1,11 +1,20 @@
 import argparse
+import json
 import os
 import subprocess
 import shutil
+import sys
+import time
 from pathlib import Path
 
 from dotenv import load_dotenv
 
+from utils import BENCHMARK_PREFIX, compare_metrics
+
+# Constants
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+PERFORMANCE_TEST = "performance"
+
 
 def setup() -> None:
     """
@@ -34,6 +43,99 @@ def remove_pycache() -> None:
         os.remove(path)
 
 
+def collect_metrics(since: float) -> dict[str, float]:
+    """
+    Collect the metrics of the result files written since the given time.
+
+    Parameters
+    ----------
+    since : float
+        The start time of the run as a timestamp.
+
+    Returns
+    -------
+    metrics : dict[str, float]
+        The metrics of the run in milliseconds.
+    """
+    metrics = {}
+    for path in sorted((Path(__file__).parent / "results").glob("*.json")):
+        if path.stat().st_mtime >= since:
+            metrics |= json.loads(path.read_text()).get("metrics", {})
+
+    return metrics
+
+
+def check_baseline(
+    metrics: dict[str, float],
+    path: Path,
+    suites: list[str],
+    tolerance: float,
+    min_delta_ms: float,
+    test_tolerance: float | None = None,
+) -> bool:
+    """
+    Compare the metrics of the run with the baseline file and print the regressions.
+    The micro-benchmarks are compared with `tolerance` if the performance tests are run.
+    The wall times of the tests depend on Docker, the Gemini API and the other test processes, \
+    so they are only compared if `test_tolerance` is given.
+    The baseline metrics of the run tests without a value in the run are regressions, \
+    and a missing baseline file fails the check.
+
+    Parameters
+    ----------
+    metrics : dict[str, float]
+        The metrics of the run in milliseconds.
+
+    path : Path
+        The baseline file.
+
+    suites : list[str]
+        The names of the run tests. (e.g., utils, performance)
+
+    tolerance : float
+        The allowed slowdown of the micro-benchmarks relative to the baseline.
+
+    min_delta_ms : float
+        The allowed slowdown in milliseconds.
+
+    test_tolerance : float | None
+        The allowed slowdown of the test wall times relative to the baseline.
+        If it is None, the test wall times are not compared.
+
+    Returns
+    -------
+    passed : bool
+        Indicates if no metric regressed.
+    """
+    if not path.exists():
+        print(f"There is no baseline at {path}, run the tests with --update-baseline to create it.")
+        return False
+
+    baseline = json.loads(path.read_text())
+    benchmarks = {name: value for name, value in baseline.items() if name.startswith(BENCHMARK_PREFIX)}
+    tests = {name: value for name, value in baseline.items() if name not in benchmarks and name.split(".")[0] in suites}
+    if PERFORMANCE_TEST not in suites:
+        benchmarks = {}
+    if test_tolerance is None:
+        tests = {}
+
+    regressions = compare_metrics(metrics, benchmarks, tolerance, min_delta_ms)
+    if tests:
+        regressions += compare_metrics(metrics, tests, test_tolerance, min_delta_ms)
+
+    for regression in regressions:
+        if regression["value"] is None:
+            print(f"Missing {regression['metric']}: no value in the run (baseline {regression['baseline']:.3f} ms)")
+            continue
+        print(
+            f"Regression of {regression['metric']}: {regression['value']:.3f} ms "
+            + f"(baseline {regression['baseline']:.3f} ms, +{regression['slowdown']:.0%})"
+        )
+
+    print(f"{len(regressions)} of {len(benchmarks) + len(tests)} metrics regressed.")
+    return len(regressions) == 0
+
+
 if __name__ == "__main__":
     # Get list of all test files
     paths = sorted([path for path in Path(__file__).parent.glob("test_*.py")])
@@ -45,39 +147,69 @@ if __name__ == "__main__":
         "tests", help=f"The test/s to run. It should be one of the choices: {', '.join(choices)}", nargs="*"
     )
     parser.add_argument("--all", action=argparse.BooleanOptionalAction, help="Run all tests.")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="The baseline file of the metrics.")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="The allowed slowdown of a micro-benchmark relative to the baseline.",
+    )
+    parser.add_argument(
+        "--test-tolerance",
+        type=float,
+        default=None,
+        help="The allowed slowdown of a test wall time relative to the baseline, they are not compared by default.",
+    )
+    parser.add_argument(
+        "--min-delta-ms", type=float, default=5.0, help="The allowed slowdown of a metric in milliseconds."
+    )
+    parser.add_argument(
+        "--update-baseline",
+        action=argparse.BooleanOptionalAction,
+        help="Write the metrics of the run to the baseline file instead of comparing them.",
+    )
     args = parser.parse_args()
 
     # Set up the environment variables
     setup()
 
-    # Run all tests
-    processes: list[subprocess.Popen] = []
-
+    # Select the tests
     if args.all:
-        for path in paths:
-            process = subprocess.Popen(
-                ["python", str(path)], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
-            )
-            processes.append(process)
+        selected = paths
     else:
+        selected = []
         for test in args.tests:
             if test not in choices:
                 raise ValueError(f"Invalid test: {test}")
 
-            index = choices.index(test)
-            process = subprocess.Popen(
-                ["python", str(paths[index])],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-            )
+            selected.append(paths[choices.index(test)])
+
+    # Run the tests in parallel, and the performance tests alone after them
+    since = time.time()
+    performance = [path for path in selected if choices[paths.index(path)] == PERFORMANCE_TEST]
+    for group in ([path for path in selected if path not in performance], performance):
+        processes: list[subprocess.Popen] = []
+        for path in group:
+            process = subprocess.Popen(["python", str(path)], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
             processes.append(process)
 
-    # Wait for all processes to finish
-    for process in processes:
-        process.wait()
+        # Wait for all processes to finish
+        for process in processes:
+            process.wait()
 
     # Remove the __pycache__ directories
     remove_pycache()
 
     # Print the final message
     print("Tests are performed.")
+
+    # Compare the metrics with the baseline
+    metrics = collect_metrics(since)
+    if args.update_baseline:
+        baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+        args.baseline.write_text(json.dumps(baseline | metrics, indent=4, sort_keys=True))
+        print(f"{len(metrics)} metrics are written to {args.baseline}.")
+    else:
+        suites = [choices[paths.index(path)] for path in selected]
+        if not check_baseline(metrics, args.baseline, suites, args.tolerance, args.min_delta_ms, args.test_tolerance):
+            sys.exit(1)
@@ -45,9 +45,12 @@ class TestUtilities(unittest.TestCase):
         from src.utils import read_pdf_from_bytes
 
         with open(Path(__file__).parent / "data" / "case-000.pdf", "rb") as file:
-            _, pdf = read_pdf_from_bytes("case-000.pdf", file.read())
+            metadata, pdf, pages = read_pdf_from_bytes("case-000.pdf", file.read())
 
         self.assertGreater(len(pdf), 0)
+        self.assertEqual(len(pages), metadata["page_count"])
+        page_texts = [pdf[page["start"] : page["end"]] for page in pages if page["end"] > page["start"]]
+        self.assertEqual(" ".join(page_texts), pdf)
 
     def test_03_read_pdf_from_bytes_with_empty_pdf(self) -> None:
         """
@@ -75,6 +78,144 @@ class TestUtilities(unittest.TestCase):
         except Exception as e:
             self.assertEqual(str(e), "Empty PDF file or unsupported format")
 
+    def test_05_serialization(self) -> None:
+        """
+        Test `utils.dumps` and `utils.loads` functions.
+        """
+        from datetime import datetime
+
+        from bson import ObjectId
+
+        from src.utils import dumps, loads
+
+        pdf_id = ObjectId()
+        timestamp = datetime(2024, 10, 1, 12, 30, 15)
+        data = dumps({"_id": pdf_id, "timestamp": timestamp, "items": [1, "a"]})
+
+        self.assertIsInstance(data, bytes)
+        self.assertEqual(
+            loads(data), {"_id": str(pdf_id), "timestamp": "2024-10-01T12:30:15", "items": [1, "a"]}
+        )
+
+    def test_06_pdf_target_with_invalid_signature(self) -> None:
+        """
+        Test `utils.PDFTarget` class with a file that is not a PDF file.
+        """
+        from streaming_form_data import StreamingFormDataParser
+
+        from src.utils import InvalidFileError, PDFTarget
+
+        with open(Path(__file__).parent / "data" / "case-003.jpeg", "rb") as file:
+            content = file.read()
+
+        body = (
+            b"--boundary\r\n"
+            + b'Content-Disposition: form-data; name="file"; filename="case-003.pdf"\r\n'
+            + b"Content-Type: application/pdf\r\n\r\n"
+            + content
+            + b"\r\n--boundary--\r\n"
+        )
+
+        parser = StreamingFormDataParser(headers={"Content-Type": "multipart/form-data; boundary=boundary"})
+        parser.register("file", PDFTarget())
+
+        with self.assertRaises(InvalidFileError):
+            parser.data_received(body)
+
+        # The first reason of the rejection is kept
+        parser = StreamingFormDataParser(headers={"Content-Type": "multipart/form-data; boundary=boundary"})
+        parser.register("file", PDFTarget())
+
+        with self.assertRaisesRegex(InvalidFileError, "Invalid content type"):
+            parser.data_received(body.replace(b"application/pdf", b"image/jpeg"))
+
+    def test_07_select_pages(self) -> None:
+        """
+        Test `utils.select_pages` function.
+        """
+        from src.utils import select_pages
+
+        text = "First page. Third page."
+        pages = [
+            {"page": 1, "start": 0, "end": 11},
+            {"page": 2, "start": 11, "end": 11},
+            {"page": 3, "start": 12, "end": 23},
+        ]
+
+        self.assertEqual(select_pages(text, pages, [3, 1]), "[Page 1]\nFirst page.\n\n[Page 3]\nThird page.")
+
+    def test_08_deadline(self) -> None:
+        """
+        Test `utils.Deadline` class.
+        """
+        import asyncio
+
+        from src.utils import Deadline, DeadlineExceeded
+
+        async def stages() -> None:
+            deadline = Deadline(100)
+            self.assertEqual(await deadline.run("fast", asyncio.sleep(0.01, "done")), "done")
+
+            with self.assertRaises(DeadlineExceeded) as context:
+                await deadline.run("slow", asyncio.sleep(1))
+            self.assertEqual(context.exception.stage, "slow")
+
+            # The expired deadline leaves no time for the next stages
+            self.assertEqual(deadline.remaining(), 0.0)
+            with self.assertRaises(DeadlineExceeded):
+                await deadline.run("next", asyncio.sleep(0))
+
+        asyncio.run(stages())
+
+    def test_09_read_pdf_from_bytes_with_limits(self) -> None:
+        """
+        Test `utils.read_pdf_from_bytes` function with the page and character limits.
+        """
+        from src.utils import PDFLimitError, read_pdf_from_bytes
+
+        with open(Path(__file__).parent / "data" / "case-000.pdf", "rb") as file:
+            pdf_bytes = file.read()
+
+        metadata, pdf, pages = read_pdf_from_bytes("case-000.pdf", pdf_bytes, max_pages=1)
+        self.assertEqual(len(pages), 1)
+        self.assertEqual(metadata["truncation"], {"reason": "pages", "page": 1, "characters": len(pdf)})
+
+        metadata, pdf, pages = read_pdf_from_bytes("case-000.pdf", pdf_bytes, max_characters=100)
+        self.assertLessEqual(len(pdf), 100)
+        self.assertTrue(metadata["truncated"])
+        self.assertEqual(metadata["truncation"]["reason"], "characters")
+        self.assertEqual(pages[-1]["end"], len(pdf))
+
+        with self.assertRaises(PDFLimitError) as context:
+            read_pdf_from_bytes("case-000.pdf", pdf_bytes, max_characters=100, policy="reject")
+        self.assertEqual(context.exception.reason, "characters")
+
+    def test_10_affinity_ring(self) -> None:
+        """
+        Test `utils.AffinityRing` class.
+        """
+        from src.utils import AffinityRing
+
+        nodes = ["api-0", "api-1", "api-2", "api-3"]
+        ring = AffinityRing(nodes, load_factor=1.25)
+        pdf_ids = [f"{index:024x}" for index in range(1000)]
+
+        # The mapping is deterministic and uses all nodes
+        mapping = {pdf_id: ring.node(pdf_id) for pdf_id in pdf_ids}
+        self.assertEqual(mapping, {pdf_id: AffinityRing(nodes).node(pdf_id) for pdf_id in pdf_ids})
+        self.assertEqual(set(mapping.values()), set(nodes))
+        self.assertEqual(sorted(ring.candidates(pdf_ids[0])), nodes)
+
+        # Removing a node only moves its own keys
+        smaller = AffinityRing(nodes[:-1])
+        moved = [pdf_id for pdf_id in pdf_ids if mapping[pdf_id] != smaller.node(pdf_id)]
+        self.assertTrue(all(mapping[pdf_id] == nodes[-1] for pdf_id in moved))
+
+        # An overloaded node is skipped for the next node of the key
+        node = ring.node(pdf_ids[0])
+        loads = {name: 10 if name == node else 0 for name in nodes}
+        self.assertEqual(ring.node(pdf_ids[0], loads), ring.candidates(pdf_ids[0])[1])
+
 
 if __name__ == "__main__":
     suite = unittest.TestLoader().loadTestsFromTestCase(TestUtilities)
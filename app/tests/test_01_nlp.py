@@ -13,17 +13,19 @@ class TestNLP(unittest.TestCase):
     Test Natural Language Processing tools.
     """
 
-    def test_00_chat_client(self) -> None:
+    def test_00_gemini_client(self) -> None:
         """
-        Test `nlp.ChatClient` class.
+        Test `nlp.gemini.GeminiClient` class.
         """
-        from src.nlp import ChatClient
+        import asyncio
+
+        from src.nlp.gemini import GeminiClient
         from src.utils import read_pdf_from_bytes
 
         with open(Path(__file__).parent / "data" / "case-002.pdf", "rb") as file:
-            metadata, text = read_pdf_from_bytes("case-002.pdf", file.read())
+            metadata, text, _ = read_pdf_from_bytes("case-002.pdf", file.read())
 
-        client = ChatClient()
+        client = GeminiClient()
         chat = client.chat(metadata, text, None)
 
         # Check if the chat session is created
@@ -33,9 +35,76 @@ class TestNLP(unittest.TestCase):
         question = """Give us the name of whose resume is this?
 This is a unittest. So, please return only the name without punctuation,
 special characters (only use alphanumeric characters), whitespaces, and in lowercase."""
-        response = chat.send_message(question)
 
-        self.assertEqual(response.text, "kerem avci \n")
+        async def send() -> str:
+            return "".join([part async for part in chat.stream(question)])
+
+        response = asyncio.run(send())
+
+        self.assertEqual(response, "kerem avci \n")
+        self.assertGreater(chat.usage["prompt_tokens"], 0)
+        self.assertEqual(len(chat.history), 2)
+
+    def test_01_simulated_client(self) -> None:
+        """
+        Test `nlp.simulated.SimulatedClient` class.
+        """
+        import asyncio
+
+        from src.nlp import simulated
+        from src.nlp.simulated import SimulatedBackendError, SimulatedClient
+
+        client = SimulatedClient()
+        model = client.model({"title": "Sample"}, "The quick brown fox jumps over the lazy dog.")
+
+        async def send(message: str) -> str:
+            chat = model.start_chat(None)
+            response = "".join([part async for part in chat.stream(message)])
+            self.assertEqual(chat.usage["response_tokens"], simulated.SIMULATED_RESPONSE_TOKENS)
+            return response
+
+        # The responses are deterministic
+        self.assertEqual(asyncio.run(send("What is this?")), asyncio.run(send("What is this?")))
+        self.assertEqual(asyncio.run(client.count_tokens("one two three")), 3)
+
+        # The failures are simulated
+        simulated.SIMULATED_FAILURE_RATE = 1.0
+        try:
+            with self.assertRaises(SimulatedBackendError):
+                asyncio.run(send("What is this?"))
+        finally:
+            simulated.SIMULATED_FAILURE_RATE = 0.0
+
+    def test_02_digest(self) -> None:
+        """
+        Test the digest of a PDF document and the detection of the overview questions.
+        """
+        import asyncio
+
+        from src.nlp import is_overview_question, render_digest
+        from src.nlp.digest import parse_digest
+        from src.nlp.simulated import SimulatedClient
+        from src.utils import dumps
+
+        expected = {"summary": "A resume.", "outline": ["Education", "Experience"], "key_terms": ["Python"]}
+        digest = parse_digest(f"```json\n{dumps(expected).decode()}\n```")
+        self.assertEqual(digest, expected)
+        self.assertIn("- Experience", render_digest(digest))
+
+        with self.assertRaises(ValueError):
+            parse_digest("This document is a resume.")
+
+        self.assertTrue(is_overview_question("What is this document about?"))
+        self.assertTrue(is_overview_question("Summarize the paper"))
+        self.assertTrue(is_overview_question("Give me the table of contents of the PDF"))
+        self.assertFalse(is_overview_question("Who is the author of this paper?"))
+        self.assertFalse(is_overview_question("Summarize the methods section"))
+        self.assertFalse(is_overview_question("What are the key findings in table 2?"))
+        self.assertFalse(is_overview_question("Give me an overview of page 3"))
+
+        client = SimulatedClient()
+        digest = asyncio.run(client.digest({"title": "Sample"}, "The quick brown fox jumps over the lazy dog."))
+        self.assertEqual(digest["outline"], ["Sample"])
 
 
 if __name__ == "__main__":
@@ -169,7 +169,208 @@ class TestDatabases(unittest.TestCase):
         self.loop.run_until_complete(self.redis_client.close())
 
 
+class TestDatabaseFeatures(unittest.TestCase):
+    """
+    Test the logs, the ingestion, the chat history archive, the PDF cache, the counters and the rate limits \
+    of MongoDB and Redis databases.
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """
+        Set up the class for the tests.
+        """
+        cls.path = str(Path(__file__).parents[2])
+
+        subprocess.run(
+            ["docker", "compose", "-f", f"{cls.path}/docker-compose.yml", "up", "-d", "mongodb", "redis"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+        from src.database import MongoClient, RedisClient
+
+        cls.mongo_client = MongoClient()
+        cls.redis_client = RedisClient()
+        cls.loop = asyncio.get_event_loop()
+
+        # Define placeholders
+        cls.sample_key = secrets.token_hex(16)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        """
+        Tear down the class after the tests.
+        """
+        cls.loop.run_until_complete(cls.mongo_client.close())
+        cls.loop.run_until_complete(cls.redis_client.close())
+
+        subprocess.run(
+            ["docker", "compose", "-f", f"{cls.path}/docker-compose.yml", "down"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+    def test_00_setup_logs(self) -> None:
+        """
+        Test the provisioning of the logs collection in MongoDB.
+
+        `database.mongo.MongoClient.setup_logs()`
+        """
+        # Provisioning twice must not fail
+        self.loop.run_until_complete(self.mongo_client.setup_logs())
+        self.loop.run_until_complete(self.mongo_client.setup_logs())
+
+        indexes = self.loop.run_until_complete(self.mongo_client.logs.index_information())
+        self.assertTrue(any(info["key"][0][0] == "path" for info in indexes.values()))
+
+    def test_01_ingest_pdfs(self) -> None:
+        """
+        Test the offline ingestion of PDF files with a checkpoint.
+
+        `ingest.ingest()`
+        """
+        import tempfile
+
+        from bson import ObjectId
+
+        from src.ingest import collect_paths, ingest
+
+        paths = collect_paths(Path(__file__).parent / "data")
+        self.assertTrue(paths and all(path.endswith(".pdf") for path in paths))
+
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoint = Path(directory) / "ingested.jsonl"
+            pdf_ids = self.loop.run_until_complete(ingest(paths, checkpoint, workers=2, verbose=False))
+            self.assertGreater(len(pdf_ids), 0)
+
+            for path, pdf_id in pdf_ids.items():
+                pdf = self.loop.run_until_complete(self.mongo_client.find_pdf(pdf_id))
+                self.assertEqual(pdf["metadata"]["filename"], Path(path).name)
+
+            # The ingested files are skipped by the next run
+            self.assertEqual(self.loop.run_until_complete(ingest(paths, checkpoint, verbose=False)), pdf_ids)
+
+            # A run without the checkpoint gets the same IDs and does not insert the documents again
+            rerun = self.loop.run_until_complete(ingest(paths, Path(directory) / "lost.jsonl", verbose=False))
+            self.assertEqual(rerun, pdf_ids)
+
+            query = {"_id": {"$in": [ObjectId(pdf_id) for pdf_id in pdf_ids.values()]}}
+            count = self.loop.run_until_complete(self.mongo_client.pdfs.count_documents(query))
+            self.assertEqual(count, len(pdf_ids))
+
+    def test_02_archive_messages(self) -> None:
+        """
+        Test the archive of the chat history messages in MongoDB.
+
+        `database.mongo.MongoClient.archive_messages()`
+        """
+        self.loop.run_until_complete(self.mongo_client.setup_conversations())
+
+        messages = [
+            {"pdf_id": self.sample_key, "message": {"role": "user", "parts": f"message {index}"}, "timestamp": 1.0}
+            for index in range(5)
+        ]
+        self.loop.run_until_complete(self.mongo_client.archive_messages(messages))
+
+        # The last messages are returned in order, even with the same timestamp
+        recent = self.loop.run_until_complete(self.mongo_client.recent_messages(self.sample_key, 3))
+        self.assertEqual(recent, [message["message"] for message in messages[-3:]])
+
+    def test_03_set_pdf_to_redis(self) -> None:
+        """
+        Test the caching of a PDF document in Redis.
+
+        `database.redis.RedisClient.set_pdf()`
+        """
+        sample_pdf = {
+            "metadata": {"name": "sample.pdf"},
+            "text": "This is a sample PDF document.",
+            "pages": [{"page": 1, "start": 0, "end": 30}],
+        }
+
+        self.loop.run_until_complete(self.redis_client.set_pdf(self.sample_key, sample_pdf))
+
+    def test_04_get_pdf_from_redis(self) -> None:
+        """
+        Test the retrieval of a cached PDF document from Redis.
+
+        `database.redis.RedisClient.get_pdf()`
+        """
+        sample_pdf = {
+            "metadata": {"name": "sample.pdf"},
+            "text": "This is a sample PDF document.",
+            "pages": [{"page": 1, "start": 0, "end": 30}],
+        }
+
+        pdf = self.loop.run_until_complete(self.redis_client.get_pdf(self.sample_key))
+        self.assertEqual(pdf, sample_pdf)
+
+        pdf = self.loop.run_until_complete(self.redis_client.get_pdf(self.sample_key[:-5] + "12345"))
+        self.assertIsNone(pdf)
+
+        stats = self.loop.run_until_complete(self.redis_client.pdf_cache_stats())
+        self.assertGreater(stats["hits"], 0)
+        self.assertGreater(stats["misses"], 0)
+
+    def test_05_count_cancelled_chat(self) -> None:
+        """
+        Test the counter of the cancelled chat generations in Redis.
+
+        `database.redis.RedisClient.count_cancelled_chat()`
+        """
+        count = self.loop.run_until_complete(self.redis_client.cancelled_chats())
+        self.loop.run_until_complete(self.redis_client.count_cancelled_chat(2))
+
+        self.assertEqual(self.loop.run_until_complete(self.redis_client.cancelled_chats()), count + 2)
+
+    def test_06_take_token(self) -> None:
+        """
+        Test the token bucket of the rate limits in Redis.
+
+        `database.redis.RedisClient.take_token()`
+        """
+        key = f"test:{self.sample_key}"
+        results = [self.loop.run_until_complete(self.redis_client.take_token(key, 3, 0.5)) for _ in range(4)]
+
+        self.assertEqual([allowed for allowed, _, _, _ in results], [True, True, True, False])
+        self.assertEqual([remaining for _, remaining, _, _ in results], [2, 1, 0, 0])
+
+        # A token is added every 2 seconds, the bucket is full after 6 seconds
+        _, _, retry_after_ms, reset_ms = results[-1]
+        self.assertGreater(retry_after_ms, 0)
+        self.assertLessEqual(retry_after_ms, 2000)
+        self.assertLessEqual(reset_ms, 6000)
+
+    def test_07_history_archive_queue(self) -> None:
+        """
+        Test the archive queue and the restore of the chat history in Redis.
+
+        `database.redis.RedisClient.take_archive()`
+        """
+        key = f"test:{self.sample_key}"
+        messages = [{"role": "user", "parts": "question"}, {"role": "model", "parts": "answer"}]
+        self.loop.run_until_complete(self.redis_client.push(key, messages))
+
+        # The pushed messages are queued for the archive with their key
+        queued = self.loop.run_until_complete(self.redis_client.take_archive(10000))
+        self.assertEqual([item["message"] for item in queued if item["pdf_id"] == key], messages)
+
+        # The messages put back are taken again in the same order
+        self.loop.run_until_complete(self.redis_client.return_archive(queued))
+        self.assertEqual(self.loop.run_until_complete(self.redis_client.take_archive(len(queued))), queued)
+
+        # The restored history replaces the list, it is not queued again
+        self.loop.run_until_complete(self.redis_client.restore(key, messages[:1]))
+        self.assertEqual(self.loop.run_until_complete(self.redis_client.get(key)), messages[:1])
+        self.assertEqual(self.loop.run_until_complete(self.redis_client.take_archive(10000)), [])
+        self.assertGreater(self.loop.run_until_complete(self.redis_client.client.ttl(key)), 0)
+
+
 if __name__ == "__main__":
-    suite = unittest.TestLoader().loadTestsFromTestCase(TestDatabases)
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite(
+        [loader.loadTestsFromTestCase(TestDatabases), loader.loadTestsFromTestCase(TestDatabaseFeatures)]
+    )
     runner = JSONTestRunner()
     runner.run(suite, "database")
@@ -1,6 +1,8 @@
 assert __name__ == "__main__", "This script is not meant to be imported."
 
+import os
 import subprocess
+import tempfile
 import unittest
 from pathlib import Path
 
@@ -27,6 +29,10 @@ class TestRouters(unittest.TestCase):
             stderr=subprocess.DEVNULL,
         )
 
+        # Enable the search index in a temporary directory
+        cls.search_path = tempfile.TemporaryDirectory()
+        os.environ.setdefault("SEARCH_INDEX_PATH", cls.search_path.name)
+
         from src.main import app
         from fastapi.testclient import TestClient
 
@@ -46,6 +52,7 @@ class TestRouters(unittest.TestCase):
             stdout=subprocess.DEVNULL,
             stderr=subprocess.DEVNULL,
         )
+        cls.search_path.cleanup()
 
     def test_00_upload_pdf_with_valid_pdf(self) -> None:
         """
@@ -131,6 +138,155 @@ class TestRouters(unittest.TestCase):
             )
             self.assertEqual(response.status_code, 400)
 
+    def test_06_chat_with_page_range(self) -> None:
+        """
+        Test the chat limited to a range of pages.
+
+        `POST /v1/chat/{pdf_id}`
+        """
+        with self.client(self.app) as client:
+            response = client.post(
+                f"/v1/chat/{TestRouters.pdf_id}",
+                json={"message": "What is the title of this paper?", "page_range": [1, 2]},
+            )
+            self.assertEqual(response.status_code, 200)
+
+    def test_07_chat_with_invalid_pages(self) -> None:
+        """
+        Test the chat with pages that do not exist in the PDF.
+
+        `POST /v1/chat/{pdf_id}`
+        """
+        with self.client(self.app) as client:
+            response = client.post(
+                f"/v1/chat/{TestRouters.pdf_id}",
+                json={"message": "What is the title of this paper?", "pages": [1, 10000]},
+            )
+            self.assertEqual(response.status_code, 400)
+
+    def test_08_batch_chat(self) -> None:
+        """
+        Test the batch chat with many questions, without saving the chat history.
+
+        `POST /v1/chat/{pdf_id}/batch`
+        """
+        from src.utils import loads
+
+        questions = ["What is the title of this paper?", "Who are the authors of this paper?"]
+        with self.client(self.app) as client:
+            response = client.post(
+                f"/v1/chat/{TestRouters.pdf_id}/batch",
+                json={"questions": questions, "save_history": False},
+            )
+            self.assertEqual(response.status_code, 200)
+
+        answers = [loads(line) for line in response.text.splitlines()]
+        self.assertEqual([answer["question"] for answer in answers], questions)
+        self.assertTrue(all("response" in answer for answer in answers))
+
+    def test_09_websocket_chat(self) -> None:
+        """
+        Test the chat over a WebSocket connection with two messages.
+
+        `WS /v1/chat/{pdf_id}/ws`
+        """
+        with self.client(self.app) as client:
+            with client.websocket_connect(f"/v1/chat/{TestRouters.pdf_id}/ws") as websocket:
+                for message in ["What is the title of this paper?", "Who are the authors of this paper?"]:
+                    websocket.send_json({"message": message})
+                    chunks = []
+                    while (data := websocket.receive_json())["type"] == "chunk":
+                        chunks.append(data["text"])
+
+                    self.assertEqual(data["type"], "end")
+                    self.assertGreater(len(chunks), 0)
+
+    def test_10_websocket_chat_incorrect_pdf_id(self) -> None:
+        """
+        Test the chat over a WebSocket connection with an incorrect pdf id.
+
+        `WS /v1/chat/{pdf_id}/ws`
+        """
+        with self.client(self.app) as client:
+            with client.websocket_connect(f"/v1/chat/{TestRouters.pdf_id[:-5] + '12345'}/ws") as websocket:
+                self.assertEqual(websocket.receive_json(), {"type": "error", "detail": "PDF not found"})
+
+    def test_11_usage_stats(self) -> None:
+        """
+        Test the usage report of the chat turns of the uploaded PDF file.
+
+        `GET /v1/stats/usage`
+        """
+        with self.client(self.app) as client:
+            response = client.get("/v1/stats/usage", params={"days": 1, "pdf_id": TestRouters.pdf_id})
+            self.assertEqual(response.status_code, 200)
+
+            documents = response.json()["documents"]
+            self.assertEqual([document["pdf_id"] for document in documents], [TestRouters.pdf_id])
+            self.assertGreater(documents[0]["turns"], 0)
+            self.assertIn("p50", documents[0]["ttft_ms"])
+
+            response = client.get("/v1/stats/usage", params={"days": 0})
+            self.assertEqual(response.status_code, 400)
+
+    def test_12_latency_stats(self) -> None:
+        """
+        Test the latency report of the requests, with the correlation ID of the request.
+
+        `GET /v1/stats/latency`
+        """
+        with self.client(self.app) as client:
+            response = client.get("/v1/stats/latency", params={"minutes": 60}, headers={"X-Request-ID": "test-12"})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.headers["X-Request-ID"], "test-12")
+
+            routes = {item["route"] for item in response.json()["latency"]}
+            self.assertIn("/v1/chat/{pdf_id}", routes)
+
+            response = client.get("/v1/stats/latency", params={"minutes": 0})
+            self.assertEqual(response.status_code, 400)
+
+    def test_13_search(self) -> None:
+        """
+        Test the search of the passages of the uploaded PDF files.
+
+        `GET /v1/search`
+        """
+        from src.utils import read_pdf_from_bytes
+
+        with open(Path(__file__).parent / "data" / "case-000.pdf", "rb") as file:
+            _, text, _ = read_pdf_from_bytes("case-000.pdf", file.read())
+
+        with self.client(self.app) as client:
+            response = client.get("/v1/search", params={"q": " ".join(text.split()[:20]), "limit": 5})
+            self.assertEqual(response.status_code, 200)
+
+            documents = response.json()["documents"]
+            self.assertIn(TestRouters.pdf_id, [document["pdf_id"] for document in documents])
+            self.assertLessEqual(sum(len(document["passages"]) for document in documents), 5)
+
+            response = client.get("/v1/search", params={"q": " "})
+            self.assertEqual(response.status_code, 400)
+
+            response = client.get("/v1/search", params={"q": "resume", "limit": 0})
+            self.assertEqual(response.status_code, 400)
+
+    def test_14_counter_stats(self) -> None:
+        """
+        Test the counters of the cache, the cancelled chats and the deadlines.
+
+        `GET /v1/stats/counters`
+        """
+        with self.client(self.app) as client:
+            response = client.get("/v1/stats/counters")
+            self.assertEqual(response.status_code, 200)
+
+            counters = response.json()
+            self.assertGreater(counters["pdf_cache"]["hits"] + counters["pdf_cache"]["misses"], 0)
+            self.assertGreaterEqual(counters["cancelled_chats"], 0)
+            self.assertIsInstance(counters["deadline_exceeded"], dict)
+            self.assertEqual(counters["dropped_log_records"], 0)
+
 
 if __name__ == "__main__":
     suite = unittest.TestLoader().loadTestsFromTestCase(TestRouters)
@@ -0,0 +1,141 @@
+assert __name__ == "__main__", "This script is not meant to be imported."
+
+import asyncio
+import secrets
+import subprocess
+import unittest
+from pathlib import Path
+
+from utils import JSONTestRunner, add_path, benchmark
+
+add_path()
+
+
+class TestPerformance(unittest.TestCase):
+    """
+    Micro-benchmarks of the hot code paths.
+    The durations are recorded in the metrics and compared with the baseline by the test runner.
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """
+        Set up the class for the tests.
+        """
+        cls.path = str(Path(__file__).parents[2])
+
+        subprocess.run(
+            ["docker", "compose", "-f", f"{cls.path}/docker-compose.yml", "up", "-d", "redis"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+        cls.loop = asyncio.get_event_loop()
+        cls.pdf_bytes = (Path(__file__).parent / "data" / "case-000.pdf").read_bytes()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        """
+        Tear down the class after the tests.
+        """
+        subprocess.run(
+            ["docker", "compose", "-f", f"{cls.path}/docker-compose.yml", "down"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+    def test_00_read_pdf_from_bytes(self) -> None:
+        """
+        Benchmark `utils.read_pdf_from_bytes` function.
+        """
+        from src.utils import read_pdf_from_bytes
+
+        duration = benchmark("read_pdf_from_bytes", lambda: read_pdf_from_bytes("case-000.pdf", self.pdf_bytes), 5)
+        self.assertGreater(duration, 0)
+
+    def test_01_clean_text(self) -> None:
+        """
+        Benchmark `utils.clean_text` function.
+        """
+        from src.utils import read_pdf_from_bytes
+        from src.utils.text import clean_text
+
+        _, text, _ = read_pdf_from_bytes("case-000.pdf", self.pdf_bytes)
+
+        duration = benchmark("clean_text", lambda: clean_text(text), 20)
+        self.assertGreater(duration, 0)
+
+    def test_02_redis_push_get(self) -> None:
+        """
+        Benchmark `database.redis.RedisClient.push()` and `database.redis.RedisClient.get()` methods.
+        """
+        from src.database import RedisClient
+
+        redis_client = RedisClient()
+        key = f"test:{secrets.token_hex(16)}"
+        message = [{"role": "user", "parts": "What is this document about?"}]
+
+        push = benchmark("redis_push", lambda: self.loop.run_until_complete(redis_client.push(key, message)), 50)
+        get = benchmark("redis_get", lambda: self.loop.run_until_complete(redis_client.get(key)), 50)
+
+        self.loop.run_until_complete(redis_client.client.delete(key))
+        self.loop.run_until_complete(redis_client.close())
+
+        self.assertGreater(push, 0)
+        self.assertGreater(get, 0)
+
+    def test_03_logger_middleware(self) -> None:
+        """
+        Benchmark a request through `middlewares.LoggerMiddleware`, and the same request without it.
+        """
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+
+        from src.middlewares import LoggerMiddleware
+
+        class MongoClient:
+            async def insert_log(self, log: dict) -> str:
+                return ""
+
+        durations = {}
+        for name, middleware in (("request", None), ("logger_middleware", LoggerMiddleware)):
+            app = FastAPI()
+            app.state.mongo_client = MongoClient()
+            app.add_api_route("/v1/ping", lambda: {"status": "ok"})
+            if middleware is not None:
+                app.add_middleware(middleware)
+
+            with TestClient(app) as client:
+                durations[name] = benchmark(name, lambda: client.get("/v1/ping"), 50)
+                self.assertEqual(client.get("/v1/ping").status_code, 200)
+
+        self.assertGreater(durations["logger_middleware"], 0)
+
+    def test_04_search_index(self) -> None:
+        """
+        Benchmark `search.SearchIndex.search()` method on an index with trained lists.
+        """
+        import random
+        import tempfile
+
+        from src.search import SearchIndex
+
+        rng = random.Random(0)
+        words = [f"word{i}" for i in range(5000)]
+
+        with tempfile.TemporaryDirectory() as path:
+            index = SearchIndex(path, lists=64, probes=8)
+            for document in range(100):
+                passages = [(page, " ".join(rng.choices(words, k=120))) for page in range(1, 21)]
+                index.add(f"{document:024d}", passages)
+
+            query = " ".join(rng.choices(words, k=8))
+            duration = benchmark("search_index", lambda: index.search(query, 10), 50)
+
+        self.assertGreater(duration, 0)
+
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestPerformance)
+    runner = JSONTestRunner()
+    runner.run(suite, "performance")
@@ -0,0 +1,116 @@
+assert __name__ == "__main__", "This script is not meant to be imported."
+
+import tempfile
+import unittest
+
+from utils import JSONTestRunner, add_path
+
+add_path()
+
+
+class TestSearch(unittest.TestCase):
+    """
+    Test the search index of the passages.
+    """
+
+    def test_00_embed(self) -> None:
+        """
+        Test `search.embed` function.
+        """
+        import numpy as np
+
+        from src.search import EMBEDDING_DIM, embed
+
+        vectors = embed(
+            [
+                "The invoice lists the payment terms of the contract.",
+                "Payment terms of the contract are listed in the invoice.",
+                "A recipe for baking sourdough bread at home.",
+                "The and of",
+            ]
+        )
+
+        self.assertEqual(vectors.shape, (4, EMBEDDING_DIM))
+        self.assertAlmostEqual(float(np.linalg.norm(vectors[0])), 1.0, places=5)
+        self.assertGreater(vectors[0] @ vectors[1], vectors[0] @ vectors[2])
+        self.assertFalse(vectors[3].any())
+
+    def test_01_chunk_text(self) -> None:
+        """
+        Test `search.chunk_text` function.
+        """
+        from src.search import chunk_text
+
+        text = "one two three four five six seven"
+        pages = [{"start": 0, "end": 13}, {"start": 14, "end": 14}, {"start": 14, "end": len(text)}]
+
+        self.assertEqual(
+            chunk_text(text, pages, 2),
+            [(1, "one two"), (1, "three"), (3, "four five"), (3, "six seven")],
+        )
+        self.assertEqual(chunk_text(text, None, 10), [(1, text)])
+
+    def test_02_search_index(self) -> None:
+        """
+        Test `search.SearchIndex` class before its lists are trained.
+        A reader sees the rows added by another writer on its next search.
+        """
+        from src.search import SearchIndex
+
+        with tempfile.TemporaryDirectory() as path:
+            writer, reader = SearchIndex(path), SearchIndex(path)
+            self.assertEqual(reader.search("payment terms", 10), [])
+
+            writer.add("a" * 24, [(1, "The invoice lists the payment terms."), (2, "The delivery address.")])
+            passages = reader.search("payment terms", 10)
+            self.assertEqual([(p["pdf_id"], p["page"]) for p in passages], [("a" * 24, 1)])
+            self.assertEqual(passages[0]["text"], "The invoice lists the payment terms.")
+
+            writer.add("b" * 24, [(3, "Payment terms of thirty days after delivery.")])
+            passages = reader.search("payment terms", 10)
+            self.assertEqual({p["pdf_id"] for p in passages}, {"a" * 24, "b" * 24})
+            self.assertEqual(reader.count, 3)
+
+            self.assertEqual(reader.search("payment terms", 1)[0]["pdf_id"], passages[0]["pdf_id"])
+            self.assertEqual(reader.search("the and", 10), [])
+
+    def test_03_search_index_with_lists(self) -> None:
+        """
+        Test `search.SearchIndex` class after its lists are trained.
+        Each passage is found by a query with its own text.
+        """
+        import random
+
+        from src.search import SearchIndex
+
+        rng = random.Random(0)
+        words = [f"word{i}" for i in range(2000)]
+        passages = [(i, " ".join(rng.sample(words, 30))) for i in range(200)]
+
+        with tempfile.TemporaryDirectory() as path:
+            writer = SearchIndex(path, lists=8, probes=8)
+            for start in range(0, len(passages), 20):
+                writer.add(f"{start:024d}", passages[start : start + 20])
+
+            reader = SearchIndex(path, lists=8, probes=2)
+            for page, text in passages[::10]:
+                found = reader.search(text, 3)
+                self.assertEqual((found[0]["page"], found[0]["text"]), (page, text))
+
+            self.assertEqual(len(reader.centroids), 8)
+            self.assertEqual(reader.posted, len(passages))
+
+            # The rows added after the lists are trained are assigned to them
+            writer.add("c" * 24, [(1, "zebra giraffe antelope")])
+            self.assertEqual(reader.search("zebra giraffe antelope", 1)[0]["pdf_id"], "c" * 24)
+            self.assertEqual(reader.posted, len(passages))
+
+            writer.clear()
+            self.assertEqual(reader.search("giraffe", 1), [])
+            self.assertIsNone(reader.centroids)
+
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestSearch)
+    runner = JSONTestRunner()
+    runner.run(suite, "search")
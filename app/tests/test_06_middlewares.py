@@ -0,0 +1,116 @@
+assert __name__ == "__main__", "This script is not meant to be imported."
+
+import unittest
+
+from utils import JSONTestRunner, add_path
+
+add_path()
+
+
+class TestMiddlewares(unittest.TestCase):
+    """
+    Test the middlewares with in-memory clients.
+    """
+
+    def test_00_logger_middleware_error_responses(self) -> None:
+        """
+        Test `middlewares.LoggerMiddleware` class with the error responses that are returned without an exception.
+        They are logged with their levels even if the successful requests are not sampled.
+        """
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+
+        from src.middlewares import LoggerMiddleware
+        from src.middlewares import logger
+        from src.utils import ORJSONResponse
+
+        class MongoClient:
+            def __init__(self) -> None:
+                self.logs = []
+
+            async def insert_log(self, log: dict) -> str:
+                self.logs.append(log)
+                return ""
+
+        app = FastAPI()
+        app.state.mongo_client = MongoClient()
+        app.add_api_route("/v1/ok", lambda: {"status": "ok"})
+        app.add_api_route("/v1/unavailable", lambda: ORJSONResponse(status_code=503, content={"detail": "down"}))
+        app.add_middleware(LoggerMiddleware)
+
+        sample_rate = logger.LOGGER_SAMPLE_RATE
+        logger.LOGGER_SAMPLE_RATE = 0.0
+        try:
+            with TestClient(app) as client:
+                self.assertEqual(client.get("/v1/ok").status_code, 200)
+                self.assertEqual(client.get("/v1/missing").status_code, 404)
+                self.assertEqual(client.get("/v1/unavailable").status_code, 503)
+        finally:
+            logger.LOGGER_SAMPLE_RATE = sample_rate
+
+        logs = [(log["path"], log["status_code"], log["level"]) for log in app.state.mongo_client.logs]
+        self.assertEqual(logs, [("/v1/missing", 404, "warning"), ("/v1/unavailable", 503, "error")])
+        self.assertEqual(app.state.mongo_client.logs[0]["sampling"]["dropped"], 1)
+
+    def test_01_rate_limit_middleware(self) -> None:
+        """
+        Test `middlewares.RateLimitMiddleware` class with the buckets of a client and its PDF documents.
+        """
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+
+        from src.middlewares import RateLimitMiddleware
+        from src.middlewares import rate_limit
+
+        class RedisClient:
+            def __init__(self) -> None:
+                self.buckets = {}
+                self.keys = []
+
+            async def take_token(self, key: str, capacity: int, rate: float) -> tuple[bool, int, int, int]:
+                self.keys.append(key)
+                tokens = self.buckets.get(key, capacity)
+                if tokens < 1:
+                    return False, 0, 30000, 60000
+                self.buckets[key] = tokens - 1
+                return True, tokens - 1, 0, 1000
+
+        app = FastAPI()
+        app.state.redis_client = RedisClient()
+        app.add_api_route("/v1/chat/{pdf_id}", lambda pdf_id: {"pdf_id": pdf_id})
+        app.add_api_route("/v1/ping", lambda: {"status": "ok"})
+        app.add_middleware(RateLimitMiddleware)
+
+        rate_limits = rate_limit.RATE_LIMITS
+        rate_limit.RATE_LIMITS = {"/v1/chat": {"limit": 5, "period": 60, "pdf_limit": 2}}
+        try:
+            with TestClient(app) as client:
+                responses = [client.get("/v1/chat/pdf-a") for _ in range(3)]
+                other = client.get("/v1/chat/pdf-b")
+                ping = client.get("/v1/ping")
+        finally:
+            rate_limit.RATE_LIMITS = rate_limits
+
+        # The bucket of the PDF document is the most restrictive one
+        self.assertEqual([response.status_code for response in responses], [200, 200, 429])
+        self.assertEqual([response.headers["RateLimit-Limit"] for response in responses], ["2", "2", "2"])
+        self.assertEqual([response.headers["RateLimit-Remaining"] for response in responses], ["1", "0", "0"])
+        self.assertEqual(responses[2].headers["Retry-After"], "30")
+        self.assertEqual(responses[2].headers["RateLimit-Reset"], "60")
+        self.assertNotIn("Retry-After", responses[0].headers)
+
+        # The other PDF document has its own bucket, but shares the bucket of the client
+        self.assertEqual(other.status_code, 200)
+        self.assertIn("/v1/chat:ip:testclient:pdf-b", app.state.redis_client.keys)
+        self.assertEqual(app.state.redis_client.buckets["/v1/chat:ip:testclient"], 1)
+        self.assertEqual(app.state.redis_client.buckets["/v1/chat:ip:testclient:pdf-a"], 0)
+
+        # The paths without a limit are not limited
+        self.assertEqual(ping.status_code, 200)
+        self.assertNotIn("RateLimit-Limit", ping.headers)
+
+
+if __name__ == "__main__":
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestMiddlewares)
+    runner = JSONTestRunner()
+    runner.run(suite, "middlewares")
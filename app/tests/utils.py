@@ -1,14 +1,20 @@
 import json
+import statistics
+import time
 import unittest
 import sys
 from datetime import datetime
 from pathlib import Path
 from types import TracebackType
-from typing import Any, Type
+from typing import Any, Callable, Type
 
 ExcInfo = tuple[Type[BaseException], BaseException, TracebackType | None]
 OptExcInfo = ExcInfo | None
 
+# The metrics of the micro-benchmarks in milliseconds, they are written with the results
+METRICS: dict[str, float] = {}
+BENCHMARK_PREFIX = "benchmark."
+
 
 def add_path() -> None:
     """
@@ -18,6 +24,86 @@ def add_path() -> None:
     sys.path.append(str(path))
 
 
+def benchmark(name: str, func: Callable[[], object], number: int = 100, repeat: int = 5) -> float:
+    """
+    Measure the duration of a function and record it in the metrics.
+    The function is called `number` times in each of `repeat` rounds, after a warm-up call, \
+    and the median duration of a round is recorded.
+    So, `number` should make a round long enough to be measured above the noise.
+
+    Parameters
+    ----------
+    name : str
+        The name of the metric. (e.g., read_pdf_from_bytes)
+
+    func : Callable[[], object]
+        The function to measure.
+
+    number : int
+        The number of calls in each round.
+
+    repeat : int
+        The number of rounds.
+
+    Returns
+    -------
+    duration : float
+        The median duration of a round in milliseconds.
+    """
+    func()
+
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        durations.append((time.perf_counter() - start) * 1000)
+
+    METRICS[BENCHMARK_PREFIX + name] = statistics.median(durations)
+    return METRICS[BENCHMARK_PREFIX + name]
+
+
+def compare_metrics(
+    metrics: dict[str, float], baseline: dict[str, float], tolerance: float, min_delta_ms: float
+) -> list[dict]:
+    """
+    Compare the metrics of a run with the baseline.
+    A metric regresses if it is slower than the baseline by more than `tolerance` times the baseline \
+    and by more than `min_delta_ms` milliseconds, so the noise of the very short metrics is ignored.
+    A baseline metric without a value in the run also regresses, e.g. if its test failed or was renamed.
+    The metrics without a baseline are not compared.
+
+    Parameters
+    ----------
+    metrics : dict[str, float]
+        The metrics of the run in milliseconds.
+
+    baseline : dict[str, float]
+        The baseline metrics in milliseconds.
+
+    tolerance : float
+        The allowed slowdown relative to the baseline. (e.g., 0.25)
+
+    min_delta_ms : float
+        The allowed slowdown in milliseconds.
+
+    Returns
+    -------
+    regressions : list[dict]
+        The regressed metrics with their values, baselines and slowdowns, the largest slowdown first.
+        The missing metrics come first, with None values and infinite slowdowns.
+    """
+    regressions = []
+    for name, base in baseline.items():
+        value = metrics.get(name)
+        if value is None:
+            regressions.append({"metric": name, "value": None, "baseline": base, "slowdown": float("inf")})
+        elif value > base * (1 + tolerance) and value - base > min_delta_ms:
+            regressions.append({"metric": name, "value": value, "baseline": base, "slowdown": value / base - 1})
+
+    return sorted(regressions, key=lambda regression: regression["slowdown"], reverse=True)
+
+
 class JSONTestResult(unittest.TestResult):
     """
     A test result class that can be used with JSONTestRunner.
@@ -30,6 +116,7 @@ class JSONTestResult(unittest.TestResult):
         """
         super().__init__(*args, **kwargs)
         self.results = []
+        self.started = time.perf_counter()
         self.counter = {
             "success": 0,
             "errors": 0,
@@ -37,6 +124,29 @@ class JSONTestResult(unittest.TestResult):
             "skipped": 0,
         }
 
+    def startTest(self, test: unittest.TestCase) -> None:
+        """
+        Start the timer of a test.
+
+        Parameters
+        ----------
+        test : unittest.TestCase
+            The test case.
+        """
+        super().startTest(test)
+        self.started = time.perf_counter()
+
+    def duration(self) -> float:
+        """
+        Get the wall time of the current test.
+
+        Returns
+        -------
+        duration : float
+            The wall time since the start of the test in milliseconds.
+        """
+        return (time.perf_counter() - self.started) * 1000
+
     def addSuccess(self, test: unittest.TestCase) -> None:
         """
         Add a successful test to the results.
@@ -46,7 +156,7 @@ class JSONTestResult(unittest.TestResult):
         test : unittest.TestCase
             The test case.
         """
-        self.results.append({"test": str(test), "outcome": "success"})
+        self.results.append({"test": str(test), "outcome": "success", "duration_ms": self.duration()})
         self.counter["success"] += 1
 
     def addError(self, test: unittest.TestCase, err: OptExcInfo) -> None:
@@ -62,7 +172,12 @@ class JSONTestResult(unittest.TestResult):
             The error information.
         """
         self.results.append(
-            {"test": str(test), "outcome": "error", "error": self._exc_info_to_string(err, test)}
+            {
+                "test": str(test),
+                "outcome": "error",
+                "error": self._exc_info_to_string(err, test),
+                "duration_ms": self.duration(),
+            }
         )
         self.counter["errors"] += 1
 
@@ -79,7 +194,12 @@ class JSONTestResult(unittest.TestResult):
             The error information.
         """
         self.results.append(
-            {"test": str(test), "outcome": "failure", "error": self._exc_info_to_string(err, test)}
+            {
+                "test": str(test),
+                "outcome": "failure",
+                "error": self._exc_info_to_string(err, test),
+                "duration_ms": self.duration(),
+            }
         )
         self.counter["failures"] += 1
 
@@ -113,6 +233,8 @@ class JSONTestRunner(unittest.TextTestRunner):
     def run(self, test: unittest.TestSuite | unittest.TestCase, name: str) -> None:
         """
         Run the test suite/case and save the results to a JSON file.
+        The metrics are the wall times of the successful tests (e.g., utils.test_00_detect_language) \
+        and the micro-benchmarks recorded with `benchmark` (e.g., benchmark.clean_text) in milliseconds.
 
         Parameters
         ----------
@@ -125,6 +247,11 @@ class JSONTestRunner(unittest.TextTestRunner):
         result = JSONTestResult()
         test(result)
 
+        metrics = {}
+        for item in result.results:
+            if item["outcome"] == "success":
+                metrics[f"{name}.{item['test'].split()[0]}"] = item["duration_ms"]
+
         result = {
             "stats": {
                 "total": result.testsRun,
@@ -134,6 +261,7 @@ class JSONTestRunner(unittest.TextTestRunner):
                 "skipped": result.counter["skipped"],
             },
             "results": result.results,
+            "metrics": metrics | METRICS,
         }
 
         path = (